@@ -0,0 +1,331 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from itertools import chain, repeat
+
+import numpy as np
+
+from sqlite_store import connect
+
+DEFAULT_ANALYSIS_PATH = os.path.join('.news_cache', 'analysis.sqlite')
+
+# Part of every cache key: bump it when the lexicons or the scoring change
+ANALYSIS_VERSION = 1
+
+# Articles scored per vectorized batch
+BATCH_SIZE = 512
+
+POSITIVE_WORDS = frozenset("""
+beat beats beating surge surged surges surging soar soared soaring soars jump jumped jumps rally rallied
+rallies gain gained gains rise rises rising rose climb climbed climbs record growth grew grow grows growing
+profit profits profitable profitability strong stronger strongest strength upgrade upgraded upgrades
+outperform outperformed outperforms exceed exceeded exceeds boost boosted boosts robust improve improved
+improves improving improvement success successful win won wins winning expand expanded expanding expansion
+optimistic optimism confident confidence bullish upbeat innovative innovation breakthrough positive
+favorable momentum rebound rebounded recover recovered recovery milestone best higher dividend buyback
+approval approved award awarded accelerate accelerated accelerating efficient efficiency leading leader
+solid healthy thrive thriving advance advanced advances upside opportunity opportunities
+""".split())
+
+NEGATIVE_WORDS = frozenset("""
+miss missed misses fall fell falling falls drop dropped dropping drops decline declined declines declining
+plunge plunged plunges plunging slump slumped slumps tumble tumbled tumbles sink sank sinking slide slid
+sliding loss losses lose losing lost weak weaker weakest weakness downgrade downgraded downgrades
+underperform underperformed cut cuts cutting layoff layoffs fired lawsuit lawsuits sued probe probes
+investigation fraud scandal fined penalty penalties recall recalled recalls risk risks risky concern
+concerns worried worry worries fear fears uncertainty uncertain volatile volatility bearish pessimistic
+crisis bankruptcy bankrupt default delay delayed delays halt halted shortage shortages disruption
+disruptions disrupted strike strikes warn warned warning warns slow slowed slowing slowdown lower worst
+worse negative fail failed failing failure struggle struggled struggles struggling challenge challenges
+challenging headwinds pressure pressures decrease decreased deficit shortfall breach hack outage
+controversy criticism criticized resign resigned resignation ousted impairment writedown downturn
+""".split())
+
+# These flip the polarity of the words that follow them
+NEGATORS = frozenset("""
+not no never neither nor without hardly barely isn't wasn't aren't weren't don't doesn't didn't won't
+can't cannot couldn't hasn't haven't hadn't shouldn't wouldn't
+""".split())
+
+# How many words after a negator have their polarity flipped
+NEGATION_WINDOW = 3
+
+# Fewer sentiment words than this, or a net score closer to zero, is neutral
+MIN_SENTIMENT_WORDS = 2
+SENTIMENT_THRESHOLD = 0.2
+
+TOPICS = {
+    'earnings': "earnings revenue revenues quarter quarterly eps guidance forecast forecasts outlook margin "
+                "margins sales results income ebitda fiscal",
+    'markets': "shares stock stocks investors investor trading traded nasdaq dow index valuation analysts "
+               "analyst rating ratings bullish bearish volatility",
+    'products': "product products launch launched launches model models release released unveiled unveils "
+                "customers customer device devices vehicle vehicles lineup feature features",
+    'legal': "lawsuit lawsuits court judge regulators regulator regulatory antitrust investigation probe "
+             "settlement fined penalty sec ftc doj compliance sued litigation ruling",
+    'leadership': "ceo executive executives chairman board founder president cfo appointed resigned "
+                  "resignation succession leadership management directors",
+    'deals': "acquisition acquisitions acquire acquired merger mergers deal deals takeover bid stake buyout "
+             "partnership partner partners agreement investment investments funding",
+    'operations': "production factory factories plant plants supply suppliers supplier chain manufacturing "
+                  "capacity output deliveries delivered logistics shipments inventory recall shortage",
+    'technology': "ai software chip chips semiconductor semiconductors data cloud platform autonomous "
+                  "technology digital computing battery batteries robotics cybersecurity hack breach",
+    'labor': "employees workers jobs job layoffs layoff hiring union unions strike wages staff workforce",
+    'environment': "climate emissions carbon renewable solar sustainability sustainable green environmental "
+                   "esg electric energy"
+}
+TOPIC_NAMES = list(TOPICS)
+
+# A topic needs this many keyword hits to be tagged; at most MAX_TOPICS are kept
+MIN_TOPIC_HITS = 2
+MAX_TOPICS = 3
+
+_WORD = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+def _build_lexicon():
+    # Word -> id (0 is every other word) and per-id polarity, negator flag and topic
+    words = sorted(POSITIVE_WORDS | NEGATIVE_WORDS | NEGATORS | set(' '.join(TOPICS.values()).split()))
+    ids = {word: index for index, word in enumerate(words, 1)}
+    polarity = np.zeros(len(words) + 1)
+    negator = np.zeros(len(words) + 1, dtype=bool)
+    topic = np.full(len(words) + 1, -1)
+    for word, index in ids.items():
+        polarity[index] = (word in POSITIVE_WORDS) - (word in NEGATIVE_WORDS)
+        negator[index] = word in NEGATORS
+    for topic_index, keywords in enumerate(TOPICS.values()):
+        for word in keywords.split():
+            topic[ids[word]] = topic_index
+    return ids, polarity, negator, topic
+
+_IDS, _POLARITY, _NEGATOR, _TOPIC = _build_lexicon()
+
+def content_key(article):
+    """Cache key for an article's analysis: a hash of its title, content and ANALYSIS_VERSION"""
+    text = f"{ANALYSIS_VERSION}\0{article.get('title') or ''}\0{article.get('content') or ''}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def analyze_texts(texts):
+    """
+    Score a batch of texts for sentiment and topics in one vectorized pass.
+
+    Every word of every text is mapped to a lexicon id in a single array;
+    negation, polarity sums and topic hits are then array operations over
+    that array, grouped per text with bincount.
+
+    Args:
+        texts (list): Article texts
+
+    Returns:
+        list: One {"sentiment": label, "sentiment_score": float, "topics": [...]}
+        per text; the score is (positive - negative) / (positive + negative)
+        sentiment words, and labels are 'positive', 'neutral' or 'negative'
+    """
+    token_lists = [_WORD.findall(text.lower()) for text in texts]
+    count = len(token_lists)
+    tokens = list(chain.from_iterable(token_lists))
+    ids = np.fromiter(map(_IDS.get, tokens, repeat(0)), dtype=np.int64, count=len(tokens))
+    docs = np.repeat(np.arange(count), [len(tokens) for tokens in token_lists])
+
+    # A word is negated if a negator of the same text sits within NEGATION_WINDOW words before it
+    negators = _NEGATOR[ids]
+    negated = np.zeros(len(ids), dtype=bool)
+    for distance in range(1, NEGATION_WINDOW + 1):
+        negated[distance:] |= negators[:-distance] & (docs[distance:] == docs[:-distance])
+    polarity = np.where(negated, -_POLARITY[ids], _POLARITY[ids])
+
+    positive = np.bincount(docs, weights=polarity > 0, minlength=count)
+    negative = np.bincount(docs, weights=polarity < 0, minlength=count)
+    hits = positive + negative
+    scores = np.where(hits > 0, (positive - negative) / np.maximum(hits, 1), 0.0)
+
+    topics = _TOPIC[ids]
+    tagged = topics >= 0
+    topic_hits = np.bincount(
+        docs[tagged] * len(TOPIC_NAMES) + topics[tagged], minlength=count * len(TOPIC_NAMES)
+    ).reshape(count, len(TOPIC_NAMES))
+    ranked = np.argsort(-topic_hits, axis=1, kind='stable')[:, :MAX_TOPICS]
+
+    results = []
+    for index in range(count):
+        score = float(scores[index])
+        if hits[index] < MIN_SENTIMENT_WORDS or abs(score) < SENTIMENT_THRESHOLD:
+            label = 'neutral'
+        else:
+            label = 'positive' if score > 0 else 'negative'
+        results.append({
+            "sentiment": label,
+            "sentiment_score": round(score, 3),
+            "topics": [TOPIC_NAMES[t] for t in ranked[index] if topic_hits[index, t] >= MIN_TOPIC_HITS]
+        })
+    return results
+
+class AnalysisCache:
+    """
+    Persistent analysis results keyed by content hash (see content_key).
+
+    An article whose title and content have not changed is never scored
+    again, whichever URL or run it comes from.
+
+    Args:
+        path (str): SQLite database file
+    """
+
+    def __init__(self, path=DEFAULT_ANALYSIS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS analysis (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                analyzed_at REAL NOT NULL
+            )
+        """)
+        self.db.commit()
+
+    def get_many(self, keys):
+        """
+        Look up stored results.
+
+        Returns:
+            dict: Key -> result, for the keys that are stored
+        """
+        found = {}
+        keys = list(keys)
+        with self.lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self.db.execute(
+                    f"SELECT key, result FROM analysis WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((key, json.loads(result)) for key, result in rows)
+        return found
+
+    def put_many(self, results):
+        """Store key -> result pairs"""
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO analysis (key, result, analyzed_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(result), now) for key, result in results.items()]
+            )
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+class ArticleAnalyzer:
+    """
+    Tags articles with sentiment and topics, in batches and through a cache.
+
+    Args:
+        cache (AnalysisCache): Where results persist across runs (default: in-memory only)
+        batch_size (int): Articles scored per vectorized batch
+    """
+
+    def __init__(self, cache=None, batch_size=BATCH_SIZE):
+        self.cache = cache
+        self.batch_size = batch_size
+        self.memory = {}
+        self.analyzed = 0
+        self.cached = 0
+        self.seconds = 0.0
+
+    def analyze(self, articles):
+        """
+        Add "sentiment", "sentiment_score" and "topics" to every article dict.
+
+        Args:
+            articles (list): Article dicts with "title" and "content", updated in place
+
+        Returns:
+            list: The same articles
+        """
+        started = time.perf_counter()
+        keys = [content_key(article) for article in articles]
+        missing = [key for key in dict.fromkeys(keys) if key not in self.memory]
+        if missing and self.cache is not None:
+            stored = self.cache.get_many(missing)
+            self.memory.update(stored)
+            self.cached += len(stored)
+            missing = [key for key in missing if key not in stored]
+
+        by_key = dict(zip(keys, articles))
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            texts = [f"{by_key[key].get('title') or ''}\n{by_key[key].get('content') or ''}" for key in batch]
+            results = dict(zip(batch, analyze_texts(texts)))
+            self.memory.update(results)
+            if self.cache is not None:
+                self.cache.put_many(results)
+            self.analyzed += len(batch)
+
+        for article, key in zip(articles, keys):
+            article.update(self.memory[key])
+        self.seconds += time.perf_counter() - started
+        return articles
+
+    def stats(self):
+        """Articles scored, articles served from the persistent cache, and scoring throughput"""
+        return {
+            "analyzed": self.analyzed,
+            "cached": self.cached,
+            "seconds": self.seconds,
+            "articles_per_second": (self.analyzed + self.cached) / self.seconds if self.seconds else 0.0
+        }
+
+def company_report(articles):
+    """
+    Aggregate the analysis of one company's articles.
+
+    Args:
+        articles (list): Article dicts already tagged by ArticleAnalyzer
+
+    Returns:
+        dict: "articles"; "sentiment" with the count per label and the mean
+        score; "topics" with the number of articles tagged with each; and
+        "topic_overlap", the topic pairs tagged together on an article, with
+        how many articles share them and their Jaccard overlap
+    """
+    labels = [article.get("sentiment", 'neutral') for article in articles]
+    scores = np.array([article.get("sentiment_score", 0.0) for article in articles])
+    tagged = np.array([
+        [name in article.get("topics", ()) for name in TOPIC_NAMES] for article in articles
+    ], dtype=np.int64).reshape(len(articles), len(TOPIC_NAMES))
+
+    topic_counts = tagged.sum(axis=0)
+    together = tagged.T @ tagged
+    overlap = []
+    for first in range(len(TOPIC_NAMES)):
+        for second in range(first + 1, len(TOPIC_NAMES)):
+            shared = int(together[first, second])
+            if shared:
+                union = int(topic_counts[first] + topic_counts[second]) - shared
+                overlap.append({
+                    "topics": [TOPIC_NAMES[first], TOPIC_NAMES[second]],
+                    "articles": shared,
+                    "jaccard": round(shared / union, 3)
+                })
+    overlap.sort(key=lambda entry: (-entry["articles"], -entry["jaccard"]))
+
+    return {
+        "articles": len(articles),
+        "sentiment": {
+            "positive": labels.count('positive'),
+            "neutral": labels.count('neutral'),
+            "negative": labels.count('negative'),
+            "mean_score": round(float(scores.mean()), 3) if len(articles) else 0.0
+        },
+        "topics": {
+            name: int(count) for name, count in sorted(
+                zip(TOPIC_NAMES, topic_counts), key=lambda item: -item[1]
+            ) if count
+        },
+        "topic_overlap": overlap
+    }
@@ -0,0 +1,168 @@
+import json
+import os
+
+try:
+    from analysis import AnalysisCache, ArticleAnalyzer, company_report
+    from summarizer import add_summaries
+except ImportError:  # NumPy missing: articles are saved without summaries or analysis
+    add_summaries = company_report = ArticleAnalyzer = None
+
+def article_filename(company_name, extension='json'):
+    """Output file name for a company's articles, e.g. 'Tesla_Inc_articles.json'"""
+    return f"{company_name.replace(' ', '_')}_articles.{extension}"
+
+def make_analyzer(enabled=True):
+    """
+    Analyzer to pass to ArticleSink.finalize, backed by the persistent analysis cache.
+
+    Returns:
+        ArticleAnalyzer: Or None when analysis is turned off or NumPy is missing
+    """
+    if not enabled or ArticleAnalyzer is None:
+        return None
+    return ArticleAnalyzer(AnalysisCache())
+
+def iter_jsonl(path):
+    """Yield the articles stored in a JSON Lines file, one at a time"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def jsonl_to_json(jsonl_path, json_path):
+    """
+    Convert a JSON Lines article file to the pretty {"articles": [...]} format.
+
+    Articles are streamed one at a time; the output is byte-for-byte what
+    json.dump({"articles": articles}, f, indent=4, ensure_ascii=False) writes.
+
+    Args:
+        jsonl_path (str): Source file, one article per line
+        json_path (str): Destination file
+
+    Returns:
+        int: Number of articles written
+    """
+    count = 0
+    with open(json_path, 'w', encoding='utf-8') as f:
+        f.write('{\n    "articles": [')
+        for article in iter_jsonl(jsonl_path):
+            body = json.dumps(article, indent=4, ensure_ascii=False)
+            f.write(',\n' if count else '\n')
+            f.write('\n'.join('        ' + line for line in body.split('\n')))
+            count += 1
+        f.write('\n    ]\n}' if count else ']\n}')
+    return count
+
+def jsonl_to_enriched_json(jsonl_path, json_path, summarize=True, analyzer=None):
+    """
+    Convert a JSON Lines article file to pretty JSON, with summaries and analysis.
+
+    With summarize, every article gets a "summary" and the file a top-level
+    company "summary" (see summarizer.summarize_company). With an analyzer,
+    every article gets its sentiment and topics and the file a top-level
+    "analysis" report (see analysis.company_report). The company's articles
+    are processed together, so unlike jsonl_to_json this loads them all.
+
+    Args:
+        jsonl_path (str): Source file, one article per line
+        json_path (str): Destination file
+        summarize (bool): Add the summaries
+        analyzer (ArticleAnalyzer): Tags the articles (default: no analysis)
+
+    Returns:
+        int: Number of articles written
+    """
+    articles = list(iter_jsonl(jsonl_path))
+    output = {"articles": articles}
+    if summarize:
+        output["summary"] = add_summaries(articles)
+    if analyzer is not None:
+        analyzer.analyze(articles)
+        output["analysis"] = company_report(articles)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=4, ensure_ascii=False)
+    return len(articles)
+
+class ArticleSink:
+    """
+    Streaming per-company JSON Lines writer.
+
+    Each accepted article is appended to <company>_articles.jsonl and flushed
+    straight away, so nothing is held in memory and a crash loses at most the
+    article being written. finalize() then produces the usual pretty JSON
+    files for backward compatibility.
+
+    Args:
+        directory (str): Where to write the files (default: current directory)
+        append (bool): Keep existing .jsonl contents instead of truncating them
+    """
+
+    def __init__(self, directory='.', append=False):
+        self.directory = directory
+        self.append = append
+        self.files = {}
+        self.counts = {}
+
+    def path(self, company_name, extension='jsonl'):
+        filename = article_filename(company_name, extension)
+        return filename if self.directory == '.' else os.path.join(self.directory, filename)
+
+    def write(self, article):
+        """Append one article dict (must contain 'company_name') and flush"""
+        company_name = article["company_name"]
+        f = self.files.get(company_name)
+        if f is None:
+            f = open(self.path(company_name), 'a' if self.append else 'w', encoding='utf-8')
+            self.files[company_name] = f
+            self.counts[company_name] = 0
+
+        f.write(json.dumps(article, ensure_ascii=False) + '\n')
+        f.flush()
+        self.counts[company_name] += 1
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+
+    def finalize(self, summarize=False, analyzer=None):
+        """
+        Close the JSONL files and write the pretty JSON file for each company.
+
+        Args:
+            summarize (bool): Add per-article and company summaries (needs NumPy)
+            analyzer (ArticleAnalyzer): Add sentiment, topics and a company
+                analysis report (needs NumPy)
+
+        Returns:
+            dict: Company name -> number of articles in its JSON file
+        """
+        self.close()
+        if (summarize or analyzer is not None) and add_summaries is None:
+            print("⚠️ NumPy is not installed; saving articles without summaries or analysis")
+            summarize, analyzer = False, None
+
+        written = {}
+        for company_name in self.counts:
+            json_path = self.path(company_name, 'json')
+            written[company_name] = None
+            if summarize or analyzer is not None:
+                try:
+                    written[company_name] = jsonl_to_enriched_json(
+                        self.path(company_name), json_path, summarize, analyzer
+                    )
+                except Exception as e:
+                    # The scraped articles matter more than their summaries
+                    print(f"⚠️ Could not summarize or analyze {company_name}'s articles ({e!r}); saving them as they are")
+            if written[company_name] is None:
+                written[company_name] = jsonl_to_json(self.path(company_name), json_path)
+            print(f"Saved {written[company_name]} articles to {json_path}")
+        return written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,158 @@
+import argparse
+import time
+
+from article_sink import ArticleSink, make_analyzer
+from crawl_state import CrawlState
+from dedup import NearDuplicateIndex
+from metrics import Metrics, NullMetrics
+from news_scrapV2 import scrape_companies
+from parse_pool import ParsePool
+from sources import DEFAULT_STATS_PATH, load_sources
+from url_canon import DEFAULT_REDIRECTS_PATH, UrlCanonicalizer
+from response_cache import get_default_cache
+
+try:
+    import tts
+except ImportError:  # NumPy missing: no audio
+    tts = None
+
+def read_company_names(path):
+    """
+    Read company names from a file, one per line.
+
+    Blank lines and lines starting with '#' are ignored, as are repeats.
+
+    Args:
+        path (str): Path of the company list
+
+    Returns:
+        list: Company names in file order
+    """
+    with open(path, encoding='utf-8') as f:
+        names = [line.strip() for line in f]
+    return list(dict.fromkeys(name for name in names if name and not name.startswith('#')))
+
+def run_batch(company_names, max_articles=10, concurrency=16, workers=None, resume=False,
+              resolve='none', metrics_path=None, metrics_enabled=True, summarize=True, analyze=True):
+    """
+    Scrape every company through one shared pipeline and save one JSON file each.
+
+    Articles are streamed to per-company JSON Lines files as they are accepted
+    and converted to the pretty JSON format at the end, with extractive
+    summaries and sentiment/topic analysis unless turned off.
+
+    Args:
+        company_names (list): Companies to scrape
+        max_articles (int): Maximum number of articles per company
+        concurrency (int): Number of fetches allowed in flight at once
+        workers (int): Parse worker processes (default: one per CPU)
+        resume (bool): Continue the previous run from the crawl state
+        resolve (str): 'head' to resolve wrapper links with HEAD requests first
+        metrics_path (str): Write stage timings and outcome counts here
+            (.json, otherwise Prometheus text)
+        metrics_enabled (bool): False to skip all metrics bookkeeping
+        summarize (bool): Add per-article and per-company summaries
+        analyze (bool): Add sentiment and topics per article and an analysis
+            report per company
+
+    Returns:
+        dict: Company name -> number of articles saved
+    """
+    start = time.perf_counter()
+    unique_urls = set()
+    metrics = Metrics() if metrics_enabled else NullMetrics()
+
+    def on_article(article):
+        unique_urls.add(article['url'])
+        sink.write(article)
+
+    # The output files start over every run, so articles saved by earlier runs must
+    # not count as duplicates; a resumed run re-indexes the articles it restores
+    dedup = NearDuplicateIndex(path=None)
+    with ParsePool(workers=workers) as parse_pool, ArticleSink() as sink:
+        scrape_companies(
+            company_names, max_articles, concurrency,
+            cache=get_default_cache(), parse_pool=parse_pool,
+            on_article=on_article, collect=False, state=CrawlState(), resume=resume,
+            dedup=dedup,
+            canonicalizer=UrlCanonicalizer(DEFAULT_REDIRECTS_PATH, resolve=resolve),
+            sources=load_sources(stats_path=DEFAULT_STATS_PATH), metrics=metrics
+        )
+    if metrics_path:
+        metrics.write(metrics_path)
+
+    saved = dict.fromkeys(company_names, 0)
+    analyzer = make_analyzer(analyze)
+    saved.update(sink.finalize(summarize=summarize, analyzer=analyzer))
+    if analyzer is not None:
+        analysis_stats = analyzer.stats()
+        print(f"🏷️ Analysis: {analysis_stats['analyzed']} scored, {analysis_stats['cached']} cached, "
+              f"{analysis_stats['articles_per_second']:.0f} articles/s")
+    for company_name, count in saved.items():
+        if not count:
+            print(f"❌ No articles found for {company_name}")
+
+    elapsed_minutes = (time.perf_counter() - start) / 60
+    total_articles = sum(saved.values())
+    print(f"📊 {len(saved)} companies, {total_articles} articles ({len(unique_urls)} unique URLs) "
+          f"in {elapsed_minutes * 60:.1f}s: "
+          f"{len(saved) / elapsed_minutes:.1f} companies/min, {total_articles / elapsed_minutes:.1f} articles/min")
+
+    return saved
+
+def render_audio(company_names, workers=4):
+    """
+    Read each company's saved articles out into <company>_news.wav.
+
+    Uses the NEWS_TTS_ENGINE engine, else the first installed one, and the
+    shared audio cache, so chunks already heard in an earlier run are reused.
+
+    Args:
+        company_names (list): Companies with a saved articles file
+        workers (int): Chunks synthesized at once
+    """
+    if tts is None:
+        print("⚠️ NumPy is not installed; skipping audio")
+        return
+    try:
+        engine = tts.create_engine()
+    except RuntimeError as e:
+        print(f"⚠️ {e}; skipping audio")
+        return
+
+    cache = tts.AudioCache()
+    try:
+        for company_name in company_names:
+            report = tts.render_company(company_name, engine, cache, workers)
+            if report["chunks"]:
+                tts.print_report(report)
+    finally:
+        cache.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape news articles for a list of companies")
+    parser.add_argument('companies_file', help="File with one company name per line")
+    parser.add_argument('--max-articles', type=int, default=10, help="Articles to collect per company")
+    parser.add_argument('--concurrency', type=int, default=16, help="Fetches in flight at once")
+    parser.add_argument('--workers', type=int, default=None, help="Parse worker processes")
+    parser.add_argument('--resume', action='store_true', help="Continue the previous run")
+    parser.add_argument('--resolve', choices=['none', 'head'], default='none',
+                        help="Resolve redirect-wrapper links with HEAD requests before fetching")
+    parser.add_argument('--metrics', metavar='PATH', help="Export metrics (.json or Prometheus text)")
+    parser.add_argument('--no-metrics', action='store_true', help="Disable metrics collection")
+    parser.add_argument('--no-summaries', action='store_true', help="Save the articles without summaries")
+    parser.add_argument('--no-analysis', action='store_true', help="Save the articles without sentiment and topics")
+    parser.add_argument('--tts', action='store_true', help="Also read each company's articles out into a WAV file")
+    args = parser.parse_args()
+
+    company_names = read_company_names(args.companies_file)
+    print(f"🔍 Searching for articles about {len(company_names)} companies...")
+    saved = run_batch(
+        company_names, args.max_articles, args.concurrency, args.workers, args.resume, args.resolve,
+        args.metrics, not args.no_metrics, not args.no_summaries, not args.no_analysis
+    )
+    if args.tts:
+        render_audio([company_name for company_name, count in saved.items() if count])
+
+if __name__ == "__main__":
+    main()
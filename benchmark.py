@@ -0,0 +1,350 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from html_parser import get_parser_backend, make_soup, set_parser_backend
+from http_session import get_shared_session
+from news_scrapV2 import (SEARCH_HEADERS, extract_content, extract_links_from_search, extract_title,
+                          is_relevant_to_company, parse_search_links)
+from relevance import get_matcher
+from sources import get_registry
+
+try:
+    from analysis import analyze_texts
+    from summarizer import summarize_article, summarize_company
+except ImportError:  # NumPy missing: the summarization and analysis timings are skipped
+    analyze_texts = summarize_company = None
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'bench')
+DEFAULT_BASELINE = 'bench_baseline.json'
+
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 50e-6
+
+def load_corpus(corpus_dir=DEFAULT_CORPUS):
+    """
+    Load the recorded corpus described by corpus_dir/manifest.json.
+
+    Returns:
+        tuple: (company name, [(search url, html), ...], [(article url, html), ...])
+    """
+    with open(os.path.join(corpus_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    def read(kind, entries):
+        pages = []
+        for filename, url in entries.items():
+            with open(os.path.join(corpus_dir, kind, filename), encoding='utf-8') as f:
+                pages.append((url, f.read()))
+        return pages
+
+    return manifest['company'], read('search', manifest['search']), read('articles', manifest['articles'])
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(samples):
+    return {
+        "calls": len(samples),
+        "mean": sum(samples) / len(samples),
+        "p50": percentile(samples, 50),
+        "p90": percentile(samples, 90),
+        "p99": percentile(samples, 99)
+    }
+
+def time_on_fresh_soup(func, pages, repeat):
+    """Time func(soup, url) on a freshly parsed soup per call (extract_content mutates it)"""
+    samples = []
+    for _ in range(repeat):
+        for url, html in pages:
+            soup = make_soup(html)
+            started = time.perf_counter()
+            func(soup, url)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+def article_pipeline(html, company_name):
+    if not get_matcher((company_name,)).candidates(html):
+        return
+    soup = make_soup(html)
+    extract_title(soup)
+    if is_relevant_to_company(soup, company_name):
+        extract_content(soup)
+
+def time_summaries(articles, repeat):
+    """
+    Time article summaries scored in one batch against one article at a time.
+
+    Both produce one summary per article (no company summary); batched
+    samples are the time of one summarize_company call over all articles,
+    divided by the number of articles, so both are per-article costs.
+
+    Returns:
+        tuple: (batched samples, per-article samples)
+    """
+    contents = [{"content": extract_content(make_soup(html)), "url": url} for url, html in articles]
+    batched = []
+    per_article = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        summarize_company(contents, company_sentences=0)
+        batched.append((time.perf_counter() - started) / len(contents))
+        for article in contents:
+            started = time.perf_counter()
+            summarize_article(article["content"])
+            per_article.append(time.perf_counter() - started)
+    return batched, per_article
+
+def run_benchmarks(corpus_dir=DEFAULT_CORPUS, repeat=5):
+    """
+    Benchmark the extraction hot path on the recorded corpus.
+
+    Every function is timed per page over repeat passes. Throughput is the
+    whole per-page pipeline (pre-filter and parse, then title, relevance and
+    content for articles, or link extraction for search pages). Article
+    summaries are timed both batched and one article at a time, and the
+    sentiment and topic analysis of all articles as one batch. Peak memory
+    is measured with tracemalloc on a separate pass so it does not skew the
+    timings.
+
+    Args:
+        corpus_dir (str): Directory holding manifest.json, search/ and articles/
+        repeat (int): Passes over the corpus per function
+
+    Returns:
+        dict: Report with per-function latency stats, throughput and peak memory
+    """
+    company_name, search_pages, articles = load_corpus(corpus_dir)
+    pages = search_pages + articles
+    functions = {}
+
+    gc.collect()
+    samples = []
+    for _ in range(repeat):
+        for url, html in pages:
+            started = time.perf_counter()
+            make_soup(html)
+            samples.append(time.perf_counter() - started)
+    functions['make_soup'] = samples
+
+    matcher = get_matcher((company_name,))
+    samples = []
+    for _ in range(repeat):
+        for url, html in articles:
+            started = time.perf_counter()
+            matcher.candidates(html)
+            samples.append(time.perf_counter() - started)
+    functions['relevance_prefilter'] = samples
+
+    functions['extract_title'] = time_on_fresh_soup(lambda soup, url: extract_title(soup), articles, repeat)
+    functions['is_relevant_to_company'] = time_on_fresh_soup(
+        lambda soup, url: is_relevant_to_company(soup, company_name), articles, repeat
+    )
+    functions['extract_content'] = time_on_fresh_soup(lambda soup, url: extract_content(soup), articles, repeat)
+    functions['extract_links_from_search'] = time_on_fresh_soup(extract_links_from_search, search_pages, repeat)
+
+    analysis_seconds = None
+    if summarize_company is not None:
+        batched, per_article = time_summaries(articles, repeat)
+        functions['summarize_batched'] = batched
+        functions['summarize_per_article'] = per_article
+
+        texts = [extract_content(make_soup(html)) for url, html in articles]
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            analyze_texts(texts)
+            samples.append((time.perf_counter() - started) / len(texts))
+        functions['analyze_batched'] = samples
+        analysis_seconds = sum(samples) * len(texts)
+
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for url, html in articles:
+            article_pipeline(html, company_name)
+    article_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for url, html in search_pages:
+            parse_search_links(html, url)
+    search_seconds = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    for url, html in articles:
+        article_pipeline(html, company_name)
+    for url, html in search_pages:
+        parse_search_links(html, url)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    throughput = {
+        "articles_per_second": len(articles) * repeat / article_seconds,
+        "search_pages_per_second": len(search_pages) * repeat / search_seconds
+    }
+    if analysis_seconds:
+        throughput["analyzed_articles_per_second"] = len(articles) * repeat / analysis_seconds
+
+    return {
+        "parser": get_parser_backend(),
+        "corpus": {"search_pages": len(search_pages), "articles": len(articles)},
+        "functions": {name: summarize(samples) for name, samples in functions.items()},
+        "throughput": throughput,
+        "peak_memory_bytes": peak_memory
+    }
+
+def compare(report, baseline, tolerance=0.2):
+    """
+    Compare a report against a saved baseline.
+
+    Args:
+        report (dict): Result of run_benchmarks
+        baseline (dict): Earlier result of run_benchmarks
+        tolerance (float): Allowed relative slowdown (0.2: 20%)
+
+    Returns:
+        list: Human-readable descriptions of every regression
+    """
+    regressions = []
+
+    for name, stats in report["functions"].items():
+        before = baseline["functions"].get(name)
+        if before is None:
+            continue
+        for key in ("p50", "p90"):
+            if stats[key] > before[key] * (1 + tolerance) and stats[key] - before[key] > MIN_REGRESSION_SECONDS:
+                regressions.append(
+                    f"{name} {key} {before[key] * 1000:.3f}ms -> {stats[key] * 1000:.3f}ms"
+                )
+
+    for key, value in report["throughput"].items():
+        before = baseline["throughput"].get(key)
+        if before and value < before / (1 + tolerance):
+            regressions.append(f"{key} {before:.1f} -> {value:.1f}")
+
+    before = baseline.get("peak_memory_bytes")
+    if before and report["peak_memory_bytes"] > before * (1 + tolerance):
+        regressions.append(
+            f"peak memory {before / 1024:.0f}KB -> {report['peak_memory_bytes'] / 1024:.0f}KB"
+        )
+
+    return regressions
+
+def print_report(report):
+    corpus = report["corpus"]
+    print(f"Parser: {report['parser']}, corpus: {corpus['search_pages']} search pages, {corpus['articles']} articles")
+    print(f"{'function':<28}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for name, stats in report["functions"].items():
+        print(f"{name:<28}{stats['p50'] * 1000:>10.3f}{stats['p90'] * 1000:>10.3f}{stats['p99'] * 1000:>10.3f}")
+    throughput = report["throughput"]
+    print(f"📈 {throughput['articles_per_second']:.1f} articles/s, "
+          f"{throughput['search_pages_per_second']:.1f} search pages/s, "
+          f"peak memory {report['peak_memory_bytes'] / 1024:.0f}KB")
+    if "analyzed_articles_per_second" in throughput:
+        print(f"🏷️ {throughput['analyzed_articles_per_second']:.0f} articles/s through sentiment and topic analysis")
+
+def record_corpus(company_name, corpus_dir=DEFAULT_CORPUS, articles_per_source=2):
+    """
+    Capture a fresh corpus from the live sites (needs network access).
+
+    Fetches every enabled source's search page for company_name and the
+    first articles_per_source links found on each, then rewrites
+    corpus_dir/manifest.json to describe them.
+
+    Returns:
+        dict: The new manifest
+    """
+    session = get_shared_session()
+    manifest = {"company": company_name, "search": {}, "articles": {}}
+    for kind in ('search', 'articles'):
+        os.makedirs(os.path.join(corpus_dir, kind), exist_ok=True)
+
+    def save(kind, filename, url, html):
+        with open(os.path.join(corpus_dir, kind, filename), 'w', encoding='utf-8') as f:
+            f.write(html)
+        manifest[kind][filename] = url
+
+    for source in get_registry().enabled():
+        search_url = source.search_url(company_name)
+        try:
+            response = session.get(search_url, headers=SEARCH_HEADERS, timeout=15)
+        except Exception as e:
+            print(f"❌ Error with search URL {search_url}: {str(e)}")
+            continue
+        if response.status_code != 200:
+            print(f"⚠️ {source.name}: HTTP {response.status_code}, not recorded")
+            continue
+        save('search', f"{source.name}.html", search_url, response.text)
+
+        recorded = 0
+        for link in parse_search_links(response.text, search_url):
+            if recorded >= articles_per_source:
+                break
+            try:
+                article = session.get(link, timeout=15)
+            except Exception as e:
+                print(f"❌ Error scraping article {link}: {str(e)}")
+                continue
+            if article.status_code == 200:
+                recorded += 1
+                save('articles', f"{source.name}_{recorded}.html", link, article.text)
+        print(f"✅ {source.name}: search page and {recorded} articles recorded")
+
+    with open(os.path.join(corpus_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extraction hot path on a recorded corpus")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="Corpus directory")
+    parser.add_argument('--repeat', type=int, default=5, help="Passes over the corpus per function")
+    parser.add_argument('--backend', help="Parser backend to benchmark")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline report to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown")
+    parser.add_argument('--record', metavar='COMPANY', help="Record a new corpus from the live sites instead")
+    args = parser.parse_args()
+
+    if args.record:
+        record_corpus(args.record, args.corpus)
+        return
+
+    if args.backend:
+        set_parser_backend(args.backend)
+
+    report = run_benchmarks(args.corpus, args.repeat)
+    print_report(report)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get("parser") != report["parser"]:
+        print(f"⚠️ Baseline was taken with the {baseline.get('parser')} parser")
+
+    regressions = compare(report, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"❌ Regression: {regression}")
+    if regressions:
+        sys.exit(1)
+    print("✅ No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
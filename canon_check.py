@@ -0,0 +1,92 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+from crawl_state import CrawlState
+from http_session import create_session
+from news_scrapV2 import scrape_companies_async
+from politeness import HostScheduler
+from stand_in_site import ARTICLE_BASE, SEARCH_URL, article_page, redirect, search_page, serve, source_registry
+from url_canon import canonicalize_url
+
+# (link as found, canonical URL it must be fetched and stored as)
+CASES = [
+    ('https://example.com/story?id', 'https://example.com/story?id'),
+    ('https://example.com/story?12345', 'https://example.com/story?12345'),
+    ('https://example.com/story?a=b%2Fc', 'https://example.com/story?a=b%2Fc'),
+    ('https://example.com/story?q=hello+world&k=%20', 'https://example.com/story?k=%20&q=hello+world'),
+    ('https://example.com/story?x=1&utm_source=y', 'https://example.com/story?x=1'),
+    ('https://example.com/story?utm_source=y&fbclid=z', 'https://example.com/story'),
+    ('https://example.com/story?UTM_Medium=x&&id=3', 'https://example.com/story?id=3'),
+    ('https://example.com/story?%75tm_source=x&id=3', 'https://example.com/story?id=3'),
+    ('https://example.com/story?b=2&a=1#comments', 'https://example.com/story?a=1&b=2'),
+    ('HTTPS://WWW.Example.com:443/amp/story/', 'https://www.example.com/story/'),
+    ('http://example.com:8080/story', 'http://example.com:8080/story'),
+    ('https://www.google.com/url?q=https://example.com/story%3Fid%3D7&sa=U', 'https://example.com/story?id=7'),
+]
+
+def check_canonical_urls(cases=CASES):
+    """
+    Check canonicalize_url on query and host edge cases.
+
+    Each canonical URL must also be its own canonical form, so a link
+    stored by one run is recognized by the next.
+
+    Returns:
+        list: Problems found (empty if the check passed)
+    """
+    problems = []
+    for url, expected in cases:
+        canonical = canonicalize_url(url)
+        if canonical != expected:
+            problems.append(f"{url} -> {canonical}, expected {expected}")
+        elif canonicalize_url(canonical) != canonical:
+            problems.append(f"{canonical} is not stable: -> {canonicalize_url(canonical)}")
+    return problems
+
+def check_redirect_outcome(company_name='Acme'):
+    """
+    Check that a link redirecting to an article already fetched gets an outcome.
+
+    Without one, every resumed run or refresh would fetch the link again.
+
+    Returns:
+        list: Problems found (empty if the check passed)
+    """
+    article, short_link = ARTICLE_BASE + 'story', ARTICLE_BASE + 'short'
+    server = serve({
+        SEARCH_URL.format(query=company_name): search_page([article, short_link]),
+        article: article_page(company_name, 'story'),
+        short_link: redirect(article),
+    })
+    problems = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            state = CrawlState(os.path.join(directory, 'crawl_state.sqlite'))
+            results = asyncio.run(scrape_companies_async(
+                [company_name], 5, session=create_session(base_url=server.base_url), state=state,
+                scheduler=HostScheduler(min_gap=0), sources=source_registry()
+            ))
+            if [found["url"] for found in results[company_name]] != [article]:
+                problems.append(f"redirect run saved {[found['url'] for found in results[company_name]]}, "
+                                f"expected {[article]}")
+            if not state.should_skip(short_link, [company_name]):
+                problems.append(f"{short_link} redirects to {article} but would be fetched again")
+            state.close()
+    finally:
+        server.stop()
+    return problems
+
+def main():
+    problems = check_canonical_urls() + check_redirect_outcome()
+    for problem in problems:
+        print(f"❌ {problem}")
+
+    if problems:
+        sys.exit(1)
+    print(f"✅ Every link kept its parameters as written and lost only the tracking ones ({len(CASES)} URLs); "
+          f"a link redirecting to a fetched article was recorded as a duplicate")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+
+from sqlite_store import connect
+
+DEFAULT_STATE_PATH = os.path.join('.news_cache', 'crawl_state.sqlite')
+
+# Outcomes recorded per (company, url)
+ACCEPTED = 'accepted'
+IRRELEVANT = 'irrelevant'
+NO_TITLE = 'no_title'
+TOO_SHORT = 'too_short'
+DUPLICATE = 'duplicate'
+UNSUPPORTED = 'unsupported'  # Not HTML, or over the byte cap
+GONE = 'gone'  # Answered with a client error that will not go away (403, 404, 410, ...)
+ERROR = 'error'  # Network error, timeout, 429 or 5xx: worth another try soon
+
+# Client error statuses that can pass on their own
+TRANSIENT_CLIENT_STATUSES = frozenset([408, 425, 429])
+
+# How long a negative outcome stops the URL from being fetched again
+DEFAULT_SKIP_WINDOWS = {
+    IRRELEVANT: 24 * 60 * 60,
+    NO_TITLE: 24 * 60 * 60,
+    TOO_SHORT: 24 * 60 * 60,
+    DUPLICATE: 24 * 60 * 60,
+    UNSUPPORTED: 7 * 24 * 60 * 60,
+    GONE: 7 * 24 * 60 * 60,
+    ERROR: 60 * 60
+}
+
+def http_outcome(status_code):
+    """Outcome for an article page answered with a non-200 status"""
+    if 400 <= status_code < 500 and status_code not in TRANSIENT_CLIENT_STATUSES:
+        return GONE
+    return ERROR
+
+class CrawlState:
+    """
+    Persistent crawl state, so an interrupted run can pick up where it stopped.
+
+    Stores, per company, the frontier of links discovered on search pages,
+    the outcome of every attempted URL and the accepted article records.
+    URLs whose last outcome was negative are skipped until their skip window
+    has passed.
+
+    Args:
+        path (str): SQLite database file
+        skip_windows (dict): Seconds to skip a URL after each negative outcome
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH, skip_windows=None):
+        self.path = path
+        self.skip_windows = dict(DEFAULT_SKIP_WINDOWS, **(skip_windows or {}))
+        self.lock = threading.Lock()
+
+        self.db = connect(path, wal=True)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                company TEXT NOT NULL,
+                url TEXT NOT NULL,
+                discovered_at REAL NOT NULL,
+                PRIMARY KEY (company, url)
+            );
+            CREATE TABLE IF NOT EXISTS attempts (
+                company TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (company, url)
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                company TEXT NOT NULL,
+                url TEXT NOT NULL,
+                article TEXT NOT NULL,
+                accepted_at REAL NOT NULL,
+                PRIMARY KEY (company, url)
+            );
+        """)
+        self.db.commit()
+
+    def reset(self, company_name):
+        """Forget the frontier and accepted articles of a company (outcomes are kept)"""
+        with self.lock:
+            self.db.execute("DELETE FROM frontier WHERE company = ?", (company_name,))
+            self.db.execute("DELETE FROM articles WHERE company = ?", (company_name,))
+            self.db.execute(
+                "DELETE FROM attempts WHERE company = ? AND status = ?", (company_name, ACCEPTED)
+            )
+            self.db.commit()
+
+    def add_frontier(self, company_name, urls):
+        """Record links discovered on a company's search pages"""
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO frontier (company, url, discovered_at) VALUES (?, ?, ?)",
+                [(company_name, url, now) for url in urls]
+            )
+            self.db.commit()
+
+    def pending_links(self, company_name):
+        """Frontier links of a company that have not been attempted yet, in discovery order"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT f.url FROM frontier f "
+                "LEFT JOIN attempts a ON a.company = f.company AND a.url = f.url "
+                "WHERE f.company = ? AND a.url IS NULL ORDER BY f.rowid",
+                (company_name,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def record(self, url, statuses):
+        """
+        Record the outcome of an attempted URL.
+
+        Args:
+            url (str): Attempted URL
+            statuses (dict): Company name -> outcome (ACCEPTED, IRRELEVANT, ...)
+        """
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO attempts (company, url, status, updated_at) VALUES (?, ?, ?, ?)",
+                [(company_name, url, status, now) for company_name, status in statuses.items()]
+            )
+            self.db.commit()
+
+    def save_article(self, article):
+        """Store an accepted article dict (keyed by its company_name and url)"""
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO articles (company, url, article, accepted_at) VALUES (?, ?, ?, ?)",
+                (article["company_name"], article["url"], json.dumps(article, ensure_ascii=False), now)
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO attempts (company, url, status, updated_at) VALUES (?, ?, ?, ?)",
+                (article["company_name"], article["url"], ACCEPTED, now)
+            )
+            self.db.commit()
+
+    def articles(self, company_name):
+        """Accepted articles of a company, in acceptance order"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT article FROM articles WHERE company = ? ORDER BY accepted_at, rowid",
+                (company_name,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def known_copy(self, company_name, article):
+        """
+        URL of an article the company already has with the same text, or None.
+
+        A plain crawl state does not index article text, so this always
+        returns None; see refresh.ArticleIndex.
+
+        Args:
+            company_name (str): Company the article is about to be accepted for
+            article (dict): Parsed article with "url" and "content"
+        """
+        return None
+
+    def should_skip(self, url, company_names):
+        """
+        Check whether a URL is worth fetching for any of the given companies.
+
+        A URL is skipped when, for every company, it was already accepted or
+        its last negative outcome is still inside the skip window.
+
+        Args:
+            url (str): Candidate URL
+            company_names (list): Companies the URL would be checked against
+
+        Returns:
+            bool: True if the URL should not be fetched
+        """
+        if not company_names:
+            return True
+
+        placeholders = ', '.join('?' * len(company_names))
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT company, status, updated_at FROM attempts "
+                f"WHERE url = ? AND company IN ({placeholders})",
+                [url] + list(company_names)
+            ).fetchall()
+
+        now = time.time()
+        settled = set()
+        for company_name, status, updated_at in rows:
+            if status == ACCEPTED or now - updated_at < self.skip_windows.get(status, 0):
+                settled.add(company_name)
+
+        return settled.issuperset(company_names)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
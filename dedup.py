@@ -0,0 +1,164 @@
+import hashlib
+import os
+import re
+import threading
+import time
+
+from sqlite_store import connect
+
+DEFAULT_INDEX_PATH = os.path.join('.news_cache', 'simhash_index.sqlite')
+
+FINGERPRINT_BITS = 64
+
+def _shingles(text, size=3):
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+def simhash(text):
+    """
+    Compute the 64-bit SimHash of a text over its word 3-gram shingles.
+
+    Near-identical texts (the same wire story with a different intro line or
+    footer) get fingerprints that differ in only a few bits.
+
+    Args:
+        text (str): Article content
+
+    Returns:
+        int: Unsigned 64-bit fingerprint
+    """
+    hashes = [
+        format(int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big'), '064b')
+        for shingle in _shingles(text)
+    ]
+    if not hashes:
+        return 0
+
+    # Column-wise majority vote over the bit strings, done by zip in C
+    half = len(hashes) / 2
+    bits = ''.join('1' if column.count('1') > half else '0' for column in zip(*hashes))
+    return int(bits, 2)
+
+def _to_signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+class NearDuplicateIndex:
+    """
+    Persistent SimHash index for spotting republished stories.
+
+    Fingerprints are split into max_distance + 1 bands; by the pigeonhole
+    principle two fingerprints within max_distance bits agree on at least one
+    band, so a lookup is a handful of dict probes plus a popcount per
+    candidate. Entries are kept per company: the same story may be accepted
+    once for each company it concerns. Re-accepting the very same URL is
+    never treated as a duplicate, so repeat runs still return their articles.
+
+    Persist the index only where the output keeps earlier runs' articles
+    (incremental refresh): a run that writes its files from scratch would
+    otherwise drop stories an earlier run saved under another URL.
+
+    Args:
+        path (str): SQLite file the index is persisted to (None: memory only)
+        max_distance (int): Hamming distance at or below which texts are near-duplicates
+        max_age (float): Seconds after which entries are dropped on load
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, max_distance=6, max_age=14 * 24 * 60 * 60):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self.lock = threading.Lock()
+        self.buckets = {}  # (company, band, value) -> [(fingerprint, url), ...]
+        self.urls = set()  # (company, url) already indexed
+        self.duplicates = 0
+
+        self.db = None
+        if path is None:
+            return
+
+        self.db = connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                company TEXT NOT NULL,
+                url TEXT NOT NULL,
+                fingerprint INTEGER NOT NULL,
+                added_at REAL NOT NULL,
+                PRIMARY KEY (company, url)
+            )
+        """)
+        self.db.execute("DELETE FROM fingerprints WHERE added_at < ?", (time.time() - max_age,))
+        self.db.commit()
+
+        for company_name, url, fingerprint in self.db.execute(
+            "SELECT company, url, fingerprint FROM fingerprints"
+        ):
+            self._insert(company_name, _to_unsigned(fingerprint), url)
+
+    def _band_keys(self, company_name, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [
+            (company_name, band, (fingerprint >> (band * self.band_bits)) & mask)
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, company_name, fingerprint, url):
+        self.urls.add((company_name, url))
+        for key in self._band_keys(company_name, fingerprint):
+            self.buckets.setdefault(key, []).append((fingerprint, url))
+
+    def find(self, company_name, fingerprint, url=None):
+        """
+        Look for an indexed near-duplicate.
+
+        Args:
+            company_name (str): Company the article was accepted for
+            fingerprint (int): SimHash of the article content
+            url (str): URL of the article; an entry with the same URL is ignored
+
+        Returns:
+            str: URL of the near-duplicate, or None
+        """
+        with self.lock:
+            for key in self._band_keys(company_name, fingerprint):
+                for other, other_url in self.buckets.get(key, ()):
+                    if other_url != url and (other ^ fingerprint).bit_count() <= self.max_distance:
+                        return other_url
+        return None
+
+    def add(self, company_name, fingerprint, url):
+        """Index an accepted article (no-op if the URL is already indexed for the company)"""
+        with self.lock:
+            if (company_name, url) in self.urls:
+                return
+            self._insert(company_name, fingerprint, url)
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO fingerprints (company, url, fingerprint, added_at) VALUES (?, ?, ?, ?)",
+                    (company_name, url, _to_signed(fingerprint), time.time())
+                )
+                self.db.commit()
+
+    def check_and_add(self, company_name, fingerprint, url):
+        """
+        Index the article unless it near-duplicates one already indexed.
+
+        Returns:
+            str: URL of the near-duplicate (the article is then not indexed), or None
+        """
+        duplicate_of = self.find(company_name, fingerprint, url)
+        if duplicate_of is not None:
+            self.duplicates += 1
+            return duplicate_of
+        self.add(company_name, fingerprint, url)
+        return None
+
+    def close(self):
+        if self.db is not None:
+            with self.lock:
+                self.db.close()
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from article_sink import iter_jsonl
+from http_session import create_session
+from politeness import HostScheduler
+from refresh import ArticleIndex, refresh_forever
+from stand_in_site import (ARTICLE_BASE, SEARCH_URL, article_page, search_page, serve, set_pages, source_registry,
+                           write_sources)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+COMPANY = 'Acme'
+
+# name -> command line run in a scratch directory
+COMMANDS = {
+    'news_scrapV2.py': [os.path.join(HERE, 'news_scrapV2.py'), COMPANY, '--no-summaries', '--no-analysis'],
+    'batch_scrape.py': [os.path.join(HERE, 'batch_scrape.py'), 'companies.txt', '--workers', '1',
+                        '--no-summaries', '--no-analysis', '--no-metrics'],
+}
+
+def saved_urls(directory):
+    path = os.path.join(directory, f"{COMPANY}_articles.json")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [article["url"] for article in json.load(f)["articles"]]
+
+def run(command, directory, base_url):
+    env = dict(os.environ, NEWS_BASE_URL=base_url, NEWS_SOURCES_PATH=os.path.join(directory, 'sources.json'))
+    subprocess.run([sys.executable] + command, cwd=directory, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def check_fresh_runs(name, command):
+    """
+    Check that a fresh run keeps a story an earlier run saved under another URL.
+
+    The first run saves story A from one URL. The story then moves to a new
+    URL and the next run starts its output over, so it must save it again
+    instead of rejecting it as a near-duplicate of what is no longer there.
+
+    Returns:
+        list: Problems found (empty if the check passed)
+    """
+    search = SEARCH_URL.format(query=COMPANY)
+    first, moved, other = (ARTICLE_BASE + path for path in ('story-a', 'story-a-updated', 'story-b'))
+    server = serve({search: search_page([first]), first: article_page(COMPANY, 'story A')})
+    problems = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            write_sources(os.path.join(directory, 'sources.json'))
+            with open(os.path.join(directory, 'companies.txt'), 'w', encoding='utf-8') as f:
+                f.write(COMPANY + '\n')
+
+            run(command, directory, server.base_url)
+            if saved_urls(directory) != [first]:
+                problems.append(f"{name}: first run saved {saved_urls(directory)}, expected {[first]}")
+
+            set_pages(server, {
+                search: search_page([moved, other]),
+                first: (404, ''),
+                moved: article_page(COMPANY, 'story A'),
+                other: article_page(COMPANY, 'story B'),
+            })
+            # As if the cached search page had expired
+            os.remove(os.path.join(directory, '.news_cache', 'http_cache.sqlite'))
+            run(command, directory, server.base_url)
+            if sorted(saved_urls(directory)) != sorted([moved, other]):
+                problems.append(f"{name}: second run saved {saved_urls(directory)}, expected {[moved, other]}")
+    finally:
+        server.stop()
+    return problems
+
+def check_refresh_copies():
+    """
+    Check that a refresh rejects a known story under a new URL before it takes a slot.
+
+    The first refresh saves story A. The next one finds A again under a new
+    URL, listed before a genuinely new story, with room for one new article:
+    it must save the new story. Only the article index can tell, since no
+    near-duplicate index is passed.
+
+    Returns:
+        list: Problems found (empty if the check passed)
+    """
+    search = SEARCH_URL.format(query=COMPANY)
+    first, copy, other = (ARTICLE_BASE + path for path in ('story-a', 'story-a-copy', 'story-b'))
+    server = serve({search: search_page([first]), first: article_page(COMPANY, 'story A')})
+    directory = os.getcwd()
+    problems = []
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            index = ArticleIndex(os.path.join(scratch, 'article_index.sqlite'))
+            options = dict(
+                once=True, index=index, summarize=False, analyze=False, dedup=None,
+                session=create_session(base_url=server.base_url), sources=source_registry(),
+                # One fetch at a time, in link order, so the copy is always checked first
+                scheduler=HostScheduler(min_gap=0, max_per_host=1)
+            )
+            asyncio.run(refresh_forever([COMPANY], 60, max_new=1, **options))
+
+            set_pages(server, {
+                search: search_page([copy, other]),
+                copy: article_page(COMPANY, 'story A'),
+                other: article_page(COMPANY, 'story B'),
+            })
+            totals = asyncio.run(refresh_forever([COMPANY], 60, max_new=1, **options))
+            saved = [article["url"] for article in iter_jsonl(f"{COMPANY}_articles.jsonl")]
+            if saved != [first, other] or totals[COMPANY]["new"] != 1:
+                problems.append(f"refresh saved {saved} ({totals[COMPANY]['new']} new), expected {[first, other]}")
+            index.close()
+        finally:
+            os.chdir(directory)
+            server.stop()
+    return problems
+
+def main():
+    problems = check_refresh_copies()
+    for name, command in COMMANDS.items():
+        problems += check_fresh_runs(name, command)
+    for problem in problems:
+        print(f"❌ {problem}")
+
+    if problems:
+        sys.exit(1)
+    print(f"✅ Fresh runs kept stories earlier runs saved under other URLs ({len(COMMANDS)} commands), "
+          f"and a refresh rejected a known story under a new URL without losing a slot")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import importlib.util
+import os
+
+from bs4 import BeautifulSoup
+
+# Fastest first; html.parser ships with Python and is always available
+PREFERRED_BACKENDS = ['lxml', 'html.parser']
+
+# Overrides the default backend
+BACKEND_ENV = 'NEWS_PARSER_BACKEND'
+
+def available_backends():
+    """List the parser backends that can be used in this environment, fastest first"""
+    return [
+        backend for backend in PREFERRED_BACKENDS
+        if backend == 'html.parser' or importlib.util.find_spec(backend) is not None
+    ]
+
+_backend = available_backends()[0]
+
+def get_parser_backend():
+    """Return the name of the backend make_soup currently uses"""
+    return _backend
+
+def set_parser_backend(name):
+    """
+    Select the parser backend used by make_soup.
+
+    Args:
+        name (str): One of available_backends()
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    global _backend
+
+    if name not in available_backends():
+        raise ValueError(f"Parser backend {name!r} is not available (have: {', '.join(available_backends())})")
+    _backend = name
+
+def make_soup(html, backend=None):
+    """
+    Parse HTML with the selected backend.
+
+    Args:
+        html (str or bytes): Document to parse
+        backend (str): Override the selected backend for this call
+
+    Returns:
+        BeautifulSoup: Parsed document
+    """
+    return BeautifulSoup(html, backend or _backend)
+
+# Checked here, so a bad NEWS_PARSER_BACKEND fails at startup instead of on every page
+if os.environ.get(BACKEND_ENV):
+    try:
+        set_parser_backend(os.environ[BACKEND_ENV])
+    except ValueError as e:
+        raise ValueError(f"Bad {BACKEND_ENV}: {e}") from None
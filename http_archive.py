@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+
+from http_session import get_shared_session
+from news_scrapV2 import scrape_company_articles
+from sqlite_store import connect
+
+DEFAULT_ARCHIVE_PATH = os.path.join('.news_cache', 'http_archive.sqlite')
+
+# Headers worth replaying; framing and encoding headers are re-derived from the stored (decoded) body
+REPLAYED_HEADERS = {
+    'content-type', 'location', 'retry-after', 'etag', 'last-modified', 'cache-control', 'expires'
+}
+
+class ArchivedResponse:
+    """A recorded response: status, replayable headers and decoded body"""
+
+    def __init__(self, url, status_code, headers, body):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+class HttpArchive:
+    """
+    SQLite archive of recorded HTTP responses, keyed by request URL.
+
+    Redirect hops are stored as their own entries (status and Location), so
+    a replay follows the same redirect chain the live run did.
+
+    Args:
+        path (str): SQLite database file
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+        """)
+        self.db.commit()
+
+    def add(self, url, status_code, headers, body):
+        """Store (or replace) the response recorded for url"""
+        kept = {name: value for name, value in headers.items() if name.lower() in REPLAYED_HEADERS}
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (url, status, headers, body, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                (url, status_code, json.dumps(kept), zlib.compress(body), time.time())
+            )
+            self.db.commit()
+
+    def get(self, url):
+        """
+        Look up the response recorded for url.
+
+        Returns:
+            ArchivedResponse: The recording, or None
+        """
+        with self.lock:
+            row = self.db.execute(
+                "SELECT status, headers, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return ArchivedResponse(url, row[0], json.loads(row[1]), zlib.decompress(row[2]))
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+class RecordingSession:
+    """
+    Wraps a requests session and records every GET response into an archive.
+
+    Everything else (head, adapters, headers, ...) is passed through to the
+    wrapped session, so it can be handed to the scraper as its session.
+
+    Args:
+        session (requests.Session): Session doing the real requests
+        archive (HttpArchive): Where responses are recorded
+    """
+
+    def __init__(self, session, archive):
+        self.session = session
+        self.archive = archive
+
+    def get(self, url, **kwargs):
+        response = self.session.get(url, **kwargs)
+        for hop in response.history + [response]:
+            # 304s only make sense to the cache that asked for them
+            if hop.status_code != 304:
+                self.archive.add(hop.url, hop.status_code, hop.headers, hop.content)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+def record(company_name, archive_path=DEFAULT_ARCHIVE_PATH, max_articles=10):
+    """
+    Run a live scrape and record every response it gets.
+
+    The response cache is bypassed so that each page is really fetched.
+
+    Returns:
+        int: Number of responses in the archive afterwards
+    """
+    archive = HttpArchive(archive_path)
+    try:
+        scrape_company_articles(
+            company_name, max_articles, session=RecordingSession(get_shared_session(), archive)
+        )
+        return len(archive)
+    finally:
+        archive.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a live scrape into an HTTP archive for replay_server.py")
+    parser.add_argument('company', help="Company name to scrape")
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH, help="Archive file to record into")
+    parser.add_argument('--max-articles', type=int, default=10, help="Articles to scrape")
+    args = parser.parse_args()
+
+    count = record(args.company, args.archive, args.max_articles)
+    print(f"💾 {count} responses in {args.archive}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli  # noqa: F401 - urllib3 decodes 'br' only when this is importable
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive'
+}
+
+# Send every request to a stand-in server (e.g. replay_server.py) instead of the real hosts
+BASE_URL_ENV = 'NEWS_BASE_URL'
+
+_shared_session = None
+_shared_lock = threading.Lock()
+
+def stand_in_url(base_url, url):
+    """Map https://host/path?query to {base_url}/https/host/path?query"""
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ''
+    return f"{base_url.rstrip('/')}/{parts.scheme}/{parts.netloc}{parts.path or '/'}{query}"
+
+class BaseUrlAdapter(HTTPAdapter):
+    """
+    Transport adapter that sends every request to a stand-in server.
+
+    The rewrite happens below the session, so redirects, cookies, the
+    politeness scheduler and the cache all keep seeing the original URLs;
+    response.url is mapped back to the original URL as well.
+
+    Args:
+        base_url (str): Root URL of the stand-in server
+    """
+
+    def __init__(self, base_url, **kwargs):
+        self.base_url = base_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        original_url = request.url
+        request.url = stand_in_url(self.base_url, original_url)
+        try:
+            response = super().send(request, **kwargs)
+        finally:
+            request.url = original_url
+        response.url = original_url
+        return response
+
+def create_session(pool_connections=64, pool_maxsize=10, base_url=None):
+    """
+    Create a requests session with per-host keep-alive connection pools.
+
+    Args:
+        pool_connections (int): Number of per-host pools to keep around
+        pool_maxsize (int): Maximum idle connections kept per host
+        base_url (str): Send all requests to this stand-in server instead
+            (default: the NEWS_BASE_URL environment variable, if set)
+
+    Returns:
+        requests.Session: Session with the shared default headers
+    """
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+
+    base_url = base_url or os.environ.get(BASE_URL_ENV)
+    if base_url:
+        adapter = BaseUrlAdapter(base_url, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    else:
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+def get_shared_session():
+    """Return the process-wide session, creating it on first use"""
+    global _shared_session
+
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
+def connection_stats(session):
+    """
+    Report how many requests reused an existing connection, per host.
+
+    Only hosts whose pool is still cached by the session are included.
+
+    Args:
+        session (requests.Session): Session to inspect
+
+    Returns:
+        dict: Per-host request, new-connection and reused-connection counts
+    """
+    stats = {}
+    adapters = {id(a): a for a in session.adapters.values()}
+
+    for adapter in adapters.values():
+        pools = getattr(adapter, 'poolmanager', None) and adapter.poolmanager.pools
+        if not pools:
+            continue
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None or not pool.num_requests:
+                continue
+            entry = stats.setdefault(pool.host, {"requests": 0, "connections": 0, "reused": 0})
+            entry["requests"] += pool.num_requests
+            entry["connections"] += pool.num_connections
+            entry["reused"] += max(0, pool.num_requests - pool.num_connections)
+
+    return stats
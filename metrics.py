@@ -0,0 +1,201 @@
+import bisect
+import json
+import os
+import threading
+
+# Set to 'off' to swap in NullMetrics and skip all bookkeeping
+METRICS_ENV = 'NEWS_METRICS'
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    'news_queue_wait_seconds': ("Time a request waited for its polite per-host slot and a fetch slot", SECONDS_BUCKETS),
+    'news_fetch_seconds': ("Wall time of an HTTP fetch, connect and download included", SECONDS_BUCKETS),
+    'news_time_to_headers_seconds': ("Time until the response headers arrived (DNS, connect and server time)", SECONDS_BUCKETS),
+    'news_download_seconds': ("Time spent reading the response body after the headers", SECONDS_BUCKETS),
+    'news_response_bytes': ("Size of downloaded response bodies", BYTES_BUCKETS),
+    'news_prefilter_seconds': ("Raw-HTML relevance pre-filter time per article (every article)", SECONDS_BUCKETS),
+    'news_parse_seconds': ("BeautifulSoup parse time per article (pre-filtered pages are never parsed)", SECONDS_BUCKETS),
+    'news_extract_seconds': ("Title, relevance and content extraction time per article", SECONDS_BUCKETS)
+}
+
+COUNTERS = {
+    'news_responses_total': "HTTP responses by kind and status code",
+    'news_articles_total': "Article pages by outcome (duplicate is counted per company)",
+    'news_early_stops_total': "Responses dropped or cut short while streaming, by reason"
+}
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for count in self.counts:
+            total += count
+            yield total
+
+class Metrics:
+    """
+    In-process histograms and counters for the scraping pipeline.
+
+    Metric names are declared in HISTOGRAMS and COUNTERS; every observation
+    carries optional labels (e.g. kind='article'). The collected values can
+    be exported in the Prometheus text format or as JSON.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # (name, labels) -> _Histogram
+        self.counters = {}  # (name, labels) -> int
+
+    def observe(self, name, value, **labels):
+        """Add an observation to a histogram declared in HISTOGRAMS"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = _Histogram(HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        """Increment a counter declared in COUNTERS"""
+        if name not in COUNTERS:
+            raise KeyError(name)
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            for name, (help_text, buckets) in HISTOGRAMS.items():
+                children = [(labels, h) for (key, labels), h in sorted(self.histograms.items()) if key == name]
+                if not children:
+                    continue
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for labels, histogram in children:
+                    bounds = [str(bound) for bound in buckets] + ['+Inf']
+                    for bound, total in zip(bounds, histogram.cumulative()):
+                        lines.append(f"{name}_bucket{_label_text(labels, [('le', bound)])} {total}")
+                    lines.append(f"{name}_sum{_label_text(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{_label_text(labels)} {histogram.count}")
+
+            for name, help_text in COUNTERS.items():
+                children = [(labels, v) for (key, labels), v in sorted(self.counters.items()) if key == name]
+                if not children:
+                    continue
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for labels, value in children:
+                    lines.append(f"{name}{_label_text(labels)} {value}")
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def to_dict(self):
+        """
+        Summarize every metric as plain data.
+
+        Returns:
+            dict: "histograms" and "counters", each a list of entries with the
+            metric name, its labels and its values
+        """
+        with self.lock:
+            return {
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": dict(zip([str(b) for b in histogram.buckets] + ['+Inf'], histogram.cumulative()))
+                    }
+                    for (name, labels), histogram in sorted(self.histograms.items())
+                ],
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ]
+            }
+
+    def write(self, path):
+        """Export to path: JSON if it ends in .json, Prometheus text otherwise"""
+        if path.endswith('.json'):
+            text = json.dumps(self.to_dict(), indent=4)
+        else:
+            text = self.to_prometheus()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+class NullMetrics(Metrics):
+    """Drop-in Metrics that records nothing, for runs that want no overhead"""
+
+    enabled = False
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def inc(self, name, amount=1, **labels):
+        pass
+
+    def write(self, path):
+        pass
+
+_default_metrics = None
+
+def get_metrics():
+    """Return the process-wide metrics (NullMetrics if NEWS_METRICS=off)"""
+    global _default_metrics
+    if _default_metrics is None:
+        off = os.environ.get(METRICS_ENV, '').lower() in ('off', '0', 'false')
+        _default_metrics = NullMetrics() if off else Metrics()
+    return _default_metrics
+
+def observe_response(metrics, response, seconds, kind):
+    """
+    Record one completed fetch: wall time, time to headers, download time and size.
+
+    Args:
+        metrics (Metrics): Where to record
+        response (requests.Response): The response (cached stand-ins are skipped)
+        seconds (float): Wall time of the fetch
+        kind (str): 'search' or 'article'
+    """
+    if not metrics.enabled or getattr(response, 'from_cache', False):
+        return
+    metrics.inc('news_responses_total', kind=kind, status=str(response.status_code))
+    metrics.observe('news_fetch_seconds', seconds, kind=kind)
+    elapsed = getattr(response, 'elapsed', None)
+    if elapsed is not None:
+        to_headers = elapsed.total_seconds()
+        metrics.observe('news_time_to_headers_seconds', to_headers, kind=kind)
+        metrics.observe('news_download_seconds', max(0.0, seconds - to_headers), kind=kind)
+    metrics.observe('news_response_bytes', len(response.content), kind=kind)
+    stopped = getattr(response, 'rejected', None) or getattr(response, 'truncated', None)
+    if stopped:
+        metrics.inc('news_early_stops_total', kind=kind, reason=stopped)
+
+def observe_timings(metrics, result):
+    """Record the pre-filter, parse and extract times a classify_article result carries"""
+    timings = result.get("timings") if result else None
+    if timings and metrics.enabled:
+        for stage in ("prefilter", "parse", "extract"):
+            if stage in timings:
+                metrics.observe(f'news_{stage}_seconds', timings[stage])
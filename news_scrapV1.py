@@ -6,6 +6,8 @@ import random
 import re
 import sys
 
+from response_cache import get_default_cache
+
 def scrape_company_articles(company_name):
     """
     Scrape 10 articles related to the given company name using BeautifulSoup.
@@ -43,7 +45,7 @@ def scrape_company_articles(company_name):
             
         try:
             print(f"Searching: {search_url}")
-            response = requests.get(search_url, headers=headers, timeout=10)
+            response = get_default_cache().fetch(requests, search_url, kind='search', headers=headers, timeout=10)
             
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
@@ -142,7 +144,7 @@ def scrape_article_content(url, company_name):
             'Accept-Language': 'en-US,en;q=0.9'
         }
         
-        response = requests.get(url, headers=headers, timeout=15)
+        response = get_default_cache().fetch(requests, url, kind='article', headers=headers, timeout=15)
         
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -1,102 +1,434 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
 import json
-import time
-import random
 import re
 import sys
-from urllib.parse import urlparse, urljoin
+import time
+from bs4 import CData, NavigableString, Tag
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
+
+from article_sink import ArticleSink, article_filename, make_analyzer
+from dedup import NearDuplicateIndex, simhash
+from html_parser import make_soup
+from http_session import connection_stats, get_shared_session
+from metrics import get_metrics, observe_response, observe_timings
+from politeness import BACKOFF_STATUSES, HostScheduler
+from crawl_state import (CrawlState, ACCEPTED, DUPLICATE, ERROR, GONE, IRRELEVANT, NO_TITLE, TOO_SHORT,
+                         UNSUPPORTED, http_outcome)
+from relevance import get_matcher
+from sources import DEFAULT_STATS_PATH, get_registry, load_sources
+from streaming_fetch import fetch_html
+from url_canon import DEFAULT_REDIRECTS_PATH, UrlCanonicalizer
+from response_cache import get_default_cache
+
+# Search pages get a referer on top of the session's default headers
+SEARCH_HEADERS = {
+    'referer': 'https://www.google.com/'
+}
+
+def build_search_urls(company_name):
+    """Build the list of search pages to query for a company (see sources.json)"""
+    return get_registry().search_urls(company_name)
 
-def scrape_company_articles(company_name, max_articles=10):
+def parse_search_links(html, search_url, sources=None):
+    """
+    Extract the article links contained in a search page.
+    
+    Args:
+        html (str): HTML of the search page
+        search_url (str): URL the search page was fetched from
+        sources (SourceRegistry): Registry to dispatch on (default: the one loaded from sources.json)
+    
+    Returns:
+        list: De-duplicated article links
+    """
+    soup = make_soup(html)
+    
+    # Extract article links from search results and remove duplicates
+    return list(dict.fromkeys((sources or get_registry()).extract_links(soup, search_url)))
+
+def scrape_company_articles(company_name, max_articles=10, concurrency=8, **options):
     """
     Scrape articles related to the given company name using BeautifulSoup.
     
+    Thin synchronous wrapper around scrape_company_articles_async; keyword
+    options (scheduler, session, cache, parse_pool, on_article, ...) are
+    described in scrape_companies_async.
+    
     Args:
         company_name (str): The name of the company to search for
         max_articles (int): Maximum number of articles to fetch
+        concurrency (int): Number of fetches allowed in flight at once
     
     Returns:
         list: List of dictionaries containing article data
     """
-    articles = []
-    attempted_urls = set()  # Track URLs we've already tried
+    return asyncio.run(scrape_company_articles_async(company_name, max_articles, concurrency, **options))
+
+async def scrape_company_articles_async(company_name, max_articles=10, concurrency=8, **options):
+    """
+    Scrape articles related to the given company name concurrently.
     
-    # Format company name for URL
-    search_term = company_name.replace(' ', '+')
-    
-    # Try different search engines and news sites to find articles
-    search_urls = [
-        f"https://www.google.com/search?q={search_term}+news&num=30",
-        f"https://news.google.com/search?q={search_term}",
-        f"https://www.bing.com/news/search?q={search_term}&qft=interval%3D%227%22&form=PTFTNR",
-        f"https://www.reuters.com/search/news?blob={search_term}",
-        f"https://www.bloomberg.com/search?query={search_term}",
-        f"https://finance.yahoo.com/quote/{search_term}/news",
-        f"https://seekingalpha.com/search?q={search_term}",
-        f"https://www.fool.com/search/?q={search_term}"
-    ]
+    Single-company form of scrape_companies_async, which it accepts the same
+    keyword options as.
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept': 'text/html,application/xhtml+xml,application/xml',
-        'referer': 'https://www.google.com/'
-    }
+    Args:
+        company_name (str): The name of the company to search for
+        max_articles (int): Maximum number of articles to fetch
+        concurrency (int): Number of fetches allowed in flight at once
     
-    # Try to get max_articles from all sources
-    for search_url in search_urls:
-        if len(articles) >= max_articles:
-            break
-            
+    Returns:
+        list: List of dictionaries containing article data
+    """
+    results = await scrape_companies_async([company_name], max_articles, concurrency, **options)
+    return results[company_name]
+
+def scrape_companies(company_names, max_articles=10, concurrency=8, **options):
+    """
+    Scrape articles for several companies through one shared fetch pipeline.
+    
+    Thin synchronous wrapper around scrape_companies_async.
+    
+    Returns:
+        dict: Company name -> list of article dictionaries
+    """
+    return asyncio.run(scrape_companies_async(company_names, max_articles, concurrency, **options))
+
+async def scrape_companies_async(company_names, max_articles=10, concurrency=8, scheduler=None,
+                                 max_retries=2, session=None, cache=None, parse_pool=None,
+                                 on_article=None, collect=True, state=None, resume=False,
+                                 dedup=None, canonicalizer=None, sources=None, search_width=3,
+                                 metrics=None, analyzer=None):
+    """
+    Scrape articles for one or more companies concurrently.
+    
+    All search pages are fetched at once and every article link they yield is
+    scheduled straight away. Each request first waits for a polite slot on its
+    own host, then for one of the global concurrency slots, so requests to
+    different hosts run in parallel. An article URL is fetched and parsed only
+    once, even when several companies' searches turn it up, and is checked for
+    relevance against every company that still needs articles. As soon as
+    every company has max_articles relevant articles, the remaining fetches
+    are cancelled.
+    
+    With a parse_pool, raw article bytes are parsed in worker processes. A
+    fetch keeps its concurrency slot until its page has been handed to the
+    pool, so a backed-up parse stage slows the downloads instead of piling
+    pages up in memory.
+    
+    Args:
+        company_names (list): Names of the companies to search for
+        max_articles (int): Maximum number of articles to fetch per company
+        concurrency (int): Number of fetches allowed in flight at once
+        scheduler (HostScheduler): Per-host politeness scheduler (default: a new one)
+        max_retries (int): Retries for a request answered with 429/503
+        session (requests.Session): HTTP session to use (default: the shared pooled session)
+        cache (ResponseCache): On-disk response cache (default: no caching)
+        parse_pool (ParsePool): Process pool for parsing (default: parse in threads)
+        on_article (callable): Called with each article dict as soon as it is accepted
+        collect (bool): Keep accepted articles in the returned lists; turn off
+            when on_article persists them, to keep memory flat
+        state (CrawlState): Persistent crawl state; URLs with a recent negative
+            outcome are skipped, and articles its known_copy() recognizes are
+            rejected as duplicates
+        resume (bool): Continue the previous run recorded in state: its
+            accepted articles are replayed and its unattempted frontier links
+            are fetched first. Otherwise the companies' state is reset.
+        dedup (NearDuplicateIndex): Reject articles whose content nearly
+            duplicates one already accepted for the same company; they do
+            not count against max_articles
+        canonicalizer (UrlCanonicalizer): Normalizes links before they are
+            queued and remembers final post-redirect URLs (default: an
+            in-memory one)
+        sources (SourceRegistry): Search sources to query, in the order it
+            ranks them; records their yield and latency (default: the one
+            loaded from sources.json)
+        search_width (int): Search pages per company in flight at once. The
+            next source is only searched once a previous one's links have
+            all been tried, so low-ranked sources are skipped when the
+            better ones fill max_articles (None: search all at once)
+        metrics (Metrics): Receives per-stage timings, sizes and outcome
+            counts (default: get_metrics(); NullMetrics records nothing)
+        analyzer (ArticleAnalyzer): Tags the collected articles with
+            sentiment and topics, all companies in one batch, before they
+            are returned (articles passed to on_article are not tagged)
+    
+    Returns:
+        dict: Company name -> list of article dictionaries
+    """
+    results = {name: [] for name in company_names}
+    accepted = dict.fromkeys(company_names, 0)
+    open_companies = list(results)  # Companies still short of max_articles
+    attempted_urls = set()  # Track URLs we've already tried
+    link_sources = {}  # Article link -> search URL it was first found on
+    scheduler = scheduler or HostScheduler()
+    session = session or get_shared_session()
+    canonicalizer = canonicalizer or UrlCanonicalizer()
+    sources = sources or get_registry()
+    metrics = metrics or get_metrics()
+    batch = len(results) > 1
+    
+    loop = asyncio.get_running_loop()
+    # A private executor lets us abandon blocking fetches on early stop instead
+    # of waiting for them when the event loop shuts down
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    in_flight = asyncio.Semaphore(concurrency)
+    article_tasks = []
+    done = asyncio.Event()
+    
+    async def fetch(url, headers=None, kind='article', handler=None):
+        # handler(response) runs while the in-flight slot is still held
+        if cache is not None:
+            # Fresh cache entries skip the network and the politeness queue entirely
+            cached = await loop.run_in_executor(executor, cache.get_fresh, url, kind)
+            if cached is not None:
+                if handler is None:
+                    return cached
+                async with in_flight:
+                    return await handler(cached)
+            headers = dict(headers or {}, **cache.conditional_headers(url))
+        
+        for attempt in range(max_retries + 1):
+            queued = time.perf_counter()
+            async with scheduler.slot(url) as slot:
+                async with in_flight:
+                    started = time.perf_counter()
+                    metrics.observe('news_queue_wait_seconds', started - queued, kind=kind)
+                    response = await loop.run_in_executor(
+                        executor, partial(fetch_html, session, url, kind=kind, headers=headers, timeout=15)
+                    )
+                    observe_response(metrics, response, time.perf_counter() - started, kind)
+                    slot.record(response.status_code, response.headers.get('Retry-After'))
+                    if response.status_code in BACKOFF_STATUSES and attempt < max_retries:
+                        continue
+                    
+                    if cache is not None:
+                        response = await loop.run_in_executor(executor, cache.handle_response, url, response)
+                    return await handler(response) if handler else response
+    
+    async def parse_article(link, companies, response):
+        skipped = {"status": None, "url": link, "companies": [], "checked": []}
+        
+        # Redirects can land on an article another link already fetched
+        final_url = getattr(response, 'url', None) or link
+        redirected_to_known = False
+        if canonicalizer.canonicalize(final_url) != link:
+            final_url = canonicalizer.remember(link, final_url)
+            redirected_to_known = final_url in attempted_urls
+            attempted_urls.add(final_url)
+        
+        companies = [name for name in companies if name in open_companies]
+        if not companies:
+            return skipped
+        if redirected_to_known:
+            # Recorded like any other outcome, so a resumed run or refresh skips the link
+            return {"status": DUPLICATE, "url": link, "companies": [], "checked": companies}
+        if getattr(response, 'rejected', None):
+            return {"status": UNSUPPORTED, "url": link, "companies": [], "checked": companies}
+        if response.status_code != 200:
+            return {"status": http_outcome(response.status_code), "url": link, "companies": [],
+                    "checked": companies, "http_status": response.status_code}
+        if parse_pool is not None:
+            result = await parse_pool.run(
+                parse_article_bytes, response.content, response.encoding, link, companies
+            )
+        else:
+            result = await loop.run_in_executor(executor, classify_article, response.text, link, companies)
+        observe_timings(metrics, result)
+        return result
+    
+    def schedule(link):
+        # Filter out already attempted URLs (links are canonical by now)
+        if link in attempted_urls:
+            return None
+        attempted_urls.add(link)
+        task = asyncio.ensure_future(article_worker(link))
+        article_tasks.append(task)
+        return task
+    
+    async def search_worker(company_name, search_url):
+        # Returns the article tasks scheduled for the links found
+        started = loop.time()
         try:
             print(f"Searching: {search_url}")
-            response = requests.get(search_url, headers=headers, timeout=15)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract article links from search results
-                article_links = extract_links_from_search(soup, search_url)
-                
-                # Remove duplicates
-                article_links = list(dict.fromkeys(article_links))
-                
-                # Filter out already attempted URLs
-                article_links = [link for link in article_links if link not in attempted_urls]
-                
-                # Scrape content from each article link
-                for link in article_links:
-                    if len(articles) >= max_articles:
-                        break
-                    
-                    # Add to attempted URLs
-                    attempted_urls.add(link)
-                    
-                    try:
-                        # Validate URL
-                        if not is_valid_url(link):
-                            continue
-                            
-                        article_data = scrape_article_content(link, company_name)
-                        if article_data:
-                            articles.append(article_data)
-                            print(f"✅ Scraped article {len(articles)}/{max_articles}: {article_data['title'][:50]}...")
-                            
-                            # Random delay to avoid rate limiting
-                            time.sleep(random.uniform(1, 2))
-                        else:
-                            print(f"⚠️ Skipped irrelevant or invalid article: {link}")
-                    except Exception as e:
-                        print(f"❌ Error scraping article {link}: {str(e)}")
+            response = await fetch(search_url, SEARCH_HEADERS, kind='search')
+            if response.status_code != 200:
+                sources.record(search_url, loop.time() - started, failed=True)
+                return []
+            article_links = await loop.run_in_executor(
+                executor, parse_search_links, response.text, search_url, sources
+            )
+        except Exception as e:
+            print(f"❌ Error with search URL {search_url}: {str(e)}")
+            sources.record(search_url, loop.time() - started, failed=True)
+            return []
+        sources.record(search_url, loop.time() - started, len(article_links))
+        
+        # Strip tracking parameters, unwrap redirectors and drop the copies that leaves
+        article_links = list(dict.fromkeys(
+            canonicalizer.canonicalize(link) for link in article_links if is_valid_url(link)
+        ))
+        
+        if state is not None:
+            state.add_frontier(company_name, article_links)
+        for link in article_links:
+            link_sources.setdefault(link, search_url)
+        return [task for task in map(schedule, article_links) if task is not None]
+    
+    def accept(name, parsed, persist=True):
+        # Returns True if the article counted towards the company's max_articles
+        if name not in open_companies:
+            return False
+        duplicate_of = state.known_copy(name, parsed) if state is not None else None
+        if duplicate_of is None and dedup is not None:
+            fingerprint = parsed.get("simhash")
+            if fingerprint is None:
+                fingerprint = simhash(parsed["content"])
+            duplicate_of = dedup.check_and_add(name, fingerprint, parsed["url"])
+        if duplicate_of is not None:
+            print(f"🔁 Skipped near-duplicate of {duplicate_of}: {parsed['url']}")
+            metrics.inc('news_articles_total', outcome='duplicate')
+            if state is not None:
+                state.record(parsed["url"], {name: DUPLICATE})
+            return False
+        article = {
+            "company_name": name,
+            "title": parsed["title"],
+            "content": parsed["content"],
+            "url": parsed["url"]
+        }
+        accepted[name] += 1
+        if collect:
+            results[name].append(article)
+        if on_article is not None:
+            on_article(article)
+        if state is not None and persist:
+            state.save_article(article)
+        label = f"[{name}] " if batch else ""
+        print(f"✅ {label}Scraped article {accepted[name]}/{max_articles}: {parsed['title'][:50]}...")
+        if accepted[name] >= max_articles:
+            open_companies.remove(name)
+            if not open_companies:
+                done.set()
+        return True
+    
+    async def article_worker(link):
+        companies = list(open_companies)
+        search_url = link_sources.get(link)
+        try:
+            if canonicalizer.needs_resolution(link):
+                # Resolve wrapper links with HEAD requests before paying for a GET
+                async with scheduler.slot(link):
+                    async with in_flight:
+                        link = await loop.run_in_executor(
+                            executor, canonicalizer.resolve_with_head, session, link
+                        )
+                if link in attempted_urls:
+                    return
+                attempted_urls.add(link)
             
-            # Random delay between search sources
-            time.sleep(random.uniform(2, 3))
+            if state is not None and state.should_skip(link, companies):
+                return
             
+            result = await fetch(link, handler=partial(parse_article, link, companies))
+            if result["status"] is None:
+                return
+            metrics.inc('news_articles_total', outcome='http_error' if "http_status" in result else result["status"])
+            if state is not None:
+                state.record(link, company_statuses(result))
+            if result["status"] != ACCEPTED:
+                sources.record_article(search_url)
+                if result["status"] == DUPLICATE:
+                    print(f"🔁 Skipped link that redirects to an article already fetched: {link}")
+                else:
+                    print(f"⚠️ Skipped irrelevant or invalid article: {link}")
+                return
+            sources.record_article(search_url, sum(accept(name, result) for name in result["companies"]))
         except Exception as e:
-            print(f"❌ Error with search URL {search_url}: {str(e)}")
+            print(f"❌ Error scraping article {link}: {str(e)}")
+            metrics.inc('news_articles_total', outcome=ERROR)
+            sources.record_article(search_url)
+            if state is not None:
+                state.record(link, dict.fromkeys(companies, ERROR))
+    
+    def restore():
+        # Replay the previous run's articles, then queue its unattempted links
+        for name in company_names:
+            for article in state.articles(name)[:max_articles]:
+                attempted_urls.add(article["url"])
+                accept(name, article, persist=False)
+            for link in state.pending_links(name):
+                schedule(link)
+        resumed = sum(accepted.values())
+        print(f"♻️ Resumed {resumed} articles and {len(article_tasks)} pending links")
+    
+    async def crawl():
+        if state is not None and resume:
+            restore()
+        elif state is not None:
+            for name in company_names:
+                state.reset(name)
+        
+        async def search_company(name):
+            # Walk the ranked sources, at most search_width at a time
+            search_urls = sources.search_urls(name)
+            slots = asyncio.Semaphore(search_width or len(search_urls) or 1)
+            
+            async def search(search_url):
+                async with slots:
+                    if name in open_companies:
+                        await asyncio.gather(*await search_worker(name, search_url))
+            
+            await asyncio.gather(*(search(url) for url in search_urls))
+        
+        await asyncio.gather(*(search_company(name) for name in list(open_companies)))
+        await asyncio.gather(*article_tasks)
+    
+    crawler = asyncio.ensure_future(crawl())
+    stop = asyncio.ensure_future(done.wait())
     
-    print(f"Found {len(articles)}/{max_articles} articles")
-    return articles[:max_articles]
+    try:
+        await asyncio.wait([stop, crawler], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # Cancel whatever is still in flight once we have enough articles
+        pending = [crawler, stop] + article_tasks
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    host_waits = scheduler.stats()
+    if host_waits:
+        total_requests = sum(w['requests'] for w in host_waits.values())
+        total_wait = sum(w['total_wait'] for w in host_waits.values())
+        print(f"⏱️ {total_requests} requests over {len(host_waits)} hosts, "
+              f"mean queue wait {total_wait / total_requests:.2f}s")
+    pools = connection_stats(session).values()
+    if pools:
+        print(f"🔌 Connections: {sum(p['connections'] for p in pools)} opened, "
+              f"{sum(p['reused'] for p in pools)} reused")
+    source_stats = sources.stats()
+    if source_stats:
+        print("🔎 Sources: " + ", ".join(
+            f"{name} {s['accepted']}/{s['searches'] + s['article_requests']} accepted/requests "
+            f"({s['median_latency']:.1f}s)"
+            for name, s in sorted(source_stats.items(), key=lambda item: -item[1]['accepted_per_request'])
+        ))
+    sources.save_stats()
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"💾 Cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated, "
+              f"{cache_stats['misses']} misses")
+    if analyzer is not None and collect:
+        analyzer.analyze([article for articles in results.values() for article in articles])
+        analysis_stats = analyzer.stats()
+        print(f"🏷️ Analysis: {analysis_stats['analyzed']} scored, {analysis_stats['cached']} cached, "
+              f"{analysis_stats['articles_per_second']:.0f} articles/s")
+    for name, count in accepted.items():
+        label = f"[{name}] " if batch else ""
+        print(f"{label}Found {count}/{max_articles} articles")
+    return results
 
 def is_valid_url(url):
     """Validate URL format"""
@@ -108,179 +440,227 @@ def is_valid_url(url):
 
 def extract_links_from_search(soup, search_url):
     """Extract article links from a search page based on the source"""
-    article_links = []
-    
-    # Google search patterns
-    if "google.com/search" in search_url:
-        # Method 1: Look for 'g' class divs
-        for g in soup.find_all('div', class_='g'):
-            a_tags = g.find_all('a')
-            for a in a_tags:
-                href = a.get('href', '')
-                if href.startswith('http') and 'google' not in href:
-                    article_links.append(href)
-        
-        # Method 2: Look for results with h3 headers (newer Google)
-        if not article_links:
-            for h3 in soup.find_all('h3'):
-                if h3.parent and h3.parent.name == 'a':
-                    href = h3.parent.get('href', '')
-                    if href.startswith('http') and 'google' not in href:
-                        article_links.append(href)
-                elif h3.parent and h3.parent.find('a'):
-                    href = h3.parent.find('a').get('href', '')
-                    if href.startswith('http') and 'google' not in href:
-                        article_links.append(href)
-    
-    # Google News patterns
-    elif "news.google.com" in search_url:
-        for article in soup.find_all(['article', 'div'], class_=re.compile(r'NiLAwe|DHQ5pf')):
-            a_tag = article.find('a')
-            if a_tag and a_tag.get('href'):
-                href = a_tag.get('href')
-                if href.startswith('./'):
-                    href = 'https://news.google.com' + href[1:]
-                elif href.startswith('/'):
-                    href = 'https://news.google.com' + href
-                article_links.append(href)
-    
-    # Bing News patterns
-    elif "bing.com/news" in search_url:
-        for article in soup.find_all(['div', 'article'], class_=re.compile(r'news-card|newsitem|newsArticle')):
-            a_tag = article.find('a')
-            if a_tag and a_tag.get('href'):
-                article_links.append(a_tag.get('href'))
-        
-        # Alternative pattern
-        if not article_links:
-            for a in soup.find_all('a', class_=re.compile(r'title|headline')):
-                href = a.get('href', '')
-                if href and 'bing' not in href:
-                    if not href.startswith('http'):
-                        base = urlparse(search_url)
-                        href = f"{base.scheme}://{base.netloc}{href}"
-                    article_links.append(href)
-    
-    # Reuters patterns
-    elif "reuters.com" in search_url:
-        base_url = "https://www.reuters.com"
-        for article in soup.find_all(['div', 'li'], class_=re.compile(r'search-result|story-content|media-story-card')):
-            a_tag = article.find('a')
-            if a_tag and a_tag.get('href'):
-                href = a_tag.get('href')
-                if not href.startswith('http'):
-                    href = urljoin(base_url, href)
-                article_links.append(href)
-    
-    # Bloomberg patterns
-    elif "bloomberg.com" in search_url:
-        base_url = "https://www.bloomberg.com"
-        for article in soup.find_all(['article', 'div'], class_=re.compile(r'story|storyItem|searchResult')):
-            a_tag = article.find('a')
-            if a_tag and a_tag.get('href'):
-                href = a_tag.get('href')
-                if not href.startswith('http'):
-                    href = urljoin(base_url, href)
-                article_links.append(href)
-    
-    # Yahoo Finance patterns
-    elif "yahoo.com" in search_url:
-        for article in soup.find_all(['div', 'li'], class_=re.compile(r'NewsArticle|js-stream-content')):
-            a_tag = article.find('a')
-            if a_tag and a_tag.get('href'):
-                href = a_tag.get('href')
-                if not href.startswith('http'):
-                    href = urljoin("https://finance.yahoo.com", href)
-                article_links.append(href)
-    
-    # Seeking Alpha patterns
-    elif "seekingalpha.com" in search_url:
-        for article in soup.find_all(['div', 'li'], class_=re.compile(r'search-results-item|article-item')):
-            a_tag = article.find('a')
-            if a_tag and a_tag.get('href'):
-                href = a_tag.get('href')
-                if not href.startswith('http'):
-                    href = urljoin("https://seekingalpha.com", href)
-                article_links.append(href)
-    
-    # Motley Fool patterns
-    elif "fool.com" in search_url:
-        for article in soup.find_all(['div', 'li'], class_=re.compile(r'article|search-result')):
-            a_tag = article.find('a')
-            if a_tag and a_tag.get('href'):
-                href = a_tag.get('href')
-                if not href.startswith('http'):
-                    href = urljoin("https://www.fool.com", href)
-                article_links.append(href)
-    
-    # Generic method for any site
-    if not article_links:
-        # Find all links with news-related words in text or URL
-        for a in soup.find_all('a'):
-            href = a.get('href', '')
-            text = a.get_text().lower()
-            if href.startswith('http') and (
-                'article' in href or 'news' in href or 
-                'story' in href or 'press' in href or
-                'article' in text or 'news' in text
-            ):
-                article_links.append(href)
-    
-    return article_links
+    return get_registry().extract_links(soup, search_url)
 
-def scrape_article_content(url, company_name):
+def scrape_article_content(url, company_name, session=None, cache=None, metrics=None):
     """
     Scrape content from a specific article URL
     
     Args:
         url (str): URL of the article
         company_name (str): Name of the company to validate relevance
+        session (requests.Session): HTTP session to use (default: the shared pooled session)
+        cache (ResponseCache): On-disk response cache (default: no caching)
+        metrics (Metrics): Receives fetch and parse timings and the outcome (default: get_metrics())
     
     Returns:
         dict: Article data including title and content
     """
+    metrics = metrics or get_metrics()
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml,application/xml'
-        }
+        session = session or get_shared_session()
+        response = cache.get_fresh(url, 'article') if cache is not None else None
+        if response is None:
+            headers = cache.conditional_headers(url) if cache is not None else None
+            started = time.perf_counter()
+            response = fetch_html(session, url, headers=headers, timeout=15)
+            observe_response(metrics, response, time.perf_counter() - started, 'article')
+            if cache is not None:
+                response = cache.handle_response(url, response)
         
-        response = requests.get(url, headers=headers, timeout=15)
+        if getattr(response, 'rejected', None):
+            metrics.inc('news_articles_total', outcome=UNSUPPORTED)
+            return None
+        if response.status_code != 200:
+            metrics.inc('news_articles_total', outcome='http_error')
+            return None
         
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract title - try more patterns
-            title = extract_title(soup)
-            
-            # If no title found, skip this article
-            if not title:
-                return None
-                
-            # Check if article is relevant to the company
-            if not is_relevant_to_company(soup, company_name):
-                return None
-            
-            # Extract content using advanced methods
-            content = extract_content(soup)
-            
-            # If content is too short, it's probably not a real article
-            if not content or len(content) < 100:
-                return None
-                
-            return {
-                "company_name": company_name,
-                "title": title,
-                "content": content,
-                "url": url
-            }
-        
-        return None
+        result = classify_article(response.text, url, [company_name])
+        observe_timings(metrics, result)
+        metrics.inc('news_articles_total', outcome=result["status"])
+        if result["status"] != ACCEPTED:
+            return None
+        return {
+            "company_name": company_name,
+            "title": result["title"],
+            "content": result["content"],
+            "url": url
+        }
     
     except Exception as e:
         print(f"Error processing {url}: {str(e)}")
+        metrics.inc('news_articles_total', outcome=ERROR)
+        return None
+
+def parse_article_bytes(content, encoding, url, company_names):
+    """
+    Decode a raw article body and classify it; the entry point for ParsePool workers
+    
+    Args:
+        content (bytes): Raw response body
+        encoding (str): Declared encoding, or None to let the parser detect it
+        url (str): URL the article was fetched from
+        company_names (list): Companies to validate relevance against
+    
+    Returns:
+        dict: Classification result (see classify_article)
+    """
+    html = content.decode(encoding, errors='replace') if encoding else content
+    return classify_article(html, url, company_names)
+
+def parse_article_html(html, url, company_name):
+    """
+    Parse a fetched article page and extract its data
+    
+    Args:
+        html (str): HTML of the article page
+        url (str): URL the article was fetched from
+        company_name (str): Name of the company to validate relevance
+    
+    Returns:
+        dict: Article data including title and content, or None if the page
+        is irrelevant or not a real article
+    """
+    parsed = parse_article_for_companies(html, url, [company_name])
+    if not parsed:
         return None
+    
+    return {
+        "company_name": company_name,
+        "title": parsed["title"],
+        "content": parsed["content"],
+        "url": url
+    }
+
+def parse_article_for_companies(html, url, company_names):
+    """
+    Parse a fetched article page once and check it against several companies
+    
+    Args:
+        html (str): HTML of the article page
+        url (str): URL the article was fetched from
+        company_names (list): Companies to validate relevance against
+    
+    Returns:
+        dict: Title, content, url and the list of relevant companies, or None
+        if the page is relevant to none of them or is not a real article
+    """
+    result = classify_article(html, url, company_names)
+    return result if result["status"] == ACCEPTED else None
+
+def classify_article(html, url, company_names):
+    """
+    Parse an article page and say what became of it
+    
+    Args:
+        html (str): HTML of the article page
+        url (str): URL the article was fetched from
+        company_names (list): Companies to validate relevance against
+    
+    Returns:
+        dict: "status" (ACCEPTED, NO_TITLE, IRRELEVANT or TOO_SHORT), "url",
+        "title", "content", "companies" (the relevant ones), "checked"
+        (every company the page was checked against), "timings" (prefilter,
+        parse and extract seconds) and, once accepted, the content's "simhash".
+        Pages the raw-HTML pre-filter rules out are IRRELEVANT without being
+        parsed; they carry no title and no parse or extract timings.
+    """
+    started = time.perf_counter()
+    candidates = get_matcher(tuple(company_names)).candidates(html)
+    scanned = time.perf_counter()
+    if not candidates:
+        return {
+            "status": IRRELEVANT,
+            "title": None,
+            "content": None,
+            "url": url,
+            "companies": [],
+            "checked": list(company_names),
+            "timings": {"prefilter": scanned - started}
+        }
+
+    soup = make_soup(html)
+    parsed = time.perf_counter()
+    result = classify_soup(soup, url, company_names)
+    result["timings"] = {
+        "prefilter": scanned - started, "parse": parsed - scanned, "extract": time.perf_counter() - parsed
+    }
+    return result
+
+def classify_soup(soup, url, company_names):
+    """Classify an already parsed article page (see classify_article)"""
+    result = {
+        "status": NO_TITLE,
+        "title": None,
+        "content": None,
+        "url": url,
+        "companies": [],
+        "checked": list(company_names)
+    }
+    
+    # Extract title - try more patterns
+    title = extract_title(soup)
+    
+    # If no title found, skip this article
+    if not title:
+        return result
+    result["title"] = title
+        
+    # Check which companies the article is relevant to, all in one scan
+    result["companies"] = get_matcher(tuple(company_names)).relevant_companies(soup)
+    if not result["companies"]:
+        result["status"] = IRRELEVANT
+        return result
+    
+    # Extract content using advanced methods
+    content = extract_content(soup)
+    
+    # If content is too short, it's probably not a real article
+    if not content or len(content) < 100:
+        result["status"] = TOO_SHORT
+        return result
+    
+    result["content"] = content
+    result["simhash"] = simhash(content)
+    result["status"] = ACCEPTED
+    return result
+
+def company_statuses(result):
+    """Break a classify_article result down into an outcome per checked company"""
+    statuses = {}
+    for company_name in result["checked"]:
+        if company_name in result["companies"]:
+            statuses[company_name] = result["status"]
+        elif result["status"] in (NO_TITLE, UNSUPPORTED, GONE, DUPLICATE, ERROR):
+            statuses[company_name] = result["status"]
+        else:
+            statuses[company_name] = IRRELEVANT
+    return statuses
+
+# Start tags that close an open <p> (and that lxml also closes an open heading at)
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'details', 'dialog', 'div', 'dl', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hgroup', 'hr', 'main', 'menu', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'ul'
+])
+
+def leading_text(element):
+    """
+    Text of an element up to the first block element nested in it.
+
+    Parsers repair unclosed <p> and heading tags differently: lxml closes
+    them where the next block starts, html.parser nests the rest of the page
+    inside them. Stopping at the first nested block gives the same text from
+    either tree, and a well-formed paragraph or heading has no block inside.
+    """
+    parts = []
+    for descendant in element.descendants:
+        if type(descendant) is Tag:
+            if descendant.name in BLOCK_TAGS:
+                break
+        elif type(descendant) in (NavigableString, CData):
+            parts.append(descendant)
+    return ''.join(parts)
 
 def extract_title(soup):
     """Extract article title using multiple methods"""
@@ -289,12 +669,12 @@ def extract_title(soup):
         for class_name in ['headline', 'title', 'article-title', 'entry-title', 'post-title']:
             title_tag = soup.find(tag_name, class_=re.compile(class_name, re.I))
             if title_tag:
-                return title_tag.get_text().strip()
+                return leading_text(title_tag).strip()
     
     # Method 2: Just get the first h1
     h1 = soup.find('h1')
     if h1:
-        return h1.get_text().strip()
+        return leading_text(h1).strip()
     
     # Method 3: Look at title tag
     title_tag = soup.find('title')
@@ -311,54 +691,132 @@ def extract_title(soup):
     
     return None
 
+UNWANTED_TAGS = frozenset(['script', 'style', 'nav', 'footer', 'iframe', 'aside'])
+
+# Content container classes, in priority order
+CONTENT_CLASS_PATTERNS = [
+    re.compile(class_name, re.I) for class_name in [
+        'content', 'article-body', 'story-body', 'post-content', 
+        'entry-content', 'article-content', 'story-content',
+        'main-content', 'body-content', 'article__body'
+    ]
+]
+
 def extract_content(soup):
-    """Extract article content using multiple advanced methods"""
-    content = ""
+    """
+    Extract article content using multiple advanced methods.
+    
+    A single traversal collects the candidates for every method: the first
+    <article>, the first div/section for each content class and the paragraph
+    count of every div. Paragraph counts are computed bottom-up as the index
+    range each element spans in the document-order list of <p> tags, so the
+    cost is linear in the size of the document. The methods are then applied
+    in their usual priority order.
+    """
+    paragraphs = []  # Every <p> outside unwanted elements, in document order
+    repaired = []  # Per paragraph: a block is nested in it (an unclosed <p>, see leading_text)
+    open_paragraphs = []  # Indexes of the paragraphs being traversed
+    unwanted = []
+    article_span = None
+    class_spans = [None] * len(CONTENT_CLASS_PATTERNS)
+    class_found = [False] * len(CONTENT_CLASS_PATTERNS)
+    article_found = False
+    best_div = None  # (p_count, -position, span) of the div with the most paragraphs
+    position = 0
+    
+    # Entries are (node, None) on the way down and (node, (start, roles)) on the way up
+    stack = [(soup, None)]
+    while stack:
+        node, exit_info = stack.pop()
+        
+        if exit_info is not None:
+            if node.name == 'p':
+                open_paragraphs.pop()
+            start, is_article, class_indexes, div_position = exit_info
+            span = (start, len(paragraphs))
+            if is_article:
+                article_span = span
+            for index in class_indexes:
+                class_spans[index] = span
+            p_count = span[1] - span[0]
+            if div_position is not None and p_count > 0:
+                # Ties go to the earliest div in document order
+                candidate = (p_count, -div_position, span)
+                if best_div is None or candidate[:2] > best_div[:2]:
+                    best_div = candidate
+            continue
+        
+        name = node.name
+        
+        # Remove unwanted elements (their subtrees are never visited)
+        if name in UNWANTED_TAGS:
+            unwanted.append(node)
+            continue
+        
+        position += 1
+        is_article = False
+        class_indexes = ()
+        div_position = None
+        
+        start = len(paragraphs)
+        if name in BLOCK_TAGS:
+            for index in open_paragraphs:
+                repaired[index] = True
+        if name == 'p':
+            open_paragraphs.append(len(paragraphs))
+            paragraphs.append(node)
+            repaired.append(False)
+        elif name == 'article' and not article_found:
+            article_found = is_article = True
+        
+        if name in ('div', 'section'):
+            classes = node.get('class') or ()
+            if isinstance(classes, str):
+                classes = classes.split()
+            if classes:
+                class_indexes = [
+                    index for index, pattern in enumerate(CONTENT_CLASS_PATTERNS)
+                    if not class_found[index] and any(pattern.search(c) for c in classes)
+                ]
+                for index in class_indexes:
+                    class_found[index] = True
+            if name == 'div':
+                div_position = position
+        
+        stack.append((node, (start, is_article, class_indexes, div_position)))
+        stack.extend(
+            (child, None) for child in reversed(node.contents) if isinstance(child, Tag)
+        )
+    
+    for element in unwanted:
+        element.decompose()
     
-    # Remove unwanted elements
-    for unwanted in soup.find_all(['script', 'style', 'nav', 'footer', 'iframe', 'aside']):
-        unwanted.decompose()
+    def join(span):
+        return ' '.join([
+            (leading_text(paragraphs[index]) if repaired[index] else paragraphs[index].get_text()).strip()
+            for index in range(*span)
+        ])
+    
+    content = ""
     
     # Method 1: Look for article tag
-    article_tag = soup.find('article')
-    if article_tag:
-        paragraphs = article_tag.find_all('p')
-        if paragraphs:
-            content = ' '.join([p.get_text().strip() for p in paragraphs])
+    if article_span and article_span[1] > article_span[0]:
+        content = join(article_span)
     
     # Method 2: Look for common content div classes
     if not content:
-        content_classes = [
-            'content', 'article-body', 'story-body', 'post-content', 
-            'entry-content', 'article-content', 'story-content',
-            'main-content', 'body-content', 'article__body'
-        ]
-        
-        for class_name in content_classes:
-            content_div = soup.find(['div', 'section'], class_=re.compile(class_name, re.I))
-            if content_div:
-                paragraphs = content_div.find_all('p')
-                if paragraphs:
-                    content = ' '.join([p.get_text().strip() for p in paragraphs])
-                    break
+        for span in class_spans:
+            if span and span[1] > span[0]:
+                content = join(span)
+                break
     
     # Method 3: Find the div with the most paragraph tags
-    if not content:
-        div_p_counts = {}
-        for div in soup.find_all('div'):
-            p_count = len(div.find_all('p'))
-            if p_count > 0:
-                div_p_counts[div] = p_count
-        
-        if div_p_counts:
-            main_content_div = max(div_p_counts.items(), key=lambda x: x[1])[0]
-            paragraphs = main_content_div.find_all('p')
-            content = ' '.join([p.get_text().strip() for p in paragraphs])
+    if not content and best_div:
+        content = join(best_div[2])
     
     # Method 4: Just get all paragraphs if specific containers weren't found
     if not content:
-        paragraphs = soup.find_all('p')
-        content = ' '.join([p.get_text().strip() for p in paragraphs])
+        content = join((0, len(paragraphs)))
     
     # Clean up content
     content = re.sub(r'\s+', ' ', content).strip()
@@ -369,6 +827,9 @@ def is_relevant_to_company(soup, company_name):
     """
     Check if the article is relevant to the company using advanced methods.
     
+    The company is relevant if it is mentioned in the <title> or at least
+    twice in the page text, counting exact, no-space and $TICKER variants.
+    
     Args:
         soup (BeautifulSoup): Parsed HTML
         company_name (str): Company name to check for
@@ -376,31 +837,7 @@ def is_relevant_to_company(soup, company_name):
     Returns:
         bool: True if relevant, False otherwise
     """
-    # Extract all text
-    text = soup.get_text().lower()
-    
-    # Create patterns for company name variations
-    patterns = [
-        re.compile(r'\b' + re.escape(company_name.lower()) + r'\b'),  # Exact match
-        re.compile(r'\b' + re.escape(company_name.lower().replace(' ', '')) + r'\b')  # No spaces
-    ]
-    
-    # Add ticker symbol pattern if company name looks like it could be one
-    if len(company_name) <= 5 and company_name.isalpha():
-        patterns.append(re.compile(r'\$' + re.escape(company_name.upper())))
-    
-    # Count total occurrences across all patterns
-    total_count = sum(len(pattern.findall(text)) for pattern in patterns)
-    
-    # Check if company name is in title (higher relevance)
-    title_tag = soup.find('title')
-    title_relevance = False
-    if title_tag:
-        title_text = title_tag.get_text().lower()
-        title_relevance = any(pattern.search(title_text) for pattern in patterns)
-    
-    # If company mentioned in title or at least twice in text, consider it relevant
-    return title_relevance or total_count >= 2
+    return get_matcher((company_name,)).match(soup)[company_name]["relevant"]
 
 def save_to_json(articles, company_name):
     """
@@ -410,7 +847,7 @@ def save_to_json(articles, company_name):
         articles (list): List of article dictionaries
         company_name (str): Name of the company
     """
-    filename = f"{company_name.replace(' ', '_')}_articles.json"
+    filename = article_filename(company_name)
     
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump({"articles": articles}, f, indent=4, ensure_ascii=False)
@@ -418,17 +855,46 @@ def save_to_json(articles, company_name):
     print(f"Saved {len(articles)} articles to {filename}")
 
 def main():
-    if len(sys.argv) > 1:
-        company_name = ' '.join(sys.argv[1:])
+    # --resume continues the previous (interrupted) run for this company
+    args = sys.argv[1:]
+    resume = '--resume' in args
+    # --metrics=PATH writes stage timings and outcome counts (.json or Prometheus text)
+    metrics_path = next((arg.split('=', 1)[1] for arg in args if arg.startswith('--metrics=')), None)
+    # --no-summaries / --no-analysis save the articles without summaries / sentiment and topics
+    summarize = '--no-summaries' not in args
+    analyze = '--no-analysis' not in args
+    flags = ('--resume', '--no-summaries', '--no-analysis')
+    args = [arg for arg in args if arg not in flags and not arg.startswith('--metrics=')]
+    
+    if args:
+        company_name = ' '.join(args)
     else:
         company_name = input("Enter company name to search for: ")
     
     print(f"🔍 Searching for articles about {company_name}...")
-    articles = scrape_company_articles(company_name, max_articles=10)
     
-    if articles:
-        save_to_json(articles, company_name)
-        print(f"✅ Successfully scraped {len(articles)} articles about {company_name}")
+    # Articles are streamed to <company>_articles.jsonl as they are accepted
+    sink = ArticleSink()
+    # The output files start over every run, so articles saved by earlier runs must
+    # not count as duplicates; a resumed run re-indexes the articles it restores
+    dedup = NearDuplicateIndex(path=None)
+    try:
+        scrape_company_articles(
+            company_name, max_articles=10, cache=get_default_cache(),
+            on_article=sink.write, collect=False, state=CrawlState(), resume=resume,
+            dedup=dedup, canonicalizer=UrlCanonicalizer(DEFAULT_REDIRECTS_PATH),
+            sources=load_sources(stats_path=DEFAULT_STATS_PATH)
+        )
+    finally:
+        sink.close()
+        if metrics_path:
+            get_metrics().write(metrics_path)
+    
+    count = sink.counts.get(company_name, 0)
+    if count:
+        analyzer = make_analyzer(analyze)
+        sink.finalize(summarize=summarize, analyzer=analyzer)
+        print(f"✅ Successfully scraped {count} articles about {company_name}")
     else:
         print(f"❌ No articles found for {company_name}")
 
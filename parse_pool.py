@@ -0,0 +1,112 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+class ParsePool:
+    """
+    Process pool for the CPU-bound parse/extract stage.
+
+    Network code hands raw page bytes to run(); the work happens in a worker
+    process and only the small result comes back, so parsing is not
+    serialized behind the GIL. At most max_pending jobs are queued or running
+    at once; further callers wait, which pushes back on the fetchers.
+
+    If a worker process dies, every job in the pool fails with it, so the
+    pool is replaced and each affected job is rerun on its own, one at a
+    time, in a separate single-worker pool. Only a job that kills that
+    worker too is given up on with BrokenProcessPool; the innocent jobs
+    that shared the pool with it still succeed.
+
+    Args:
+        workers (int): Number of worker processes (default: one per CPU)
+        max_pending (int): Jobs allowed to be queued or running (default: 4 per worker)
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.crashes = 0
+        self.poisoned = 0
+        self.completed = 0
+
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._generation = 0
+        self._isolation = None  # Single-worker pool for rerunning jobs alone
+        self._slots = None
+        self._alone = None
+        self._slots_loop = None
+
+    def _get_slots(self):
+        # Semaphores are bound to the event loop they are first used on
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._alone = asyncio.Lock()
+            self._slots_loop = loop
+        return self._slots
+
+    def _restart(self, generation):
+        """Replace a broken executor, unless another job already did"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self.crashes += 1
+            print(f"💥 Parse worker crashed, restarting pool ({self.crashes} so far)")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._generation += 1
+
+    async def run(self, func, *args):
+        """
+        Run func(*args) in a worker process.
+
+        Args:
+            func: Module-level (picklable) function
+            *args: Picklable arguments
+
+        Returns:
+            Whatever func returns
+        """
+        loop = asyncio.get_running_loop()
+
+        async with self._get_slots():
+            with self._lock:
+                executor, generation = self._executor, self._generation
+            try:
+                result = await loop.run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                self._restart(generation)
+                # This job may just have shared the pool with the one that crashed
+                result = await self._run_alone(func, args)
+            self.completed += 1
+            return result
+
+    async def _run_alone(self, func, args):
+        """Run a job with no other job beside it, to tell a crasher from its bystanders"""
+        loop = asyncio.get_running_loop()
+        async with self._alone:
+            if self._isolation is None:
+                self._isolation = ProcessPoolExecutor(max_workers=1)
+            try:
+                return await loop.run_in_executor(self._isolation, func, *args)
+            except BrokenProcessPool:
+                self.poisoned += 1
+                self._isolation.shutdown(wait=False, cancel_futures=True)
+                self._isolation = None
+                raise
+
+    def close(self):
+        """Shut the worker processes down"""
+        with self._lock:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            if self._isolation is not None:
+                self._isolation.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
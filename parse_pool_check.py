@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+from concurrent.futures.process import BrokenProcessPool
+
+from parse_pool import ParsePool
+
+# Input that kills the worker process parsing it
+POISON = 'poison'
+
+def parse_or_crash(page):
+    """Stand-in parse job: dies like a parser segfault on POISON"""
+    if page == POISON:
+        os._exit(1)
+    return page.upper()
+
+async def run_mixed(pages, workers=2):
+    with ParsePool(workers=workers) as pool:
+        results = await asyncio.gather(*(pool.run(parse_or_crash, page) for page in pages),
+                                       return_exceptions=True)
+        return results, pool.poisoned
+
+def check_poison_isolation(good_count=8):
+    """
+    Check that a page that crashes its worker fails alone.
+
+    The poison page is submitted at the same time as good pages, so they
+    share the pool it breaks; every good page must still be parsed.
+
+    Returns:
+        list: Problems found (empty if the check passed)
+    """
+    pages = [POISON] + [f"page {number}" for number in range(good_count)]
+    results, poisoned = asyncio.run(run_mixed(pages))
+
+    problems = []
+    if not isinstance(results[0], BrokenProcessPool):
+        problems.append(f"poison page returned {results[0]!r} instead of BrokenProcessPool")
+    for page, result in zip(pages[1:], results[1:]):
+        if result != page.upper():
+            problems.append(f"good page {page!r} returned {result!r}")
+    if poisoned != 1:
+        problems.append(f"{poisoned} jobs given up on instead of 1")
+    return problems
+
+def main():
+    problems = check_poison_isolation()
+    for problem in problems:
+        print(f"❌ {problem}")
+
+    if problems:
+        sys.exit(1)
+    print("✅ A crashing page failed alone; every page parsed beside it succeeded")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+
+from html_parser import available_backends, make_soup
+from news_scrapV2 import extract_content, extract_title, is_relevant_to_company
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'articles')
+
+def extract_all(html, company_name, backend):
+    """Run the article extractors on one document with the given backend"""
+    soup = make_soup(html, backend)
+    title = extract_title(soup)
+    relevant = is_relevant_to_company(soup, company_name)
+    content = extract_content(soup)
+    return {"title": title, "relevant": relevant, "content": content}
+
+def check_parity(fixture_dir=DEFAULT_FIXTURES):
+    """
+    Compare extractor output across every available backend.
+
+    The corpus is described by manifest.json in fixture_dir, mapping each HTML
+    file to the company name it should be checked against. Documents marked as
+    not well formed (unclosed <p>, <li> and heading tags, stray end tags...)
+    are checked too: the backends build different trees for them, and the
+    extractors must still agree, as most real pages are malformed somewhere.
+
+    Args:
+        fixture_dir (str): Directory holding the HTML corpus and manifest.json
+
+    Returns:
+        list: (filename, backend, field) tuples for every mismatch
+    """
+    with open(os.path.join(fixture_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    backends = available_backends()
+    reference = backends[-1]  # html.parser is the historical behavior
+    mismatches = []
+
+    for filename, entry in sorted(manifest.items()):
+        company_name = entry['company']
+        with open(os.path.join(fixture_dir, filename), encoding='utf-8') as f:
+            html = f.read()
+
+        expected = extract_all(html, company_name, reference)
+        for backend in backends[:-1]:
+            actual = extract_all(html, company_name, backend)
+            for field, value in expected.items():
+                if actual[field] != value:
+                    mismatches.append((filename, backend, field))
+
+    return mismatches
+
+def main():
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURES
+    print(f"Backends: {', '.join(available_backends())}")
+
+    mismatches = check_parity(fixture_dir)
+    for filename, backend, field in mismatches:
+        print(f"❌ {filename}: {backend} differs from html.parser on {field}")
+
+    if mismatches:
+        sys.exit(1)
+    print("✅ All backends agree")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Status codes that mean the host wants us to slow down
+BACKOFF_STATUSES = (429, 503)
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value into a delay in seconds.
+
+    Args:
+        value (str): Header value, either delta-seconds or an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class _HostState:
+    """Politeness bookkeeping for a single host"""
+
+    def __init__(self, max_per_host):
+        self.semaphore = asyncio.Semaphore(max_per_host)
+        self.lock = asyncio.Lock()
+        self.next_allowed = 0.0
+        self.failures = 0
+        self.waits = []
+
+class _Slot:
+    """Handle returned by HostScheduler.slot for reporting the response"""
+
+    def __init__(self, scheduler, host, waited):
+        self.scheduler = scheduler
+        self.host = host
+        self.waited = waited
+
+    def record(self, status_code, retry_after=None):
+        """Report the response status (and Retry-After header) back to the scheduler"""
+        self.scheduler.record(self.host, status_code, retry_after)
+
+class HostScheduler:
+    """
+    Per-host politeness scheduler.
+
+    Each host gets its own minimum gap between request starts and its own cap
+    on concurrent requests, so a delay for one site never blocks another.
+    429/503 responses push the host's next allowed start back, honouring
+    Retry-After when the server sends one and backing off exponentially
+    otherwise.
+
+    Args:
+        min_gap (float): Minimum seconds between request starts to one host
+        max_per_host (int): Maximum concurrent requests to one host
+        max_backoff (float): Upper bound in seconds for a single backoff
+    """
+
+    def __init__(self, min_gap=1.0, max_per_host=2, max_backoff=60.0):
+        self.min_gap = min_gap
+        self.max_per_host = max_per_host
+        self.max_backoff = max_backoff
+        self.hosts = {}
+
+    def _state(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = _HostState(self.max_per_host)
+        return self.hosts[host]
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """
+        Wait for a polite slot to request url and hold it for the request.
+
+        Usage:
+            async with scheduler.slot(url) as slot:
+                response = ...
+                slot.record(response.status_code, response.headers.get('Retry-After'))
+        """
+        host = urlparse(url).netloc.lower()
+        state = self._state(host)
+        queued_at = time.monotonic()
+
+        async with state.semaphore:
+            # Space out request starts; the lock keeps the reservations ordered
+            async with state.lock:
+                # Re-check after sleeping in case a backoff arrived meanwhile
+                delay = state.next_allowed - time.monotonic()
+                while delay > 0:
+                    await asyncio.sleep(delay)
+                    delay = state.next_allowed - time.monotonic()
+                state.next_allowed = time.monotonic() + self.min_gap
+
+            waited = time.monotonic() - queued_at
+            state.waits.append(waited)
+            yield _Slot(self, host, waited)
+
+    def record(self, host, status_code, retry_after=None):
+        """Update the host's backoff state from a response status"""
+        state = self._state(host)
+
+        if status_code not in BACKOFF_STATUSES:
+            state.failures = 0
+            return
+
+        state.failures += 1
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = max(self.min_gap, 1.0) * (2 ** state.failures)
+        delay = min(delay, self.max_backoff)
+
+        state.next_allowed = max(state.next_allowed, time.monotonic() + delay)
+        print(f"⏳ {host} returned {status_code}, backing off {delay:.1f}s")
+
+    def stats(self):
+        """
+        Summarize how long requests waited in each host's queue.
+
+        Returns:
+            dict: Per-host request count, total, mean and max wait in seconds
+        """
+        summary = {}
+        for host, state in self.hosts.items():
+            if not state.waits:
+                continue
+            summary[host] = {
+                "requests": len(state.waits),
+                "total_wait": sum(state.waits),
+                "mean_wait": sum(state.waits) / len(state.waits),
+                "max_wait": max(state.waits)
+            }
+        return summary
@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+
+from html_parser import available_backends, make_soup
+from relevance import get_matcher
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Checked against every page on top of the companies the manifests name
+EXTRA_COMPANIES = ['Rivian', 'Ford', 'Bank of America', 'Meta', 'AT&T', 'GM', 'Intel', 'Google']
+
+def load_pages(fixtures_dir=FIXTURES):
+    """
+    Collect every HTML page of the fixture corpora and the companies they name.
+
+    Returns:
+        tuple: ([(path, html), ...], [company name, ...])
+    """
+    pages = []
+    companies = []
+
+    for root, _, filenames in os.walk(fixtures_dir):
+        if 'manifest.json' in filenames:
+            with open(os.path.join(root, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if 'company' in manifest:
+                companies.append(manifest['company'])
+            else:
+                companies += [entry['company'] for entry in manifest.values()]
+        for filename in sorted(filenames):
+            if filename.endswith('.html'):
+                path = os.path.join(root, filename)
+                with open(path, encoding='utf-8') as f:
+                    pages.append((path, f.read()))
+
+    return pages, list(dict.fromkeys(companies))
+
+def check_prefilter(fixtures_dir=FIXTURES, companies=None):
+    """
+    Check that the raw-HTML pre-filter never drops a page the full check accepts.
+
+    Every page is checked against every company, with every available parser
+    backend: a company the parsed page is relevant to must be among
+    CompanyMatcher.candidates() for the raw HTML, both as text and as bytes.
+
+    Args:
+        fixtures_dir (str): Directory searched for HTML pages and manifest.json files
+        companies (list): Companies to check (default: the manifests' plus EXTRA_COMPANIES)
+
+    Returns:
+        tuple: (list of (path, backend, company) misses, pages checked,
+        company checks the pre-filter skipped)
+    """
+    pages, named = load_pages(fixtures_dir)
+    companies = companies or list(dict.fromkeys(named + EXTRA_COMPANIES))
+    misses = []
+    skipped = 0
+
+    for path, html in pages:
+        for company_name in companies:
+            matcher = get_matcher((company_name,))
+            kept = matcher.candidates(html)
+            kept_bytes = matcher.candidates(html.encode('utf-8'))
+            if not kept:
+                skipped += 1
+            for backend in available_backends():
+                relevant = matcher.relevant_companies(make_soup(html, backend))
+                if relevant and not (kept and kept_bytes):
+                    misses.append((path, backend, company_name))
+
+    return misses, len(pages), skipped
+
+def main():
+    fixtures_dir = sys.argv[1] if len(sys.argv) > 1 else FIXTURES
+    misses, page_count, skipped = check_prefilter(fixtures_dir)
+    for path, backend, company_name in misses:
+        print(f"❌ {os.path.relpath(path, fixtures_dir)}: relevant to {company_name} with {backend}, dropped by the pre-filter")
+
+    if misses:
+        sys.exit(1)
+    print(f"✅ Pre-filter kept every relevant page ({page_count} pages, {skipped} company checks skipped without parsing)")
+
+if __name__ == "__main__":
+    main()
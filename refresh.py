@@ -0,0 +1,301 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+
+from article_sink import ArticleSink, iter_jsonl, make_analyzer
+from batch_scrape import read_company_names
+from crawl_state import (CrawlState, DEFAULT_SKIP_WINDOWS, ACCEPTED, DUPLICATE, GONE, IRRELEVANT,
+                         NO_TITLE, TOO_SHORT, UNSUPPORTED)
+from dedup import NearDuplicateIndex
+from news_scrapV2 import scrape_company_articles_async
+from politeness import HostScheduler
+from response_cache import ResponseCache
+from sources import DEFAULT_STATS_PATH, load_sources
+from url_canon import DEFAULT_REDIRECTS_PATH, UrlCanonicalizer
+
+DEFAULT_INDEX_PATH = os.path.join('.news_cache', 'article_index.sqlite')
+
+# An article page rarely changes, so a rejected URL stays known much longer than in
+# a crawl; only transient errors (ERROR: timeouts, 429, 5xx) keep their short window
+REFRESH_SKIP_WINDOWS = dict(DEFAULT_SKIP_WINDOWS, **{
+    outcome: 30 * 24 * 60 * 60
+    for outcome in (IRRELEVANT, NO_TITLE, TOO_SHORT, DUPLICATE, UNSUPPORTED, GONE)
+})
+
+def content_hash(content):
+    """Hash of an article's text, ignoring case and whitespace"""
+    return hashlib.sha1(' '.join(content.lower().split()).encode('utf-8')).hexdigest()
+
+class ArticleIndex(CrawlState):
+    """
+    Per-company index of known article URLs and content hashes.
+
+    Passed to the scraper as its crawl state, it makes a run incremental: a
+    link whose URL is already known for the company (accepted, or rejected
+    within its skip window) is skipped before it is fetched, so a refresh
+    only pays for the search pages and the genuinely new links. Unlike a
+    plain CrawlState, starting a run keeps what the company already has.
+
+    The hash of every accepted article's text is kept too: the scraper asks
+    known_copy() before accepting an article, so the same story turning up
+    under a new URL is rejected as a duplicate instead of taking a slot.
+
+    Args:
+        path (str): SQLite database file
+        skip_windows (dict): Seconds to skip a URL after each negative outcome
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, skip_windows=None):
+        super().__init__(path, dict(REFRESH_SKIP_WINDOWS, **(skip_windows or {})))
+        self.skipped = 0
+        with self.lock:
+            self.db.executescript("""
+                CREATE TABLE IF NOT EXISTS hashes (
+                    company TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    PRIMARY KEY (company, hash)
+                );
+                CREATE TABLE IF NOT EXISTS refreshes (
+                    company TEXT PRIMARY KEY,
+                    refreshed_at REAL NOT NULL
+                );
+            """)
+            # Negative outcomes past every skip window would be retried anyway
+            self.db.execute(
+                "DELETE FROM attempts WHERE status != ? AND updated_at < ?",
+                (ACCEPTED, time.time() - max(self.skip_windows.values()))
+            )
+            self.db.commit()
+
+    def reset(self, company_name):
+        """Forget the company's frontier only: known articles are the point of the index"""
+        with self.lock:
+            self.db.execute("DELETE FROM frontier WHERE company = ?", (company_name,))
+            self.db.commit()
+
+    def should_skip(self, url, company_names):
+        skip = super().should_skip(url, company_names)
+        if skip:
+            self.skipped += 1
+        return skip
+
+    def save_article(self, article):
+        super().save_article(article)
+        with self.lock:
+            self.db.execute(
+                "INSERT OR IGNORE INTO hashes (company, hash, url) VALUES (?, ?, ?)",
+                (article["company_name"], content_hash(article["content"]), article["url"])
+            )
+            self.db.commit()
+
+    def known_copy(self, company_name, article):
+        """URL the article's text was first accepted under for the company, if not this one"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url FROM hashes WHERE company = ? AND hash = ?",
+                (company_name, content_hash(article["content"]))
+            ).fetchone()
+        return row[0] if row and row[0] != article["url"] else None
+
+    def article_count(self, company_name):
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM articles WHERE company = ?", (company_name,)
+            ).fetchone()[0]
+
+    def seed(self, company_name, articles):
+        """
+        Index articles the company already has (e.g. from an earlier full run).
+
+        Returns:
+            int: Number of articles indexed
+        """
+        count = 0
+        for article in articles:
+            self.save_article(dict(article, company_name=company_name))
+            count += 1
+        return count
+
+    def last_refresh(self, company_name):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT refreshed_at FROM refreshes WHERE company = ?", (company_name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_refreshed(self, company_name, refreshed_at=None):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO refreshes (company, refreshed_at) VALUES (?, ?)",
+                (company_name, time.time() if refreshed_at is None else refreshed_at)
+            )
+            self.db.commit()
+
+def schedule_refreshes(company_names, interval, index, now=None):
+    """
+    First due time of each company, spread evenly over the refresh interval.
+
+    A company refreshed before is due one interval after its last refresh
+    (or straight away if that has passed), so a restart neither re-refreshes
+    everything at once nor loses the spread. New companies get evenly spaced
+    slots within the first interval.
+
+    Args:
+        company_names (list): Companies to refresh
+        interval (float): Seconds between refreshes of one company
+        index (ArticleIndex): Holds the last refresh times
+        now (float): Current time.time() (default: now)
+
+    Returns:
+        dict: Company name -> time.time() it is next due
+    """
+    now = time.time() if now is None else now
+    due = {}
+    for position, company_name in enumerate(company_names):
+        last = index.last_refresh(company_name)
+        if last is None:
+            due[company_name] = now + interval * position / len(company_names)
+        else:
+            due[company_name] = max(now, last + interval)
+    return due
+
+async def refresh_company(company_name, index, max_new=10, directory='.', summarize=True, analyzer=None,
+                          **options):
+    """
+    Fetch a company's search pages and scrape only the links it does not know yet.
+
+    New articles are appended to <company>_articles.jsonl and, when there are
+    any, the company's JSON file is rewritten with all of its articles. The
+    first refresh of a company seeds the index from its existing .jsonl file.
+
+    Args:
+        company_name (str): Company to refresh
+        index (ArticleIndex): Known URLs and content hashes
+        max_new (int): Most new articles to take this time
+        directory (str): Where the article files are
+        summarize (bool): Add summaries when rewriting the JSON file
+        analyzer (ArticleAnalyzer): Add sentiment and topics when rewriting it
+        **options: Passed to scrape_companies_async (scheduler, cache, ...)
+
+    Returns:
+        dict: "new" articles saved, "skipped" known links, "requests" sent
+    """
+    sink = ArticleSink(directory, append=True)
+    if not index.article_count(company_name) and os.path.exists(sink.path(company_name)):
+        seeded = index.seed(company_name, iter_jsonl(sink.path(company_name)))
+        print(f"📇 [{company_name}] Indexed {seeded} existing articles")
+
+    scheduler = options.get("scheduler")
+    requests_before = sum(s['requests'] for s in scheduler.stats().values()) if scheduler else 0
+    skipped_before = index.skipped
+    try:
+        await scrape_company_articles_async(
+            company_name, max_new, on_article=sink.write, collect=False, state=index, resume=False,
+            **options
+        )
+    finally:
+        sink.close()
+    index.mark_refreshed(company_name)
+
+    new = sink.counts.get(company_name, 0)
+    if new:
+        sink.finalize(summarize=summarize, analyzer=analyzer)
+    return {
+        "new": new,
+        "skipped": index.skipped - skipped_before,
+        "requests": (sum(s['requests'] for s in scheduler.stats().values()) if scheduler else 0) - requests_before
+    }
+
+async def refresh_forever(company_names, interval, max_new=10, once=False, index=None, summarize=True,
+                          analyze=True, **options):
+    """
+    Refresh every company once per interval, spread out over the interval.
+
+    Companies are refreshed one at a time in due order through one shared
+    politeness scheduler, response cache and source registry. Search pages
+    are always revalidated (a 304 costs next to nothing), so each refresh
+    sees the current results.
+
+    Args:
+        company_names (list): Companies to keep fresh
+        interval (float): Seconds between refreshes of one company
+        max_new (int): Most new articles per company per refresh
+        once (bool): Refresh every company once, without waiting, and return
+        index (ArticleIndex): Known articles (default: the one at DEFAULT_INDEX_PATH)
+        summarize (bool): Add summaries when rewriting a company's JSON file
+        analyze (bool): Add sentiment and topics when rewriting it
+        **options: Passed to scrape_companies_async
+
+    Returns:
+        dict: Company name -> totals of its refresh_company() reports
+    """
+    index = index or ArticleIndex()
+    options.setdefault("scheduler", HostScheduler())
+    options.setdefault("cache", ResponseCache(ttls={'search': 0}))
+    options.setdefault("dedup", NearDuplicateIndex())
+    options.setdefault("canonicalizer", UrlCanonicalizer(DEFAULT_REDIRECTS_PATH))
+    options.setdefault("sources", load_sources(stats_path=DEFAULT_STATS_PATH))
+    analyzer = make_analyzer(analyze)
+
+    due = schedule_refreshes(company_names, interval, index)
+    if once:
+        due = dict.fromkeys(company_names, 0)
+    totals = {name: {"refreshes": 0, "new": 0, "skipped": 0, "requests": 0} for name in company_names}
+
+    while due:
+        company_name = min(due, key=due.get)
+        delay = due[company_name] - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        try:
+            report = await refresh_company(company_name, index, max_new, summarize=summarize,
+                                           analyzer=analyzer, **options)
+        except Exception as e:
+            print(f"❌ Error refreshing {company_name}: {str(e)}")
+            report = {"new": 0, "skipped": 0, "requests": 0}
+        print(f"🔄 [{company_name}] {report['new']} new articles, {report['skipped']} known links skipped, "
+              f"{report['requests']} requests")
+        totals[company_name]["refreshes"] += 1
+        for key, value in report.items():
+            totals[company_name][key] += value
+
+        if once:
+            del due[company_name]
+        else:
+            # Keep the company's slot; skip slots missed while a refresh overran
+            due[company_name] += interval
+            while due[company_name] <= time.time():
+                due[company_name] += interval
+
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep a watchlist's article files up to date, fetching only new articles")
+    parser.add_argument('companies_file', help="File with one company name per line")
+    parser.add_argument('--interval', type=float, default=3600, help="Seconds between refreshes of one company")
+    parser.add_argument('--max-new', type=int, default=10, help="Most new articles per company per refresh")
+    parser.add_argument('--once', action='store_true', help="Refresh every company once and exit")
+    parser.add_argument('--no-summaries', action='store_true', help="Save the articles without summaries")
+    parser.add_argument('--no-analysis', action='store_true', help="Save the articles without sentiment and topics")
+    args = parser.parse_args()
+
+    company_names = read_company_names(args.companies_file)
+    print(f"🔄 Refreshing {len(company_names)} companies every {args.interval:.0f}s")
+    try:
+        totals = asyncio.run(refresh_forever(
+            company_names, args.interval, args.max_new, args.once,
+            summarize=not args.no_summaries, analyze=not args.no_analysis
+        ))
+    except KeyboardInterrupt:
+        return
+
+    refreshes = sum(t['refreshes'] for t in totals.values())
+    print(f"📊 {refreshes} refreshes: {sum(t['new'] for t in totals.values())} new articles, "
+          f"{sum(t['requests'] for t in totals.values()) / max(refreshes, 1):.1f} requests per refresh")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import html as html_entities
+import re
+from functools import lru_cache
+
+# Markup the pre-filter strips: comments and tags (CDATA sections are left in)
+_MARKUP = re.compile(r'<!--.*?-->|<(?:[a-zA-Z/?]|!(?!\[))[^>]*>', re.S)
+# Elements lxml reads as plain text, literal '<...>' included (html.parser parses it as tags)
+_RAW_TEXT = re.compile(
+    r'<(title|textarea|xmp|noembed|noframes|plaintext)\b[^>]*>(.*?)(?:</\1\s*>|$)', re.I | re.S
+)
+
+def _strip(html):
+    return html_entities.unescape(_MARKUP.sub('', html)).lower()
+
+def page_text(html):
+    """
+    Approximate soup.get_text().lower() without parsing the page.
+
+    Markup is stripped and entities unescaped, so a mention split by inline
+    tags ('Tes<b>la</b>') or spelled with entities is still seen; the raw
+    text of <title>-like elements is appended, since lxml keeps any markup
+    inside them as text. The result may hold more text than either parser
+    finds (scripts, styles), never less.
+    """
+    raw = [html_entities.unescape(inner).lower() for _, inner in _RAW_TEXT.findall(html)]
+    return '\n'.join([_strip(html)] + raw)
+
+def _title_texts(html):
+    """Every text a parser could give for the page's <title> elements"""
+    texts = []
+    for name, inner in _RAW_TEXT.findall(html):
+        if name.lower() == 'title':
+            texts += [_strip(inner), html_entities.unescape(inner).lower()]
+    return texts
+
+def company_variants(company_name):
+    """
+    Build the search variants for a company name.
+
+    Args:
+        company_name (str): Company name as given by the user
+
+    Returns:
+        list: (variant, bounded) pairs; bounded variants must sit on word
+        boundaries, the ticker variant ('$tsla') is matched anywhere
+    """
+    name = company_name.lower()
+    variants = [
+        (name, True),  # Exact match
+        (name.replace(' ', ''), True)  # No spaces
+    ]
+
+    # Add ticker symbol variant if company name looks like it could be one
+    if len(company_name) <= 5 and company_name.isalpha():
+        variants.append(('$' + name, False))
+
+    return [(variant, bounded) for variant, bounded in variants if variant]
+
+def _trie_regex(words):
+    """Build a regex alternation for words, factored as a trie so each position is tried once per prefix"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional: prefer the longest variant, fall back to this one
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+def _is_boundary(text, index):
+    """Same test as the regex \\b assertion at text[index]"""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+class CompanyMatcher:
+    """
+    Count mentions of many companies in a single pass over a text.
+
+    All variants of all companies are compiled into one trie-shaped regex.
+    It is scanned with a zero-width lookahead, so overlapping mentions
+    ('apple' inside 'apple inc', 'america' inside 'bank of america') are
+    all seen. At each hit, every variant that is a prefix of the longest
+    match is credited, subject to its own word-boundary rule. Counts follow
+    the original per-pattern findall semantics: each variant counts its own
+    non-overlapping matches, and a company's total is the sum over its
+    variants.
+
+    Args:
+        company_names (iterable): Companies to match
+    """
+
+    def __init__(self, company_names):
+        self.company_names = list(dict.fromkeys(company_names))
+        # variant -> {bounded: [company index, ...]} (repeats when variants coincide)
+        self.targets = {}
+
+        for index, company_name in enumerate(self.company_names):
+            for variant, bounded in company_variants(company_name):
+                self.targets.setdefault(variant, {}).setdefault(bounded, []).append(index)
+
+        self.variants = [
+            [variant for variant, _ in company_variants(company_name)] for company_name in self.company_names
+        ]
+        # Raw bytes can be scanned without knowing their encoding if every variant is ASCII
+        self.ascii = all(variant.isascii() for variants in self.variants for variant in variants)
+        self.prefixes = {
+            variant: [other for other in self.targets if variant.startswith(other)]
+            for variant in self.targets
+        }
+        pattern = _trie_regex(self.targets) if self.targets else r'(?!)'
+        self.scanner = re.compile('(?=(' + pattern + '))')
+
+    def count(self, text):
+        """
+        Count mentions per company.
+
+        Args:
+            text (str): Lower-cased text to scan
+
+        Returns:
+            list: Mention count per company, in company_names order
+        """
+        counts = [0] * len(self.company_names)
+        last_end = {}  # (variant, bounded) -> end of its previous counted match
+
+        for match in self.scanner.finditer(text):
+            start = match.start()
+            for variant in self.prefixes[match.group(1)]:
+                end = start + len(variant)
+                for bounded, indexes in self.targets[variant].items():
+                    key = (variant, bounded)
+                    if start < last_end.get(key, 0):
+                        continue
+                    if bounded and not (_is_boundary(text, start) and _is_boundary(text, end)):
+                        continue
+                    last_end[key] = end
+                    for index in indexes:
+                        counts[index] += 1
+
+        return counts
+
+    def match(self, soup):
+        """
+        Score a parsed page against every company.
+
+        Args:
+            soup (BeautifulSoup): Parsed HTML
+
+        Returns:
+            dict: Company name -> {"mentions": int, "title": bool, "relevant": bool}.
+            A company is relevant if it is mentioned in the <title> or at
+            least twice in the page text.
+        """
+        mentions = self.count(soup.get_text().lower())
+
+        title_tag = soup.find('title')
+        title_hits = [0] * len(self.company_names)
+        if title_tag:
+            title_hits = self.count(title_tag.get_text().lower())
+
+        return {
+            company_name: {
+                "mentions": mentions[index],
+                "title": title_hits[index] > 0,
+                "relevant": title_hits[index] > 0 or mentions[index] >= 2
+            }
+            for index, company_name in enumerate(self.company_names)
+        }
+
+    def candidates(self, html):
+        """
+        Cheap pre-filter on raw HTML: the companies the page could be relevant to.
+
+        Counts plain substring hits of every variant in the page's text with
+        markup stripped. That count never falls below what count() finds in
+        the parsed text (it ignores word boundaries and may include script
+        text), so a company with no hits, or a single hit outside every
+        <title>, cannot pass match()'s "title hit or at least two mentions"
+        rule and is dropped without parsing the page.
+
+        Args:
+            html (str or bytes): Raw HTML of the page; bytes are only
+                scanned when every variant is ASCII and the encoding is
+                ASCII-compatible, otherwise every company is kept
+
+        Returns:
+            list: Companies that may be relevant, in company_names order
+        """
+        if isinstance(html, bytes):
+            if not self.ascii or b'\x00' in html[:1024]:
+                return list(self.company_names)
+            html = html.decode('latin-1')
+
+        text = page_text(html)
+        titles = None
+        candidates = []
+
+        for company_name, variants in zip(self.company_names, self.variants):
+            hits = sum(text.count(variant) for variant in variants)
+            if hits == 1:
+                if titles is None:
+                    titles = _title_texts(html)
+                if not any(variant in title for title in titles for variant in variants):
+                    continue
+            if hits:
+                candidates.append(company_name)
+
+        return candidates
+
+    def relevant_companies(self, soup):
+        """Return the companies the page is relevant to, in company_names order"""
+        return [name for name, result in self.match(soup).items() if result["relevant"]]
+
+@lru_cache(maxsize=64)
+def get_matcher(company_names):
+    """
+    Return a (cached) matcher for a company set.
+
+    Args:
+        company_names (tuple): Companies to match; must be hashable
+
+    Returns:
+        CompanyMatcher
+    """
+    return CompanyMatcher(company_names)
@@ -0,0 +1,210 @@
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_archive import DEFAULT_ARCHIVE_PATH, HttpArchive
+
+STATS_PATH = '/__stats'
+
+def original_url(path):
+    """Map /https/host/path?query (see http_session.stand_in_url) back to https://host/path?query"""
+    scheme, _, rest = path.lstrip('/').partition('/')
+    host, slash, remainder = rest.partition('/')
+    return f"{scheme}://{host}{slash}{remainder}" if host else None
+
+class _HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+        self.recent = deque()  # Request start times within the rate-limit window
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.handle_replay(self, send_body=True)
+
+    def do_HEAD(self):
+        self.server.handle_replay(self, send_body=False)
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the news sites, serving an HttpArchive.
+
+    Point the scraper at it with NEWS_BASE_URL (or create_session(base_url=...)).
+    Each request can be delayed, failed or throttled to exercise the
+    scraper's concurrency limits and backoff; GET /__stats reports what the
+    server saw, including the peak number of concurrent requests per host.
+
+    Args:
+        archive (HttpArchive): Recorded responses to serve
+        address (tuple): (host, port) to listen on; port 0 picks a free one
+        latency (float): Seconds to wait before each response
+        jitter (float): Extra random delay of up to this many seconds
+        error_rate (float): Probability of answering with error_status instead
+        error_status (int): Status code used for injected errors
+        throttle_rate (float): Probability of answering 429 Too Many Requests
+        rate_limit (float): Requests per second allowed per host; the excess gets 429
+        retry_after (int): Retry-After seconds sent with 429 responses
+        seed (int): Seed for the random faults, for repeatable runs
+    """
+
+    daemon_threads = True
+
+    def __init__(self, archive, address=('127.0.0.1', 8000), latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=500, throttle_rate=0.0, rate_limit=None,
+                 retry_after=1, seed=None):
+        super().__init__(address, ReplayHandler)
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.hosts = {}
+        self.counts = {"served": 0, "not_found": 0, "errors": 0, "throttled": 0}
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve from a background thread; returns the base URL to point the scraper at"""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def stats(self):
+        """
+        Summarize the traffic served so far.
+
+        Returns:
+            dict: Outcome counts and per-host request count and peak concurrency
+        """
+        with self.lock:
+            return dict(self.counts, hosts={
+                host: {"requests": state.requests, "peak_concurrency": state.peak}
+                for host, state in self.hosts.items()
+            })
+
+    def _admit(self, host):
+        # Returns the fault to inject, if any, and counts the request as active
+        now = time.monotonic()
+        with self.lock:
+            state = self.hosts.setdefault(host, _HostStats())
+            state.requests += 1
+            state.active += 1
+            state.peak = max(state.peak, state.active)
+
+            while state.recent and now - state.recent[0] >= 1.0:
+                state.recent.popleft()
+            state.recent.append(now)
+            if self.rate_limit is not None and len(state.recent) > self.rate_limit:
+                return 429
+            if self.random.random() < self.throttle_rate:
+                return 429
+            if self.random.random() < self.error_rate:
+                return self.error_status
+            return None
+
+    def _send(self, handler, status, headers, body, send_body):
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        if send_body:
+            handler.wfile.write(body)
+
+    def handle_replay(self, handler, send_body):
+        if handler.path == STATS_PATH:
+            body = json.dumps(self.stats()).encode('utf-8')
+            self._send(handler, 200, {'Content-Type': 'application/json'}, body, send_body)
+            return
+
+        url = original_url(handler.path)
+        if url is None:
+            self._send(handler, 400, {}, b'', send_body)
+            return
+
+        host = url.split('/')[2]
+        fault = self._admit(host)
+        try:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if delay:
+                time.sleep(delay)
+
+            if fault == 429:
+                with self.lock:
+                    self.counts["throttled"] += 1
+                self._send(handler, 429, {'Retry-After': str(self.retry_after)}, b'', send_body)
+                return
+            if fault is not None:
+                with self.lock:
+                    self.counts["errors"] += 1
+                self._send(handler, fault, {}, b'', send_body)
+                return
+
+            recorded = self.archive.get(url)
+            if recorded is None:
+                with self.lock:
+                    self.counts["not_found"] += 1
+                self._send(handler, 404, {}, b'', send_body)
+                return
+
+            with self.lock:
+                self.counts["served"] += 1
+            self._send(handler, recorded.status_code, recorded.headers, recorded.body, send_body)
+        finally:
+            with self.lock:
+                self.hosts[host].active -= 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a recorded HTTP archive as a local stand-in for the news sites")
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH, help="Archive recorded with http_archive.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random delay, in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability of a 500 response")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument('--rate-limit', type=float, help="Requests per second per host before 429s")
+    parser.add_argument('--seed', type=int, help="Seed for the injected faults")
+    args = parser.parse_args()
+
+    archive = HttpArchive(args.archive)
+    server = ReplayServer(
+        archive, (args.host, args.port), latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+    print(f"🔁 Replaying {len(archive)} responses at {server.base_url}")
+    print(f"Point the scraper at it with NEWS_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats(), indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+import zlib
+
+from sqlite_store import connect, evict_lru
+
+DEFAULT_CACHE_PATH = os.path.join('.news_cache', 'http_cache.sqlite')
+
+# Search pages change quickly; article pages rarely change once published
+DEFAULT_TTLS = {
+    'search': 30 * 60,
+    'article': 7 * 24 * 60 * 60
+}
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response served from the cache"""
+
+    def __init__(self, url, body, encoding, headers):
+        self.url = url
+        self.status_code = 200
+        self.content = body
+        self.encoding = encoding
+        self.headers = headers
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+class ResponseCache:
+    """
+    Persistent, size-bounded HTTP response cache keyed by URL.
+
+    Bodies are stored zlib-compressed in SQLite together with their ETag and
+    Last-Modified validators. Entries younger than the TTL for their kind are
+    served without touching the network; older ones are revalidated with a
+    conditional request. Once the stored bodies exceed max_bytes, the least
+    recently used entries are evicted. Bodies streaming_fetch.fetch_html
+    rejected or cut short are never stored, so a partial page is not later
+    served, or revalidated, as the whole one.
+
+    Args:
+        path (str): SQLite database file
+        max_bytes (int): Upper bound on the total compressed body size
+        ttls (dict): Freshness lifetime in seconds per kind ('search', 'article')
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=256 * 1024 * 1024, ttls=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        self.db = connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                encoding TEXT,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self.db.commit()
+
+    def lookup(self, url):
+        """
+        Look up a cached entry.
+
+        Returns:
+            dict: Stored entry, or None if the URL is not cached
+        """
+        with self.lock:
+            row = self.db.execute(
+                "SELECT body, encoding, content_type, etag, last_modified, fetched_at "
+                "FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "body": row[0],
+            "encoding": row[1],
+            "content_type": row[2],
+            "etag": row[3],
+            "last_modified": row[4],
+            "fetched_at": row[5]
+        }
+
+    def is_fresh(self, entry, kind):
+        """Check whether an entry is still within the TTL for its kind"""
+        return time.time() - entry["fetched_at"] < self.ttls.get(kind, 0)
+
+    def get_fresh(self, url, kind='article'):
+        """
+        Return a cached response that can be served without revalidation.
+
+        Args:
+            url (str): Requested URL
+            kind (str): 'search' or 'article', selects the TTL
+
+        Returns:
+            CachedResponse: The cached response, or None if missing or stale
+        """
+        entry = self.lookup(url)
+        if entry is None or not self.is_fresh(entry, kind):
+            return None
+
+        self.hits += 1
+        self._touch(url, refresh=False)
+        return self._to_response(url, entry)
+
+    def conditional_headers(self, url):
+        """Build If-None-Match / If-Modified-Since headers for a stale entry"""
+        entry = self.lookup(url)
+        headers = {}
+        if entry is None:
+            return headers
+
+        if entry["etag"]:
+            headers['If-None-Match'] = entry["etag"]
+        if entry["last_modified"]:
+            headers['If-Modified-Since'] = entry["last_modified"]
+        return headers
+
+    def handle_response(self, url, response):
+        """
+        Store a network response, or resolve a 304 to the cached body.
+
+        Args:
+            url (str): Requested URL
+            response (requests.Response): Response to a (conditional) request
+
+        Returns:
+            The response to hand to the caller: a CachedResponse for a 304,
+            otherwise the original response
+        """
+        if response.status_code == 304:
+            entry = self.lookup(url)
+            if entry is not None:
+                self.revalidated += 1
+                self._touch(url, refresh=True)
+                return self._to_response(url, entry)
+            return response
+
+        self.misses += 1
+        if response.status_code != 200:
+            return response
+        # Bodies fetch_html dropped (non-HTML, oversize) must not be served as empty pages later,
+        # nor bodies it cut short as whole pages; an older copy is out of date either way
+        if getattr(response, 'rejected', None) or getattr(response, 'truncated', None):
+            self.discard(url)
+        else:
+            self.store(url, response)
+        return response
+
+    def fetch(self, session, url, kind='article', headers=None, timeout=15):
+        """
+        Fetch url through the cache.
+
+        Args:
+            session (requests.Session): Session used on a miss or revalidation
+            url (str): URL to fetch
+            kind (str): 'search' or 'article', selects the TTL
+            headers (dict): Extra request headers
+            timeout (float): Request timeout in seconds
+
+        Returns:
+            requests.Response or CachedResponse
+        """
+        cached = self.get_fresh(url, kind)
+        if cached is not None:
+            return cached
+
+        request_headers = dict(headers or {}, **self.conditional_headers(url))
+        response = session.get(url, headers=request_headers, timeout=timeout)
+        return self.handle_response(url, response)
+
+    def discard(self, url):
+        """Drop the cached copy of url, if any"""
+        with self.lock:
+            self.db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self.db.commit()
+
+    def store(self, url, response):
+        """Compress and store a 200 response, then enforce the size bound"""
+        body = zlib.compress(response.content)
+        now = time.time()
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, body, size, encoding, content_type, etag, last_modified, fetched_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url, body, len(body),
+                    response.encoding or response.apparent_encoding,
+                    response.headers.get('Content-Type'),
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    now, now
+                )
+            )
+            evict_lru(self.db, "responses", "url", self.max_bytes)
+            self.db.commit()
+
+    def _touch(self, url, refresh):
+        now = time.time()
+        with self.lock:
+            if refresh:
+                self.db.execute(
+                    "UPDATE responses SET last_access = ?, fetched_at = ? WHERE url = ?", (now, now, url)
+                )
+            else:
+                self.db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (now, url))
+            self.db.commit()
+
+    def _to_response(self, url, entry):
+        headers = {}
+        if entry["content_type"]:
+            headers['Content-Type'] = entry["content_type"]
+        return CachedResponse(url, zlib.decompress(entry["body"]), entry["encoding"], headers)
+
+    def stats(self):
+        """Return hit / revalidation / miss counts for this process"""
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+def get_default_cache():
+    """Return the process-wide cache at DEFAULT_CACHE_PATH, opening it on first use"""
+    global _default_cache
+
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+from dedup import NearDuplicateIndex
+from http_session import get_shared_session
+from metrics import get_metrics
+from news_scrapV2 import scrape_companies_async
+from parse_pool import ParsePool
+from politeness import HostScheduler
+from sources import DEFAULT_STATS_PATH, load_sources
+from url_canon import DEFAULT_REDIRECTS_PATH, UrlCanonicalizer
+from response_cache import get_default_cache
+
+# Largest max= a client may ask for
+MAX_ARTICLES_LIMIT = 50
+
+# Seconds a client gets to send its request line and headers
+HEADER_TIMEOUT = 10.0
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               503: 'Service Unavailable'}
+
+def normalize_company(company_name):
+    """Collapse whitespace, so 'Tesla  Inc' and 'Tesla Inc' are the same request"""
+    return ' '.join(company_name.split())
+
+class _Scrape:
+    """One in-flight scrape, followed by every client that asked for it"""
+
+    def __init__(self, company_name, max_articles):
+        self.company_name = company_name
+        self.max_articles = max_articles
+        self.articles = []
+        self.done = False
+        self.error = None
+        self.listeners = 0
+        self.task = None
+        self._changed = asyncio.Event()
+
+    def add(self, article):
+        self.articles.append(article)
+        self._wake()
+
+    def finish(self, error=None):
+        self.done = True
+        self.error = error
+        self._wake()
+
+    def _wake(self):
+        # Waiters hold on to the event that was current when they started waiting
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self, seen):
+        """Return once there are more than seen articles, or the scrape is over"""
+        if seen == len(self.articles) and not self.done:
+            await self._changed.wait()
+
+class NewsService:
+    """
+    Long-running HTTP front end to scrape_companies_async.
+
+    GET /articles?company=...&max=... streams the company's articles back as
+    JSON Lines, one line per article as soon as the scraper accepts it,
+    then a final {"done": true, ...} line. GET /health reports the service's
+    counters and GET /metrics the pipeline metrics in Prometheus text.
+
+    Everything that is expensive to set up lives as long as the service: the
+    pooled HTTP session and its open connections, the response cache, the
+    parse worker processes, the per-host politeness scheduler (so concurrent
+    requests stay polite to the same site together), the source rankings and
+    the compiled company matchers. Identical requests (same company, same
+    max) that arrive while a scrape is running join it instead of starting
+    another one, replaying the articles it already found; finished results
+    with at least one article are served from memory for result_ttl seconds.
+
+    At most max_scrapes scrapes run at once, the rest wait their turn, and
+    connections beyond max_clients are answered 503 straight away. A scrape
+    whose clients have all disconnected is cancelled, whether or not it is
+    still waiting for its turn or for its next article.
+
+    Args:
+        max_scrapes (int): Scrapes allowed to run at once
+        max_clients (int): Connections served at once
+        concurrency (int): Fetches in flight at once per scrape
+        workers (int): Parse worker processes (default: one per CPU; 0 parses in threads)
+        result_ttl (float): Seconds a finished result is served from memory
+        max_results (int): Finished results kept in memory
+        scheduler (HostScheduler): Per-host politeness scheduler (default: a new one)
+        sources (SourceRegistry): Search sources (default: sources.json with saved stats)
+    """
+
+    def __init__(self, max_scrapes=4, max_clients=64, concurrency=8, workers=None, result_ttl=300.0,
+                 max_results=256, scheduler=None, sources=None):
+        self.max_scrapes = max_scrapes
+        self.max_clients = max_clients
+        self.concurrency = concurrency
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+        self.scheduler = scheduler
+        self.sources = sources
+
+        self.scrapes = {}  # (company key, max) -> _Scrape still running
+        self.results = OrderedDict()  # (company key, max) -> (expiry time, articles)
+        self.clients = 0
+        self.counts = {"scraped": 0, "joined": 0, "cached": 0, "rejected": 0, "errors": 0}
+        self.options = None
+        self.parse_pool = None
+        self.slots = None
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8080):
+        """Open the shared resources and start listening; port 0 picks a free one"""
+        self.parse_pool = ParsePool(workers=self.workers) if self.workers != 0 else None
+        self.options = {
+            "scheduler": self.scheduler or HostScheduler(),
+            "session": get_shared_session(),
+            "cache": get_default_cache(),
+            "parse_pool": self.parse_pool,
+            "canonicalizer": UrlCanonicalizer(DEFAULT_REDIRECTS_PATH),
+            "sources": self.sources or load_sources(stats_path=DEFAULT_STATS_PATH),
+            "metrics": get_metrics()
+        }
+        self.slots = asyncio.Semaphore(self.max_scrapes)
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.base_url
+
+    @property
+    def base_url(self):
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for scrape in list(self.scrapes.values()):
+            scrape.task.cancel()
+        if self.parse_pool is not None:
+            self.parse_pool.close()
+
+    def stats(self):
+        return dict(self.counts, clients=self.clients, running=len(self.scrapes), results=len(self.results))
+
+    async def handle(self, reader, writer):
+        self.clients += 1
+        try:
+            try:
+                method, target = await asyncio.wait_for(self._read_request(reader), HEADER_TIMEOUT)
+            except (asyncio.TimeoutError, ValueError):
+                await self._send(writer, 400, {"error": "Malformed request"})
+                return
+
+            url = urlsplit(target)
+            if self.clients > self.max_clients:
+                self.counts["rejected"] += 1
+                await self._send(writer, 503, {"error": "Too many clients"}, {'Retry-After': '1'})
+            elif method != 'GET':
+                await self._send(writer, 405, {"error": "Only GET is supported"}, {'Allow': 'GET'})
+            elif url.path == '/articles':
+                await self._articles(reader, writer, parse_qs(url.query))
+            elif url.path == '/health':
+                await self._send(writer, 200, self.stats())
+            elif url.path == '/metrics':
+                body = self.options["metrics"].to_prometheus().encode('utf-8')
+                await self._send(writer, 200, body, {'Content-Type': 'text/plain; version=0.0.4'})
+            else:
+                await self._send(writer, 404, {"error": f"No such endpoint: {url.path}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client went away
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            raise ValueError("bad request line")
+        while (await reader.readline()).strip():
+            pass  # Headers are not needed
+        return request_line[0], request_line[1]
+
+    async def _send(self, writer, status, body, headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        head = {'Content-Type': 'application/json', 'Content-Length': str(len(body)), 'Connection': 'close'}
+        head.update(headers or {})
+        writer.write(self._head(status, head) + body)
+        await writer.drain()
+
+    def _head(self, status, headers):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"] + [f"{name}: {value}" for name, value in headers.items()]
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _articles(self, reader, writer, query):
+        company_name = normalize_company(query.get('company', [''])[0])
+        try:
+            max_articles = int(query.get('max', ['10'])[0])
+        except ValueError:
+            max_articles = 0
+        if not company_name or not 1 <= max_articles <= MAX_ARTICLES_LIMIT:
+            await self._send(writer, 400, {"error": f"Need company= and max= between 1 and {MAX_ARTICLES_LIMIT}"})
+            return
+
+        key = (company_name.casefold(), max_articles)
+        started = time.perf_counter()
+        writer.write(self._head(200, {'Content-Type': 'application/x-ndjson', 'Transfer-Encoding': 'chunked',
+                                      'Connection': 'close'}))
+
+        result = self.results.get(key)
+        if result is not None and result[0] > time.monotonic():
+            self.counts["cached"] += 1
+            await self._stream(writer, result[1], started, 'cache')
+            return
+
+        scrape = self.scrapes.get(key)
+        source = 'joined' if scrape is not None else 'scraped'
+        if scrape is None:
+            scrape = self.scrapes[key] = _Scrape(company_name, max_articles)
+            scrape.task = asyncio.ensure_future(self._scrape(key, scrape))
+        self.counts[source] += 1
+
+        scrape.listeners += 1
+        # Nothing more is expected from the client: reading only ends when it hangs up
+        hung_up = asyncio.ensure_future(reader.read())
+        try:
+            sent = 0
+            while True:
+                for article in scrape.articles[sent:]:
+                    writer.write(self._chunk(article))
+                    sent += 1
+                await writer.drain()
+                if scrape.done:
+                    break
+                waiting = asyncio.ensure_future(scrape.wait(sent))
+                await asyncio.wait([waiting, hung_up], return_when=asyncio.FIRST_COMPLETED)
+                if hung_up.done():
+                    waiting.cancel()
+                    raise ConnectionResetError("client disconnected")
+        finally:
+            hung_up.cancel()
+            scrape.listeners -= 1
+            if not scrape.listeners and not scrape.done:
+                # Nobody is listening any more; later requests start afresh
+                del self.scrapes[key]
+                scrape.task.cancel()
+
+        await self._finish(writer, sent, started, source, scrape.error)
+
+    async def _stream(self, writer, articles, started, source):
+        for article in articles:
+            writer.write(self._chunk(article))
+        await self._finish(writer, len(articles), started, source)
+
+    async def _finish(self, writer, count, started, source, error=None):
+        footer = {"done": True, "articles": count, "source": source,
+                  "seconds": round(time.perf_counter() - started, 3)}
+        if error:
+            footer["error"] = error
+        writer.write(self._chunk(footer) + b'0\r\n\r\n')
+        await writer.drain()
+
+    def _chunk(self, item):
+        line = (json.dumps(item, ensure_ascii=False) + '\n').encode('utf-8')
+        return b'%x\r\n%s\r\n' % (len(line), line)
+
+    async def _scrape(self, key, scrape):
+        try:
+            async with self.slots:
+                # Each scrape gets its own near-duplicate index: a shared one would
+                # hide articles an earlier request accepted from later ones
+                await scrape_companies_async(
+                    [scrape.company_name], scrape.max_articles, self.concurrency,
+                    on_article=scrape.add, collect=False, dedup=NearDuplicateIndex(path=None),
+                    **self.options
+                )
+        except asyncio.CancelledError:
+            scrape.finish("cancelled")
+            raise
+        except Exception as e:
+            print(f"❌ Error scraping {scrape.company_name}: {str(e)}")
+            self.counts["errors"] += 1
+            scrape.finish(str(e))
+        else:
+            # An empty result is as likely a throttled or failing search as a quiet
+            # company, so the next request tries again instead of reusing it
+            if scrape.articles:
+                self._remember(key, scrape.articles)
+            scrape.finish()
+        finally:
+            if self.scrapes.get(key) is scrape:
+                del self.scrapes[key]
+
+    def _remember(self, key, articles):
+        self.results[key] = (time.monotonic() + self.result_ttl, articles)
+        self.results.move_to_end(key)
+        while len(self.results) > self.max_results:
+            self.results.popitem(last=False)
+
+async def serve(host, port, **options):
+    service = NewsService(**options)
+    base_url = await service.start(host, port)
+    print(f"🌐 Serving articles at {base_url}/articles?company=...&max=...")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+        print(json.dumps(service.stats(), indent=4))
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve scraped news articles over HTTP, with warm caches")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-scrapes', type=int, default=4, help="Scrapes running at once")
+    parser.add_argument('--max-clients', type=int, default=64, help="Connections served at once")
+    parser.add_argument('--concurrency', type=int, default=8, help="Fetches in flight at once per scrape")
+    parser.add_argument('--workers', type=int, default=None, help="Parse worker processes (0: parse in threads)")
+    parser.add_argument('--result-ttl', type=float, default=300.0, help="Seconds finished results are reused")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(
+            args.host, args.port, max_scrapes=args.max_scrapes, max_clients=args.max_clients,
+            concurrency=args.concurrency, workers=args.workers, result_ttl=args.result_ttl
+        ))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
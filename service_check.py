@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+from http_session import BASE_URL_ENV
+from politeness import HostScheduler
+from service import NewsService
+from stand_in_site import ARTICLE_BASE, SEARCH_URL, article_page, search_page, serve, source_registry
+
+# Seconds the stand-in site takes per response, so scrapes are still running when checked
+LATENCY = 0.2
+
+def company_pages(company_name, count):
+    """Search page listing count distinct articles about company_name, and the articles"""
+    links = [f"{ARTICLE_BASE}{company_name.lower()}-{number}" for number in range(count)]
+    pages = {link: article_page(company_name, f"story {number}") for number, link in enumerate(links)}
+    pages[SEARCH_URL.format(query=company_name)] = search_page(links)
+    return pages
+
+async def get_articles(base_url, company_name, max_articles):
+    """Request a company's articles; returns (article URLs, footer)"""
+    host, port = base_url.split('//')[1].split(':')
+    reader, writer = await asyncio.open_connection(host, int(port))
+    writer.write(f"GET /articles?company={company_name}&max={max_articles} HTTP/1.1\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    body = (await reader.read()).split(b'\r\n\r\n', 1)[1]
+    writer.close()
+
+    # Each chunk is '<size>\r\n<line>\r\n'; the lines are JSON
+    lines = [json.loads(line) for line in body.split(b'\r\n')[1::2] if line.startswith(b'{')]
+    return [line["url"] for line in lines[:-1]], lines[-1]
+
+async def hang_up_early(base_url, company_name, max_articles):
+    """Request a company's articles and disconnect once the response has started"""
+    host, port = base_url.split('//')[1].split(':')
+    reader, writer = await asyncio.open_connection(host, int(port))
+    writer.write(f"GET /articles?company={company_name}&max={max_articles} HTTP/1.1\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    await reader.readuntil(b'\r\n\r\n')
+    writer.close()
+
+async def run_checks(service):
+    problems = []
+    base_url = await service.start(port=0)
+    try:
+        # Identical requests arriving together share one scrape and each get every article
+        replies = await asyncio.gather(*(get_articles(base_url, 'Acme', 3) for _ in range(3)))
+        sources = sorted(footer["source"] for _, footer in replies)
+        if sources != ['joined', 'joined', 'scraped']:
+            problems.append(f"concurrent requests were served as {sources}, expected one scrape joined twice")
+        if any(len(urls) != 3 for urls, _ in replies):
+            problems.append(f"concurrent requests got {[len(urls) for urls, _ in replies]} articles, expected 3 each")
+
+        urls, footer = await get_articles(base_url, 'Acme', 3)
+        if footer["source"] != 'cache' or len(urls) != 3:
+            problems.append(f"repeat request got {len(urls)} articles from {footer['source']}, expected 3 from cache")
+
+        # A scrape of its own, not the cached result's leftovers, and no articles lost to it
+        urls, footer = await get_articles(base_url, 'Acme', 5)
+        if footer["source"] != 'scraped' or len(urls) != 5:
+            problems.append(f"larger request got {len(urls)} articles from {footer['source']}, "
+                            f"expected 5 from a new scrape")
+
+        # The only client hanging up while the scrape waits on the site cancels it
+        await hang_up_early(base_url, 'Globex', 5)
+        await asyncio.sleep(LATENCY / 2)
+        if service.stats()["running"]:
+            problems.append("scrape kept running after its only client disconnected")
+
+        # No articles is not remembered: the search may have been throttled
+        for attempt in range(2):
+            urls, footer = await get_articles(base_url, 'Initech', 3)
+            if urls or footer["source"] != 'scraped':
+                problems.append(f"empty result request {attempt + 1} got {len(urls)} articles from "
+                                f"{footer['source']}, expected none from a new scrape")
+    finally:
+        await service.stop()
+    return problems
+
+def check_service():
+    """
+    Check request coalescing, result reuse and hangup cancellation in NewsService.
+
+    The service runs in a scratch directory against a replay server with a
+    little latency per response.
+
+    Returns:
+        list: Problems found (empty if the check passed)
+    """
+    pages = dict(company_pages('Acme', 8), **company_pages('Globex', 8))
+    pages[SEARCH_URL.format(query='Initech')] = search_page([])
+    server = serve(pages, latency=LATENCY)
+    directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        # The service's shared session, cache and redirect store are opened on start
+        os.environ[BASE_URL_ENV] = server.base_url
+        os.chdir(scratch)
+        try:
+            service = NewsService(workers=0, scheduler=HostScheduler(min_gap=0, max_per_host=8),
+                                  sources=source_registry())
+            return asyncio.run(run_checks(service))
+        finally:
+            os.chdir(directory)
+            server.stop()
+
+def main():
+    problems = check_service()
+    for problem in problems:
+        print(f"❌ {problem}")
+
+    if problems:
+        sys.exit(1)
+    print("✅ Service shared scrapes, reused only non-empty results and cancelled an abandoned scrape")
+
+if __name__ == "__main__":
+    main()
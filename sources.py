@@ -0,0 +1,325 @@
+import json
+import os
+import random
+import statistics
+import threading
+from collections import deque
+from urllib.parse import urljoin, urlsplit
+
+import soupsieve
+
+DEFAULT_SOURCES_PATH = os.environ.get('NEWS_SOURCES_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'sources.json'
+)
+
+DEFAULT_STATS_PATH = os.path.join('.news_cache', 'source_stats.json')
+
+# Latency floor for ranking, so cached searches don't dominate by dividing by ~0
+MIN_RANKING_LATENCY = 0.1
+
+# Prior for a source's yield: it starts out as if PRIOR_ACCEPTED of PRIOR_REQUESTS
+# requests paid off, so a few unlucky requests don't bury it and no yield ties at 0
+PRIOR_ACCEPTED = 1
+PRIOR_REQUESTS = 4
+
+# Search latencies kept per source for the median
+LATENCY_WINDOW = 50
+
+def generic_links(soup):
+    """Links whose URL or text looks news-related; the fallback for pages no source rule matches"""
+    article_links = []
+    for a in soup.find_all('a'):
+        href = a.get('href', '')
+        text = a.get_text().lower()
+        if href.startswith('http') and (
+            'article' in href or 'news' in href or
+            'story' in href or 'press' in href or
+            'article' in text or 'news' in text
+        ):
+            article_links.append(href)
+    return article_links
+
+class LinkRule:
+    """
+    One way of finding result links on a search page.
+
+    Args:
+        container (str): CSS selector for result blocks
+        link (str): CSS selector for the link inside a block; a block that
+            itself matches is used as the link
+        all_links (bool): Take every matching link in a block, not just the first
+        absolute_only (bool): Drop relative links instead of resolving them
+        exclude (list): Substrings that disqualify an href
+    """
+
+    def __init__(self, container, link='a', all_links=False, absolute_only=False, exclude=()):
+        # Compiled once here instead of on every search page
+        self.container = soupsieve.compile(container)
+        self.link = soupsieve.compile(link)
+        self.all_links = all_links
+        self.absolute_only = absolute_only
+        self.exclude = tuple(exclude)
+
+    def _anchors(self, block):
+        if self.link.match(block):
+            return [block]
+        if self.all_links:
+            return self.link.select(block)
+        first = self.link.select_one(block)
+        return [first] if first is not None else []
+
+    def extract(self, soup, base_url):
+        article_links = []
+        for block in self.container.select(soup):
+            for a in self._anchors(block):
+                href = a.get('href', '')
+                if not href or any(word in href for word in self.exclude):
+                    continue
+                if not href.startswith('http'):
+                    if self.absolute_only:
+                        continue
+                    href = urljoin(base_url, href)
+                article_links.append(href)
+        return article_links
+
+class SearchSource:
+    """
+    A search engine or news site declared in the sources file.
+
+    Args:
+        name (str): Short identifier used in stats
+        search_url (str): URL template; {query} is replaced by the company name
+        base_url (str): Base for resolving relative result links (default: the search host)
+        rules (list): LinkRule keyword dicts, tried in order until one finds links
+        enabled (bool): Disabled sources are never searched
+    """
+
+    def __init__(self, name, search_url, base_url=None, rules=(), enabled=True):
+        parts = urlsplit(search_url)
+        self.name = name
+        self.search_url_template = search_url
+        self.host = parts.hostname
+        self.base_url = base_url or f"{parts.scheme}://{parts.netloc}"
+        self.rules = [LinkRule(**rule) for rule in rules]
+        self.enabled = enabled
+
+    def search_url(self, company_name):
+        return self.search_url_template.format(query=company_name.replace(' ', '+'))
+
+    def extract_links(self, soup):
+        for rule in self.rules:
+            article_links = rule.extract(soup, self.base_url)
+            if article_links:
+                return article_links
+        return []
+
+def _new_counter():
+    return {
+        "searches": 0, "failures": 0, "links": 0, "article_requests": 0, "accepted": 0,
+        "latencies": deque(maxlen=LATENCY_WINDOW)
+    }
+
+class SourceRegistry:
+    """
+    The set of search sources, dispatched by hostname.
+
+    Also keeps per-source stats: search failures, links found, article
+    requests made for those links, articles accepted from them and recent
+    search latencies. Sources are ranked by their smoothed yield (accepted
+    articles per request, with a PRIOR_ACCEPTED / PRIOR_REQUESTS prior),
+    times the share of their searches that did not fail, divided by their
+    median search latency, so a source that returns little, fails or times
+    out sinks below healthy ones. Sources not yet tried rank first.
+
+    Ordering is an epsilon-greedy bandit: each position in search_urls()
+    goes to the best remaining source, except with probability exploration,
+    when a random remaining source is picked instead, so a source that has
+    improved gets the chance to show it.
+
+    Args:
+        sources (list): SearchSource objects
+        stats_path (str): JSON file the stats are loaded from and saved to (None: memory only)
+        exploration (float): Probability of trying a random source at each position
+    """
+
+    def __init__(self, sources, stats_path=None, exploration=0.1):
+        self.sources = list(sources)
+        self.by_host = {source.host: source for source in self.sources}
+        self.lock = threading.Lock()
+        self.counters = {source.name: _new_counter() for source in self.sources}
+        self.stats_path = stats_path
+        self.exploration = exploration
+        self.random = random.Random()
+
+        if stats_path is not None and os.path.exists(stats_path):
+            self._load_stats()
+
+    def _load_stats(self):
+        try:
+            with open(self.stats_path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable source stats {self.stats_path}: {str(e)}")
+            return
+
+        for name, counter in saved.items():
+            if name not in self.counters:
+                continue
+            for key in ("searches", "failures", "links", "article_requests", "accepted"):
+                self.counters[name][key] = counter.get(key, 0)
+            self.counters[name]["latencies"].extend(counter.get("latencies", []))
+
+    def save_stats(self):
+        """Write the stats to stats_path (no-op without one)"""
+        if self.stats_path is None:
+            return
+        with self.lock:
+            saved = {
+                name: dict(counter, latencies=list(counter["latencies"]))
+                for name, counter in self.counters.items()
+            }
+        if os.path.dirname(self.stats_path):
+            os.makedirs(os.path.dirname(self.stats_path), exist_ok=True)
+        temp_path = self.stats_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=4)
+        os.replace(temp_path, self.stats_path)
+
+    def enabled(self):
+        return [source for source in self.sources if source.enabled]
+
+    def for_url(self, url):
+        """Return the source a search URL belongs to, or None"""
+        return self.by_host.get(urlsplit(url).hostname)
+
+    def _score(self, source):
+        counter = self.counters[source.name]
+        if not counter["searches"]:
+            return float('inf')
+        requests = counter["searches"] + counter["article_requests"]
+        yield_rate = (counter["accepted"] + PRIOR_ACCEPTED) / (requests + PRIOR_REQUESTS)
+        success_rate = 1 - counter["failures"] / counter["searches"]
+        median_latency = max(statistics.median(counter["latencies"] or [0]), MIN_RANKING_LATENCY)
+        return yield_rate * success_rate / median_latency
+
+    def ranked(self, explore=False):
+        """
+        Enabled sources, best first (stable for ties, so file order is the default).
+
+        Args:
+            explore (bool): Apply epsilon-greedy exploration to the order
+        """
+        with self.lock:
+            ranked = sorted(self.enabled(), key=self._score, reverse=True)
+        if not explore or not self.exploration:
+            return ranked
+
+        ordered = []
+        while ranked:
+            index = self.random.randrange(len(ranked)) if self.random.random() < self.exploration else 0
+            ordered.append(ranked.pop(index))
+        return ordered
+
+    def search_urls(self, company_name):
+        """Search page URLs to query for a company, in (explored) rank order"""
+        return [source.search_url(company_name) for source in self.ranked(explore=True)]
+
+    def extract_links(self, soup, search_url):
+        """
+        Extract article links from a search page with its source's rules.
+
+        Falls back to generic_links() for unknown hosts and pages the rules
+        find nothing on.
+        """
+        source = self.for_url(search_url)
+        article_links = source.extract_links(soup) if source is not None else []
+        return article_links or generic_links(soup)
+
+    def record(self, search_url, latency, links=0, failed=False):
+        """
+        Record the outcome of one search page fetch.
+
+        Args:
+            search_url (str): Search page URL
+            latency (float): Seconds the fetch took
+            links (int): Article links found on the page
+            failed (bool): The fetch errored or returned a non-200 status
+        """
+        source = self.for_url(search_url)
+        if source is None:
+            return
+        with self.lock:
+            counter = self.counters[source.name]
+            counter["searches"] += 1
+            counter["failures"] += failed
+            counter["links"] += links
+            counter["latencies"].append(latency)
+
+    def record_article(self, search_url, accepted=0):
+        """
+        Record an article request made for a link found on a search page.
+
+        Args:
+            search_url (str): Search page the link came from
+            accepted (int): Number of companies the article was accepted for
+        """
+        source = self.for_url(search_url)
+        if source is None:
+            return
+        with self.lock:
+            counter = self.counters[source.name]
+            counter["article_requests"] += 1
+            counter["accepted"] += accepted
+
+    def stats(self):
+        """
+        Summarize yield, latency and errors per source.
+
+        Returns:
+            dict: Source name -> searches, links, article requests, accepted,
+            accepted per request, mean links, median latency and error rate
+        """
+        summary = {}
+        with self.lock:
+            for name, counter in self.counters.items():
+                if not counter["searches"]:
+                    continue
+                requests = counter["searches"] + counter["article_requests"]
+                summary[name] = {
+                    "searches": counter["searches"],
+                    "links": counter["links"],
+                    "article_requests": counter["article_requests"],
+                    "accepted": counter["accepted"],
+                    "accepted_per_request": counter["accepted"] / requests,
+                    "mean_links": counter["links"] / counter["searches"],
+                    "median_latency": statistics.median(counter["latencies"] or [0]),
+                    "error_rate": counter["failures"] / counter["searches"]
+                }
+        return summary
+
+def load_sources(path=DEFAULT_SOURCES_PATH, stats_path=None, exploration=0.1):
+    """
+    Load a source registry from a JSON file.
+
+    Args:
+        path (str): File with a "sources" list of SearchSource keyword dicts
+        stats_path (str): Where to persist per-source stats (None: memory only)
+        exploration (float): See SourceRegistry
+
+    Returns:
+        SourceRegistry
+    """
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    return SourceRegistry(
+        (SearchSource(**source) for source in config["sources"]), stats_path, exploration
+    )
+
+_registry = None
+
+def get_registry():
+    """Return the process-wide registry, loaded from DEFAULT_SOURCES_PATH on first use"""
+    global _registry
+    if _registry is None:
+        _registry = load_sources()
+    return _registry
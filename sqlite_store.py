@@ -0,0 +1,51 @@
+import os
+import sqlite3
+
+def connect(path, wal=False):
+    """
+    Open one of the SQLite stores, creating its directory first.
+
+    The connection is shared by the threads of the store that owns it, which
+    serializes access with its own lock.
+
+    Args:
+        path (str): SQLite database file
+        wal (bool): Use write-ahead logging, for stores written on every page
+
+    Returns:
+        sqlite3.Connection: The open database
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    db = sqlite3.connect(path, check_same_thread=False)
+    if wal:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+def evict_lru(db, table, key_column, max_bytes):
+    """
+    Delete a table's least recently used rows until their sizes fit max_bytes.
+
+    The table needs a size and a last_access column. Call it with the
+    store's lock held; committing is left to the caller.
+
+    Args:
+        db (sqlite3.Connection): Database holding the table
+        table (str): Table to evict from
+        key_column (str): Its primary key column
+        max_bytes (int): Upper bound on the sum of the size column
+    """
+    total = db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return
+
+    # Walk from least to most recently used until we are back under the bound
+    victims = []
+    for key, size in db.execute(f"SELECT {key_column}, size FROM {table} ORDER BY last_access"):
+        if total <= max_bytes:
+            break
+        victims.append((key,))
+        total -= size
+    db.executemany(f"DELETE FROM {table} WHERE {key_column} = ?", victims)
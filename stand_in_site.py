@@ -0,0 +1,71 @@
+import json
+import random
+
+from http_archive import HttpArchive
+from replay_server import ReplayServer
+from sources import SearchSource, SourceRegistry
+
+# Where the check scripts' company is searched for; served by a ReplayServer
+SEARCH_URL = 'https://search.example/news?q={query}'
+ARTICLE_BASE = 'https://news.example/'
+
+SEARCH_RULES = [{"container": "div.result", "link": "a"}]
+
+# Article text is drawn from these, so different stories are not near-duplicates
+WORDS = ('quarter revenue margin outlook shares investors analysts plant factory supply chain '
+         'launch product market growth costs hiring board deal merger lawsuit regulators '
+         'forecast demand prices customers orders battery software cloud retail exports').split()
+
+def search_page(links):
+    """Search results page listing links, in the markup SEARCH_RULES expects"""
+    results = ''.join(f'<div class="result"><a href="{link}">Result</a></div>' for link in links)
+    return f'<html><body>{results}</body></html>'
+
+def article_page(company_name, story):
+    """Article page about company_name; the same story gives the same text"""
+    words = random.Random(f"{company_name}/{story}")
+    paragraphs = ''.join(
+        f'<p>{company_name} {" ".join(words.choice(WORDS) for _ in range(30))}.</p>'
+        for _ in range(5)
+    )
+    return (f'<html><head><title>{company_name} {story} - News</title></head><body>'
+            f'<article><h1>{company_name} {story}</h1>{paragraphs}</article></body></html>')
+
+def source_registry():
+    """Registry with the single stand-in search source, stats kept in memory"""
+    return SourceRegistry([SearchSource('stand_in', SEARCH_URL, rules=SEARCH_RULES)])
+
+def write_sources(path):
+    """Write a sources file with the stand-in search source, for NEWS_SOURCES_PATH"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"sources": [{"name": "stand_in", "search_url": SEARCH_URL, "rules": SEARCH_RULES}]}, f, indent=4)
+
+def redirect(target):
+    """Page value for set_pages()/serve() that redirects to target"""
+    return 301, '', {'Location': target}
+
+def set_pages(server, pages):
+    """Serve pages (URL -> HTML, or -> (status, HTML[, headers])) from now on, replacing earlier ones"""
+    for url, page in pages.items():
+        status, html, headers = (page + ({},))[:3] if isinstance(page, tuple) else (200, page, {})
+        headers = dict({'Content-Type': 'text/html; charset=utf-8'}, **headers)
+        server.archive.add(url, status, headers, html.encode('utf-8'))
+
+def serve(pages, **kwargs):
+    """
+    Start a ReplayServer on a free port over an in-memory archive of pages.
+
+    Point the scraper at it with NEWS_BASE_URL=server.base_url, or a session
+    from http_session.create_session(base_url=server.base_url).
+
+    Args:
+        pages (dict): URL -> HTML text, or -> (status, HTML text[, headers])
+        **kwargs: Passed to ReplayServer (latency, error_rate, ...)
+
+    Returns:
+        ReplayServer: The running server; stop() it when done
+    """
+    server = ReplayServer(HttpArchive(':memory:'), ('127.0.0.1', 0), **kwargs)
+    set_pages(server, pages)
+    server.start()
+    return server
@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+
+import requests
+
+from response_cache import ResponseCache
+from streaming_fetch import MIN_ARTICLE_PARAGRAPHS, _ArticleEndScanner, fetch_html
+
+TAIL = b'<footer>' + b'<p>Related: more stories</p>' * 20 + b'</footer></body></html>'
+
+def article_page(paragraphs, head=b'<html><body><nav><p>Menu</p></nav>'):
+    article = b'<article><h1>Title</h1>' + b'<p>Story text.</p>' * paragraphs + b'</article>'
+    return head + article + TAIL, len(head) + len(article)
+
+# (name, page, offset the body must be cut at, or None to read it all)
+CASES = [
+    ('short article is read to the end', *article_page(MIN_ARTICLE_PARAGRAPHS - 1)[:1], None),
+    ('full article is cut after </article>', *article_page(MIN_ARTICLE_PARAGRAPHS)),
+    ('upper-case tags', article_page(MIN_ARTICLE_PARAGRAPHS)[0].replace(b'article', b'ARTICLE').replace(b'<p>', b'<P>'),
+     article_page(MIN_ARTICLE_PARAGRAPHS)[1]),
+    ('nested article closes the outer one', b'<article><article><p>a</p></article><p>b</p><p>c</p></article>' + TAIL,
+     len(b'<article><article><p>a</p></article><p>b</p><p>c</p></article>')),
+    ('page without an article', b'<html><body>' + b'<p>text</p>' * 10 + TAIL, None),
+]
+
+def scan(page, chunk_size):
+    """Feed page to a fresh scanner chunk_size bytes at a time, like fetch_html does"""
+    scanner = _ArticleEndScanner()
+    body = b''
+    for start in range(0, len(page), chunk_size):
+        body += page[start:start + chunk_size]
+        cut = scanner.feed(body)
+        if cut is not None:
+            return cut
+    return None
+
+class _FakeResponse(requests.Response):
+    def __init__(self, page, chunk_size):
+        super().__init__()
+        self.status_code = 200
+        self.headers['Content-Type'] = 'text/html; charset=utf-8'
+        self.headers['ETag'] = '"v1"'
+        self.chunks = [page[start:start + chunk_size] for start in range(0, len(page), chunk_size)]
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        return iter(self.chunks)
+
+class _FakeSession:
+    def __init__(self, page, chunk_size):
+        self.page = page
+        self.chunk_size = chunk_size
+
+    def get(self, url, **kwargs):
+        return _FakeResponse(self.page, self.chunk_size)
+
+def check_article_end(chunk_sizes=(1, 7, 64, 16384)):
+    """
+    Check where streamed article bodies are cut short.
+
+    Every case is scanned in chunks of every size, and also fetched through
+    fetch_html with a stand-in session.
+
+    Returns:
+        list: Problems found (empty if the check passed)
+    """
+    problems = []
+    for name, page, expected in CASES:
+        for chunk_size in chunk_sizes:
+            cut = scan(page, chunk_size)
+            if cut != expected:
+                problems.append(f"{name}: cut at {cut}, expected {expected} ({chunk_size}-byte chunks)")
+
+            response = fetch_html(_FakeSession(page, chunk_size), 'https://example.com/a', chunk_size=chunk_size)
+            body = page if expected is None else page[:expected]
+            if response.content != body or response.truncated != (expected and 'article_end'):
+                problems.append(f"{name}: fetch_html kept {len(response.content)} bytes "
+                                f"(truncated={response.truncated}), expected {len(body)} ({chunk_size}-byte chunks)")
+    return problems
+
+def check_cache(byte_cap=256):
+    """
+    Check that bodies cut short are not kept by the response cache.
+
+    Every case is fetched, and the page without an article once more with
+    a byte cap of byte_cap, and handed to a ResponseCache: a whole body
+    must then be served from the cache, a truncated one neither served nor
+    revalidated.
+
+    Returns:
+        list: Problems found (empty if the check passed)
+    """
+    fetches = [(name, page, None) for name, page, _ in CASES]
+    fetches.append(('page over the byte cap', CASES[-1][1], byte_cap))
+
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(os.path.join(directory, 'http_cache.sqlite'))
+        for number, (name, page, max_bytes) in enumerate(fetches):
+            url = f'https://example.com/{number}'
+            response = fetch_html(_FakeSession(page, 64), url, max_bytes=max_bytes, chunk_size=64)
+            cache.handle_response(url, response)
+            cached = cache.get_fresh(url) is not None
+            if response.truncated and (cached or cache.conditional_headers(url)):
+                problems.append(f"{name}: body cut short ({response.truncated}) was cached")
+            elif not response.truncated and not cached:
+                problems.append(f"{name}: whole body was not cached")
+        cache.close()
+    return problems
+
+def main():
+    problems = check_article_end() + check_cache()
+    for problem in problems:
+        print(f"❌ {problem}")
+
+    if problems:
+        sys.exit(1)
+    print(f"✅ Article bodies were cut exactly where expected, and cut bodies were not cached ({len(CASES)} pages)")
+
+if __name__ == "__main__":
+    main()
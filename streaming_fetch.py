@@ -0,0 +1,145 @@
+import re
+
+# Media types parsed as HTML; anything else is dropped before its body is read
+HTML_CONTENT_TYPES = frozenset(['text/html', 'application/xhtml+xml'])
+
+# Types servers send when they don't know better; the first bytes decide
+SNIFFED_CONTENT_TYPES = frozenset(['', 'application/octet-stream', 'text/plain', 'binary/octet-stream'])
+
+DEFAULT_BYTE_CAPS = {
+    'search': 4 * 1024 * 1024,
+    'article': 2 * 1024 * 1024
+}
+
+# An <article> holding at least this many paragraphs is taken to be the story
+MIN_ARTICLE_PARAGRAPHS = 3
+
+_HTML_START = re.compile(rb'\s*(?:<!--.*?-->\s*)*<(?:!doctype\s+html|html|head|body|meta|title|div|p)\b', re.I | re.S)
+_ARTICLE_TAGS = re.compile(rb'<(/?)(article|p)[\s>/]', re.I)
+
+# Longest tag prefix the scanner must be able to see whole ('</article ')
+_SCAN_OVERLAP = 10
+
+def looks_like_html(prefix):
+    """Sniff the first bytes of a body for an HTML document"""
+    if prefix.startswith(b'\xef\xbb\xbf'):
+        prefix = prefix[3:]
+    return bool(_HTML_START.match(prefix[:1024]))
+
+class _ArticleEndScanner:
+    """Finds the end of the first top-level <article> with enough paragraphs, chunk by chunk"""
+
+    def __init__(self):
+        self.scanned = 0
+        self.depth = 0
+        self.paragraphs = 0
+
+    def feed(self, body):
+        # Returns the offset to cut the body at, or None to keep reading
+        for match in _ARTICLE_TAGS.finditer(body, self.scanned):
+            self.scanned = match.end() - 1
+            closing, name = match.group(1), match.group(2).lower()
+            if name == b'p':
+                if self.depth and not closing:
+                    self.paragraphs += 1
+            elif not closing:
+                self.depth += 1
+            elif self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    if self.paragraphs >= MIN_ARTICLE_PARAGRAPHS:
+                        close = body.find(b'>', match.end() - 1)
+                        if close != -1:
+                            return close + 1
+                        self.depth = 1  # '>' not read yet; see this tag again next time
+                        self.scanned = match.start()
+                        return None
+                    self.paragraphs = 0
+        # A tag cut off at the end of the body is matched once the rest of it arrives
+        self.scanned = max(self.scanned, len(body) - _SCAN_OVERLAP)
+        return None
+
+def fetch_html(session, url, kind='article', max_bytes=None, stop_at_article_end=None,
+               chunk_size=16384, **kwargs):
+    """
+    GET an HTML page as a stream, reading no more of it than needed.
+
+    Content-Type and Content-Length are checked before any of the body is
+    read: non-HTML media (PDFs, video, images...) and bodies over the byte
+    cap are rejected outright, and untyped bodies are sniffed from their
+    first chunk. Reading stops at the byte cap, and for articles right after
+    the first top-level </article> that held MIN_ARTICLE_PARAGRAPHS
+    paragraphs, since the rest of the page is boilerplate.
+
+    Args:
+        session (requests.Session): Session to send the request with
+        url (str): URL to fetch
+        kind (str): 'search' or 'article'; selects the default byte cap
+        max_bytes (int): Byte cap on the decoded body (default: DEFAULT_BYTE_CAPS[kind])
+        stop_at_article_end (bool): Stop after the article (default: for articles only)
+        chunk_size (int): Bytes per read
+        **kwargs: Passed on to session.get (headers, timeout, ...)
+
+    Returns:
+        requests.Response: With the (possibly partial) body as .content, and
+        .rejected / .truncated set to the reason when the body was dropped
+        or cut short, None otherwise
+    """
+    max_bytes = max_bytes or DEFAULT_BYTE_CAPS.get(kind, DEFAULT_BYTE_CAPS['article'])
+    if stop_at_article_end is None:
+        stop_at_article_end = kind == 'article'
+
+    response = session.get(url, stream=True, **kwargs)
+    response.rejected = None
+    response.truncated = None
+
+    if response.status_code == 200:
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in HTML_CONTENT_TYPES and content_type not in SNIFFED_CONTENT_TYPES:
+            response.rejected = 'content_type'
+        else:
+            try:
+                declared = int(response.headers.get('Content-Length', 0))
+            except ValueError:
+                declared = 0
+            if declared > max_bytes:
+                response.rejected = 'content_length'
+        if response.rejected:
+            return _finish(response, b'', complete=False)
+    else:
+        content_type = None
+        stop_at_article_end = False
+
+    body = bytearray()
+    scanner = _ArticleEndScanner() if stop_at_article_end else None
+    complete = True
+
+    for chunk in response.iter_content(chunk_size):
+        if not body and content_type in SNIFFED_CONTENT_TYPES and not looks_like_html(chunk):
+            response.rejected = 'content_type'
+            return _finish(response, b'', complete=False)
+
+        body += chunk
+        if len(body) > max_bytes:
+            del body[max_bytes:]
+            response.truncated = 'byte_cap'
+            complete = False
+            break
+
+        if scanner is not None:
+            cut = scanner.feed(body)
+            if cut is not None:
+                del body[cut:]
+                response.truncated = 'article_end'
+                complete = False
+                break
+
+    return _finish(response, bytes(body), complete)
+
+def _finish(response, body, complete):
+    response._content = body
+    response._content_consumed = True
+    if not complete:
+        # Unread bytes make the connection unusable; drop it rather than drain it
+        response.close()
+    return response
@@ -0,0 +1,331 @@
+import re
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+
+# Summary lengths, in sentences
+ARTICLE_SENTENCES = 3
+COMPANY_SENTENCES = 5
+
+# TextRank damping factor and power-iteration limits
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+# Each article's best sentences that go into the company-wide graph
+COMPANY_POOL = 10
+
+# A sentence this similar (cosine) to one already picked is skipped as a repeat
+REDUNDANCY_THRESHOLD = 0.4
+
+# Sentences of an article past this many are not considered
+MAX_ARTICLE_SENTENCES = 300
+
+# Sentences outside this range (in words) are not picked for a summary
+MIN_SENTENCE_WORDS = 6
+MAX_SENTENCE_WORDS = 80
+
+METHODS = ('textrank', 'tfidf')
+
+# Sentence end: terminal punctuation, optional closing quotes/brackets, whitespace, then a capital or digit
+_SENTENCE_END = re.compile(r'(?<=[.!?])(["\'”’)\]]*)\s+(?=["\'“‘(\[]?[A-Z0-9])')
+_WORD = re.compile(r"[a-z0-9]+(?:['’.&-][a-z0-9]+)*")
+
+# A period after these does not end the sentence
+ABBREVIATIONS = frozenset([
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sen', 'rep', 'gov', 'gen', 'st', 'jr', 'sr',
+    'inc', 'corp', 'co', 'ltd', 'plc', 'vs', 'no', 'approx', 'est', 'etc',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+    'u.s', 'u.k', 'e.g', 'i.e', 'a.m', 'p.m'
+])
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over
+own said same she should so some such than that the their theirs them themselves then there these
+they this those through to too under until up very was we were what when where which while who
+whom why will with would you your yours yourself yourselves says say told according
+""".split())
+
+def split_sentences(text):
+    """
+    Split article text into sentences.
+
+    Args:
+        text (str): Article content
+
+    Returns:
+        list: Sentences in order, stripped
+    """
+    sentences = []
+    start = 0
+
+    for match in _SENTENCE_END.finditer(text):
+        end = match.end(1)
+        # 'Tesla Inc. said', 'the U.S. market', 'J. Smith' do not end here
+        last_word = text[text.rfind(' ', start, end) + 1:end].rstrip('.!?"\'”’)]').lower()
+        if last_word in ABBREVIATIONS or (len(last_word) == 1 and last_word.isalpha()):
+            continue
+        candidate = text[start:end].strip()
+        if candidate:
+            sentences.append(candidate)
+        start = match.end()
+
+    rest = text[start:].strip()
+    if rest:
+        sentences.append(rest)
+    return sentences
+
+def tokenize(sentence):
+    """Lower-cased words of a sentence"""
+    return _WORD.findall(sentence.lower())
+
+def is_content_word(word):
+    return len(word) > 1 and word not in STOPWORDS
+
+def _tfidf_entries(token_lists):
+    """
+    Row-normalized sublinear TF-IDF weights of the sentences, as sparse entries.
+
+    The entries are built from (sentence, term) index arrays in one go;
+    stopwords are dropped by term id. Terms found in a single sentence are
+    left out: they only add to their sentence's norm (which is computed in
+    full), never to a dot product between two sentences, and they are most
+    of the vocabulary.
+
+    Returns:
+        tuple: (rows, columns, weights) arrays, sorted by row
+    """
+    # Word -> id, handing out the next id on first sight
+    vocabulary = defaultdict()
+    vocabulary.default_factory = vocabulary.__len__
+    tokens = list(chain.from_iterable(token_lists))
+    columns = np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+    rows = np.repeat(np.arange(len(token_lists)), [len(tokens) for tokens in token_lists])
+
+    content = np.fromiter(map(is_content_word, vocabulary), dtype=bool, count=len(vocabulary))
+    kept = content[columns]
+    rows, columns = rows[kept], columns[kept]
+
+    count = len(token_lists)
+    if not len(columns):
+        return rows, columns, np.zeros(0, dtype=np.float32)
+
+    size = len(vocabulary)
+    pairs, tf = np.unique(rows * size + columns, return_counts=True)
+    rows, columns = np.divmod(pairs, size)
+
+    df = np.bincount(columns, minlength=size)
+    idf = np.log((1 + count) / (1 + df)) + 1
+    weights = (1 + np.log(tf)) * idf[columns]
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=count))
+    weights /= norms[rows]
+
+    shared = df[columns] >= 2
+    return rows[shared], columns[shared], weights[shared].astype(np.float32)
+
+def _block(rows, columns, weights, sentences):
+    """
+    Dense TF-IDF matrix of some sentences, over just the terms they use.
+
+    Args:
+        rows, columns, weights: Entries of those sentences only
+        sentences (numpy.ndarray): Sorted indices of the sentences (the block's rows)
+    """
+    terms, local_columns = np.unique(columns, return_inverse=True)
+    block = np.zeros((len(sentences), len(terms)), dtype=np.float32)
+    block[np.searchsorted(sentences, rows), local_columns] = weights
+    return block
+
+def _similarity(block):
+    """Cosine similarity between a block's sentences, diagonal zeroed"""
+    similarity = block @ block.T
+    np.fill_diagonal(similarity, 0)
+    return similarity
+
+def _textrank(similarity, lengths):
+    """
+    PageRank over each group's sentence similarity graph, all groups at once.
+
+    similarity is a (groups, length, length) stack padded with zeros, so one
+    batched matrix-vector product per iteration advances every group.
+    """
+    out_degree = similarity.sum(axis=2, keepdims=True)
+    transition = similarity / np.where(out_degree > 0, out_degree, 1)
+
+    real = np.arange(similarity.shape[1])[None, :] < lengths[:, None]
+    teleport = np.where(real, (1 - DAMPING) / np.maximum(lengths, 1)[:, None], 0).astype(np.float32)
+    scores = np.where(real, 1 / np.maximum(lengths, 1)[:, None], 0).astype(np.float32)
+    for _ in range(MAX_ITERATIONS):
+        updated = teleport + DAMPING * np.einsum('gij,gi->gj', transition, scores)
+        converged = np.abs(updated - scores).max() < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+def _textrank_grouped(similarities):
+    """
+    TextRank scores of every block, batching blocks of similar size.
+
+    Blocks are grouped by length rounded up to a power of two and each group
+    is ranked as one padded stack, so no block is padded to more than twice
+    its own length and one long article does not inflate the others.
+    """
+    scores = [None] * len(similarities)
+    groups = defaultdict(list)
+    for position, similarity in enumerate(similarities):
+        groups[(len(similarity) - 1).bit_length()].append(position)
+
+    for positions in groups.values():
+        lengths = np.array([len(similarities[position]) for position in positions])
+        stacked = np.zeros((len(positions), lengths.max(), lengths.max()), dtype=np.float32)
+        for slot, position in enumerate(positions):
+            stacked[slot, :lengths[slot], :lengths[slot]] = similarities[position]
+        ranked = _textrank(stacked, lengths)
+        for slot, position in enumerate(positions):
+            scores[position] = ranked[slot, :lengths[slot]]
+    return scores
+
+def _centroid_scores(block):
+    """Cosine similarity of each sentence to the TF-IDF centroid of its block"""
+    centroid = block.sum(axis=0)
+    norm = np.linalg.norm(centroid)
+    return block @ (centroid / norm if norm > 0 else centroid)
+
+def _rank(blocks, method):
+    """Scores and similarity matrices of the sentences of each block"""
+    similarities = [_similarity(block) for block in blocks]
+    if method == 'textrank':
+        return _textrank_grouped(similarities), similarities
+    if method == 'tfidf':
+        return [_centroid_scores(block) for block in blocks], similarities
+    raise ValueError(f"Unknown summarization method {method!r} (have: {', '.join(METHODS)})")
+
+def _select(scores, similarity, candidates, count):
+    """Pick up to count candidates by score, skipping near-repeats of ones already picked"""
+    picked = []
+    for index in candidates[np.argsort(-scores[candidates], kind='stable')]:
+        if len(picked) == count:
+            break
+        if picked and similarity[index, picked].max() >= REDUNDANCY_THRESHOLD:
+            continue
+        picked.append(int(index))
+    return picked
+
+def summarize_company(articles, article_sentences=ARTICLE_SENTENCES, company_sentences=COMPANY_SENTENCES,
+                      method='textrank'):
+    """
+    Extractive summaries for all of a company's articles, scored in one batch.
+
+    Every sentence of every article goes into one sparse TF-IDF table, so
+    IDF is computed over the company's whole coverage. Each article is then
+    scored from a dense block of its own sentences and the terms they use,
+    and articles of similar length are ranked together. Only the first
+    MAX_ARTICLE_SENTENCES sentences of an article are considered, which
+    keeps a huge page from costing more than a long article. The company
+    summary then ranks the COMPANY_POOL best sentences of each article in
+    one cross-article graph, skipping sentences that repeat one already
+    picked, as syndicated stories often do.
+
+    Args:
+        articles (list): Article dicts with "content" (and "url")
+        article_sentences (int): Sentences per article summary
+        company_sentences (int): Sentences in the company summary
+        method (str): 'textrank' (graph centrality) or 'tfidf' (similarity to the centroid)
+
+    Returns:
+        tuple: (list of summary strings, one per article, and the company
+        summary as {"text": str, "sources": [url, ...]})
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown summarization method {method!r} (have: {', '.join(METHODS)})")
+
+    sentences = []
+    owners = []
+    for position, article in enumerate(articles):
+        split = split_sentences(article.get("content") or '')[:MAX_ARTICLE_SENTENCES]
+        sentences += split
+        owners += [position] * len(split)
+
+    if not sentences:
+        return [''] * len(articles), {"text": '', "sources": []}
+
+    owners = np.array(owners)
+    token_lists = list(map(tokenize, sentences))
+    word_counts = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+    eligible = (word_counts >= MIN_SENTENCE_WORDS) & (word_counts <= MAX_SENTENCE_WORDS)
+    if not eligible.any():
+        eligible[:] = True
+    rows, columns, weights = _tfidf_entries(token_lists)
+
+    # Per-article scoring: one block per article with sentences
+    lengths = np.bincount(owners, minlength=len(articles))
+    firsts = np.searchsorted(owners, np.arange(len(articles)))
+    bounds = np.searchsorted(rows, np.append(firsts, len(sentences)))
+    scored = np.flatnonzero(lengths)
+    blocks = [
+        _block(rows[bounds[position]:bounds[position + 1]], columns[bounds[position]:bounds[position + 1]],
+               weights[bounds[position]:bounds[position + 1]],
+               np.arange(firsts[position], firsts[position] + lengths[position]))
+        for position in scored
+    ]
+    scores, similarities = _rank(blocks, method)
+
+    summaries = [''] * len(articles)
+    pool = []
+    for position, article_scores, similarity in zip(scored, scores, similarities):
+        first, length = firsts[position], lengths[position]
+        pickable = np.flatnonzero(eligible[first:first + length])
+        candidates = pickable if len(pickable) else np.arange(length)
+        picked = sorted(_select(article_scores, similarity, candidates, article_sentences))
+        summaries[position] = ' '.join(sentences[first + index] for index in picked)
+        ranked = pickable[np.argsort(-article_scores[pickable], kind='stable')]
+        pool.append(first + ranked[:COMPANY_POOL])
+
+    company = {"text": '', "sources": []}
+    if company_sentences:
+        # Company scoring: the pooled sentences of every article in one graph
+        pool = np.sort(np.concatenate(pool))
+        kept = np.isin(rows, pool)
+        (company_scores,), (similarity,) = _rank([_block(rows[kept], columns[kept], weights[kept], pool)], method)
+        picked = pool[_select(company_scores, similarity, np.arange(len(pool)), company_sentences)]
+        company["text"] = ' '.join(sentences[index] for index in picked)
+        urls = [articles[owners[index]].get("url") for index in picked]
+        company["sources"] = list(dict.fromkeys(url for url in urls if url))
+
+    return summaries, company
+
+def summarize_article(content, sentences=ARTICLE_SENTENCES, method='textrank'):
+    """
+    Extractive summary of a single article, scored on its own.
+
+    Args:
+        content (str): Article text
+        sentences (int): Sentences in the summary
+        method (str): 'textrank' or 'tfidf'
+
+    Returns:
+        str: The summary sentences, in article order
+    """
+    summaries, _ = summarize_company([{"content": content}], sentences, 0, method)
+    return summaries[0]
+
+def add_summaries(articles, article_sentences=ARTICLE_SENTENCES, company_sentences=COMPANY_SENTENCES,
+                  method='textrank'):
+    """
+    Store a "summary" in every article dict and return the company summary.
+
+    Args:
+        articles (list): One company's article dicts, updated in place
+
+    Returns:
+        dict: Company summary (see summarize_company)
+    """
+    summaries, company = summarize_company(articles, article_sentences, company_sentences, method)
+    for article, summary in zip(articles, summaries):
+        article["summary"] = summary
+    return company
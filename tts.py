@@ -0,0 +1,415 @@
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from article_sink import article_filename
+from sqlite_store import connect, evict_lru
+from summarizer import split_sentences
+
+DEFAULT_AUDIO_CACHE_PATH = os.path.join('.news_cache', 'tts_cache.sqlite')
+
+# Pick the engine by name instead of the first available one
+ENGINE_ENV = 'NEWS_TTS_ENGINE'
+
+# Sentences are grouped into chunks of up to this many characters
+MAX_CHUNK_CHARS = 400
+
+# Silence stitched between chunks
+PAUSE_SECONDS = 0.3
+
+def audio_filename(company_name):
+    """Output file name for a company's audio, e.g. 'Tesla_Inc_news.wav'"""
+    return f"{company_name.replace(' ', '_')}_news.wav"
+
+def wav_duration(audio):
+    """Length in seconds of a WAV file held in memory"""
+    with wave.open(io.BytesIO(audio)) as reader:
+        return reader.getnframes() / reader.getframerate()
+
+class EspeakEngine:
+    """
+    Offline synthesis with the espeak-ng command-line program.
+
+    Each chunk runs in its own process, so chunks synthesize in parallel.
+
+    Args:
+        voice (str): espeak-ng voice, e.g. 'en-us'
+        rate (int): Speaking rate in words per minute
+        binary (str): Program to run (default: espeak-ng, else espeak, on the PATH)
+    """
+
+    name = 'espeak-ng'
+    parallel = True
+
+    def __init__(self, voice='en-us', rate=175, binary=None):
+        self.voice = voice
+        self.rate = rate
+        self.binary = binary or shutil.which('espeak-ng') or shutil.which('espeak')
+        if self.binary is None:
+            raise RuntimeError("espeak-ng is not installed")
+
+    @staticmethod
+    def available():
+        return bool(shutil.which('espeak-ng') or shutil.which('espeak'))
+
+    def voice_key(self):
+        return f"{self.name}:{self.voice}:{self.rate}"
+
+    def synthesize(self, text):
+        """Render text to WAV bytes"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'chunk.wav')
+            subprocess.run(
+                [self.binary, '-v', self.voice, '-s', str(self.rate), '-w', path, '--stdin'],
+                input=text.encode('utf-8'), capture_output=True, check=True
+            )
+            with open(path, 'rb') as f:
+                return f.read()
+
+class Pyttsx3Engine:
+    """
+    Offline synthesis through pyttsx3 (SAPI5, NSSpeechSynthesizer or espeak).
+
+    pyttsx3 drivers are not thread-safe, so chunks are rendered one at a
+    time. Only drivers that write WAV files can be stitched.
+
+    Args:
+        voice (str): Driver voice id (default: the driver's default voice)
+        rate (int): Speaking rate in words per minute (default: the driver's)
+    """
+
+    name = 'pyttsx3'
+    parallel = False
+
+    def __init__(self, voice=None, rate=None):
+        import pyttsx3
+
+        self.voice = voice
+        self.rate = rate
+        self.driver = pyttsx3.init()
+        if voice:
+            self.driver.setProperty('voice', voice)
+        if rate:
+            self.driver.setProperty('rate', rate)
+
+    @staticmethod
+    def available():
+        return importlib.util.find_spec('pyttsx3') is not None
+
+    def voice_key(self):
+        return f"{self.name}:{self.voice or 'default'}:{self.rate or 'default'}"
+
+    def synthesize(self, text):
+        """Render text to WAV bytes"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'chunk.wav')
+            self.driver.save_to_file(text, path)
+            self.driver.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read()
+
+# Preferred first
+ENGINES = {engine.name: engine for engine in (EspeakEngine, Pyttsx3Engine)}
+
+def available_engines():
+    """List the TTS engines that can be used in this environment, preferred first"""
+    return [name for name, engine in ENGINES.items() if engine.available()]
+
+def create_engine(name=None, **options):
+    """
+    Create a TTS engine.
+
+    Args:
+        name (str): One of ENGINES (default: NEWS_TTS_ENGINE, else the first available)
+        **options: Passed to the engine (voice, rate, ...)
+
+    Raises:
+        RuntimeError: If no engine is installed, or the named one is not
+    """
+    name = name or os.environ.get(ENGINE_ENV)
+    if name is None:
+        available = available_engines()
+        if not available:
+            raise RuntimeError(f"No TTS engine installed (supported: {', '.join(ENGINES)})")
+        name = available[0]
+    if name not in ENGINES:
+        raise RuntimeError(f"Unknown TTS engine {name!r} (supported: {', '.join(ENGINES)})")
+    if not ENGINES[name].available():
+        raise RuntimeError(f"TTS engine {name!r} is not installed")
+    return ENGINES[name](**options)
+
+class AudioCache:
+    """
+    Persistent, size-bounded cache of synthesized chunks keyed by text and voice.
+
+    A headline or unchanged article read again with the same voice is
+    served from here instead of being rendered twice. Once the stored audio
+    exceeds max_bytes, the least recently used chunks are evicted.
+
+    Args:
+        path (str): SQLite database file
+        max_bytes (int): Upper bound on the total audio size
+    """
+
+    def __init__(self, path=DEFAULT_AUDIO_CACHE_PATH, max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                key TEXT PRIMARY KEY,
+                audio BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS chunks_lru ON chunks (last_access)")
+        self.db.commit()
+
+    @staticmethod
+    def key(text, voice_key):
+        return hashlib.sha1(f"{voice_key}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached WAV bytes for key, or None"""
+        with self.lock:
+            row = self.db.execute("SELECT audio FROM chunks WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.db.execute("UPDATE chunks SET last_access = ? WHERE key = ?", (time.time(), key))
+                self.db.commit()
+        return row[0] if row else None
+
+    def put(self, key, audio):
+        """Store a chunk, then enforce the size bound"""
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO chunks (key, audio, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, audio, len(audio), time.time())
+            )
+            evict_lru(self.db, "chunks", "key", self.max_bytes)
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+def chunk_text(text, max_chars=MAX_CHUNK_CHARS):
+    """
+    Group sentences into chunks of up to max_chars characters.
+
+    A sentence longer than max_chars makes a chunk of its own.
+
+    Returns:
+        list: Chunks, in reading order
+    """
+    chunks = []
+    current = ''
+    for sentence in split_sentences(text):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+def company_script(company_name, document, full=False):
+    """
+    Build the text read out for a company from its saved articles file.
+
+    The company summary comes first, then every article's title and its
+    summary (or, with full or when there is no summary, its content).
+
+    Args:
+        company_name (str): Company the articles are about
+        document (dict): Contents of the company's articles JSON file
+        full (bool): Read whole articles instead of their summaries
+
+    Returns:
+        list: Paragraphs, in reading order
+    """
+    paragraphs = [f"News about {company_name}."]
+    summary = (document.get("summary") or {}).get("text")
+    if summary and not full:
+        paragraphs.append(summary)
+    for article in document.get("articles", []):
+        body = article.get("content") if full else article.get("summary") or article.get("content")
+        title = (article.get("title") or '').strip()
+        if title and title[-1] not in '.!?':
+            title += '.'
+        paragraphs.append(f"{title} {body or ''}".strip())
+    return paragraphs
+
+def stitch(chunks, pause=PAUSE_SECONDS):
+    """
+    Join WAV chunks into one WAV file, with a pause between them.
+
+    Raises:
+        ValueError: If the chunks differ in channels, sample width or rate
+    """
+    output = io.BytesIO()
+    params = None
+    with wave.open(output, 'wb') as writer:
+        for index, audio in enumerate(chunks):
+            with wave.open(io.BytesIO(audio)) as reader:
+                chunk_params = reader.getparams()[:3]
+                frames = reader.readframes(reader.getnframes())
+            if params is None:
+                params = chunk_params
+                writer.setnchannels(params[0])
+                writer.setsampwidth(params[1])
+                writer.setframerate(params[2])
+            elif chunk_params != params:
+                raise ValueError(f"Chunk {index} has format {chunk_params}, expected {params}")
+            if index:
+                # 8-bit WAV samples are unsigned: silence is 0x80 there, not 0
+                silence = b'\x80' if params[1] == 1 else b'\0'
+                writer.writeframes(silence * int(pause * params[2]) * params[0] * params[1])
+            writer.writeframes(frames)
+    return output.getvalue()
+
+def render_speech(paragraphs, output_path, engine, cache=None, workers=4):
+    """
+    Synthesize paragraphs into one WAV file, chunks in parallel.
+
+    The text is cut into sentence chunks. Cached chunks are used as they
+    are; the others are rendered on a pool of workers (one worker if the
+    engine is not thread-safe), then everything is stitched in order.
+
+    Args:
+        paragraphs (list): Text to read, in order
+        output_path (str): WAV file to write
+        engine: TTS engine (see create_engine)
+        cache (AudioCache): Cache of rendered chunks (default: no caching)
+        workers (int): Chunks synthesized at once
+
+    Returns:
+        dict: "chunks", "cached", "reused" (repeats of a chunk rendered in
+        this run) and "synthesized" counts, "audio_seconds",
+        "wall_seconds", "time_to_first_audio" (seconds until the first
+        chunk was ready to play), "synthesis_seconds" (summed render time of
+        the synthesized chunks) and "real_time_factor" (synthesis seconds
+        per second of synthesized audio; below 1 is faster than real time)
+    """
+    started = time.perf_counter()
+    chunks = [chunk for paragraph in paragraphs for chunk in chunk_text(paragraph)]
+    audio = [None] * len(chunks)
+    ready_at = [None] * len(chunks)
+    keys = [AudioCache.key(chunk, engine.voice_key()) for chunk in chunks]
+    rendered = {}  # key -> index of the chunk that renders it (repeats reuse it)
+    synthesis_seconds = 0.0
+    synthesized_audio = 0.0
+    cached = 0
+
+    for index, key in enumerate(keys):
+        data = cache.get(key) if cache is not None else None
+        if data is not None:
+            audio[index] = data
+            ready_at[index] = time.perf_counter()
+            cached += 1
+
+    def synthesize(index):
+        chunk_started = time.perf_counter()
+        data = engine.synthesize(chunks[index])
+        return index, data, time.perf_counter() - chunk_started
+
+    pending = []
+    for index, key in enumerate(keys):
+        if audio[index] is None and key not in rendered:
+            rendered[key] = index
+            pending.append(index)
+
+    with ThreadPoolExecutor(max_workers=workers if engine.parallel else 1) as executor:
+        # Submitted in reading order, so the first chunk is ready as early as possible
+        for index, data, seconds in executor.map(synthesize, pending):
+            audio[index] = data
+            ready_at[index] = time.perf_counter()
+            synthesis_seconds += seconds
+            synthesized_audio += wav_duration(data)
+            if cache is not None:
+                cache.put(keys[index], data)
+
+    for index, key in enumerate(keys):
+        if audio[index] is None:
+            audio[index] = audio[rendered[key]]
+            ready_at[index] = ready_at[rendered[key]]
+
+    if chunks:
+        with open(output_path, 'wb') as f:
+            f.write(stitch(audio))
+
+    return {
+        "chunks": len(chunks),
+        "cached": cached,
+        "reused": len(chunks) - cached - len(pending),
+        "synthesized": len(pending),
+        "audio_seconds": sum(map(wav_duration, audio)),
+        "wall_seconds": time.perf_counter() - started,
+        "time_to_first_audio": ready_at[0] - started if chunks else None,
+        "synthesis_seconds": synthesis_seconds,
+        "real_time_factor": synthesis_seconds / synthesized_audio if synthesized_audio else None
+    }
+
+def render_company(company_name, engine, cache=None, workers=4, full=False, directory='.'):
+    """
+    Read a company's saved articles out into <company>_news.wav.
+
+    Args:
+        company_name (str): Company whose <company>_articles.json is read
+        engine: TTS engine (see create_engine)
+        cache (AudioCache): Cache of rendered chunks
+        workers (int): Chunks synthesized at once
+        full (bool): Read whole articles instead of their summaries
+        directory (str): Where the articles file is and the audio goes
+
+    Returns:
+        dict: Path of the audio file under "path", plus the render_speech report
+    """
+    with open(os.path.join(directory, article_filename(company_name)), encoding='utf-8') as f:
+        document = json.load(f)
+
+    output_path = os.path.join(directory, audio_filename(company_name))
+    report = render_speech(company_script(company_name, document, full), output_path, engine, cache, workers)
+    report["path"] = output_path
+    return report
+
+def print_report(report):
+    rtf = report["real_time_factor"]
+    print(f"🔊 Saved {report['audio_seconds']:.1f}s of audio to {report['path']}: "
+          f"{report['chunks']} chunks ({report['cached']} cached, {report['reused']} repeated, "
+          f"{report['synthesized']} synthesized) in {report['wall_seconds']:.1f}s, "
+          f"first audio after {report['time_to_first_audio']:.2f}s"
+          + (f", real-time factor {rtf:.2f}" if rtf is not None else ""))
+
+def main():
+    parser = argparse.ArgumentParser(description="Read a company's scraped articles out into a WAV file")
+    parser.add_argument('company', help="Company whose <company>_articles.json is read")
+    parser.add_argument('--engine', choices=list(ENGINES), help="TTS engine (default: first installed)")
+    parser.add_argument('--voice', help="Engine voice")
+    parser.add_argument('--rate', type=int, help="Speaking rate in words per minute")
+    parser.add_argument('--workers', type=int, default=4, help="Chunks synthesized at once")
+    parser.add_argument('--full', action='store_true', help="Read whole articles instead of their summaries")
+    args = parser.parse_args()
+
+    options = {name: value for name, value in (('voice', args.voice), ('rate', args.rate)) if value}
+    engine = create_engine(args.engine, **options)
+    report = render_company(args.company, engine, AudioCache(), args.workers, args.full)
+    if not report["chunks"]:
+        print(f"❌ Nothing to read for {args.company}")
+        return
+    print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import base64
+import os
+import re
+import threading
+import time
+from urllib.parse import parse_qsl, unquote, urljoin, urlsplit, urlunsplit
+
+from sqlite_store import connect
+
+DEFAULT_REDIRECTS_PATH = os.path.join('.news_cache', 'redirects.sqlite')
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'guccounter', 'guce_referrer', 'guce_referrer_sig', 'fbclid', 'gclid', 'dclid', 'msclkid',
+    'mc_cid', 'mc_eid', 'ocid', 'cmpid', 'ncid', 'taid', 'soc_src', 'soc_trk', 'yptr', '.tsrc',
+    'smid', 'sr_share', 'mbid', '_ga', 'igshid', 'amp', 'outputtype', '_amp'
+}
+TRACKING_PREFIXES = ('utm_', 'guce_', 'pk_', 'mtm_')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Hosts that only wrap another URL; resolving them needs the network unless decodable
+WRAPPER_HOSTS = {'news.google.com', 'www.bing.com', 'r.search.yahoo.com', 'www.google.com', 't.co'}
+
+_URL_IN_BYTES = re.compile(rb'https?://[\x21-\x7e]+')
+
+def _decode_base64(value):
+    value = value + '=' * (-len(value) % 4)
+    try:
+        return base64.urlsafe_b64decode(value)
+    except (ValueError, TypeError):
+        return b''
+
+def unwrap_redirector(url):
+    """
+    Extract the target of a known redirect wrapper without any network access.
+
+    Handles google.com/url?q=, Bing click-through (/ck/a?u=a1<base64>,
+    apiclick.aspx?url=), Yahoo's /RU=<target>/ segments, AMP cache URLs
+    and the older news.google.com/articles/<base64> ids that embed the
+    target URL.
+
+    Args:
+        url (str): Possibly wrapped URL
+
+    Returns:
+        str: The wrapped target, or url unchanged
+    """
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    params = dict(parse_qsl(parts.query))
+
+    if host.endswith('google.com') and parts.path == '/url':
+        target = params.get('q') or params.get('url')
+        if target and target.startswith('http'):
+            return target
+
+    if host.endswith('bing.com'):
+        if parts.path == '/ck/a' and params.get('u', '').startswith('a1'):
+            target = _decode_base64(params['u'][2:]).decode('utf-8', errors='ignore')
+            if target.startswith('http'):
+                return target
+        if parts.path.lower().endswith('apiclick.aspx') and params.get('url', '').startswith('http'):
+            return params['url']
+
+    if host == 'r.search.yahoo.com':
+        match = re.search(r'/RU=([^/]+)/', parts.path)
+        if match:
+            return unquote(match.group(1))
+
+    if host.endswith('.cdn.ampproject.org'):
+        match = re.match(r'/c/(s/)?(.+)', parts.path)
+        if match:
+            return ('https://' if match.group(1) else 'http://') + match.group(2)
+
+    if host == 'news.google.com':
+        match = re.match(r'/(?:rss/)?articles/([A-Za-z0-9_-]+)', parts.path)
+        if match:
+            found = _URL_IN_BYTES.search(_decode_base64(match.group(1)))
+            if found:
+                return found.group(0).decode('ascii', errors='ignore')
+
+    return url
+
+def _strip_amp_path(path):
+    segments = path.split('/')
+    if len(segments) > 2 and segments[1] == 'amp':
+        segments.pop(1)
+    if len(segments) > 2 and segments[-1] == 'amp':
+        segments.pop()
+    elif len(segments) > 2 and segments[-1] == '' and segments[-2] == 'amp':
+        segments.pop(-2)
+    path = '/'.join(segments)
+    return re.sub(r'\.amp(\.html?)$', r'\1', path)
+
+def _is_tracking(token):
+    key = unquote(token.split('=', 1)[0].replace('+', ' ')).lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+def canonicalize_url(url):
+    """
+    Reduce a URL to the canonical form used for de-duplication and fetching.
+
+    Unwraps known redirectors, lower-cases scheme and host, drops default
+    ports, fragments, tracking parameters and AMP markers, and sorts the
+    remaining query parameters, each left exactly as written.
+
+    Args:
+        url (str): URL as found on a search page
+
+    Returns:
+        str: Canonical URL
+    """
+    for _ in range(3):  # Wrappers are occasionally nested
+        target = unwrap_redirector(url)
+        if target == url:
+            break
+        url = target
+
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    port = parts.port if parts.port and parts.port != DEFAULT_PORTS.get(scheme) else None
+    netloc = f"{host}:{port}" if port else host
+
+    # The kept parameters are joined back byte for byte: the canonical URL is the one
+    # fetched, so '?id' must not become '?id=' nor 'a%2Fb' be re-escaped
+    query = sorted(token for token in parts.query.split('&') if token and not _is_tracking(token))
+
+    return urlunsplit((scheme, netloc, _strip_amp_path(parts.path) or '/', '&'.join(query), ''))
+
+class UrlCanonicalizer:
+    """
+    Canonicalizes links and remembers where they finally redirect to.
+
+    After a page has been fetched, remember() maps the link to the canonical
+    form of the final post-redirect URL, so later runs (and later links in
+    the same run) de-duplicate on the real article. With resolve='head',
+    links on wrapper hosts that cannot be decoded offline are resolved by
+    following redirects with HEAD requests before the article is fetched.
+
+    Args:
+        path (str): SQLite file the redirect map is persisted to (None: memory only)
+        resolve (str): 'none' or 'head'
+    """
+
+    def __init__(self, path=None, resolve='none'):
+        self.resolve = resolve
+        self.redirects = {}
+        self.lock = threading.Lock()
+        self.db = None
+
+        if path is None:
+            return
+
+        self.db = connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS redirects (
+                url TEXT PRIMARY KEY,
+                final_url TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )
+        """)
+        self.db.commit()
+        self.redirects.update(self.db.execute("SELECT url, final_url FROM redirects"))
+
+    def canonicalize(self, url):
+        """Canonical form of url, following any remembered redirect"""
+        canonical = canonicalize_url(url)
+        return self.redirects.get(canonical, canonical)
+
+    def needs_resolution(self, url):
+        """True if url is still a wrapper link and HEAD resolution is enabled"""
+        return self.resolve == 'head' and urlsplit(url).netloc.lower() in WRAPPER_HOSTS
+
+    def remember(self, url, final_url):
+        """
+        Record that url ended up at final_url.
+
+        Returns:
+            str: Canonical final URL
+        """
+        canonical = canonicalize_url(url)
+        final = canonicalize_url(final_url)
+        if final == canonical:
+            return final
+
+        with self.lock:
+            self.redirects[canonical] = final
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO redirects (url, final_url, resolved_at) VALUES (?, ?, ?)",
+                    (canonical, final, time.time())
+                )
+                self.db.commit()
+        return final
+
+    def resolve_with_head(self, session, url, max_hops=5, timeout=10):
+        """
+        Follow redirects with HEAD requests only, without downloading bodies.
+
+        Args:
+            session (requests.Session): Session to send the HEAD requests with
+            url (str): Wrapper URL
+
+        Returns:
+            str: Canonical final URL (url's canonical form if resolution fails)
+        """
+        current = url
+        try:
+            for _ in range(max_hops):
+                response = session.head(current, allow_redirects=False, timeout=timeout)
+                location = response.headers.get('Location')
+                if response.status_code not in (301, 302, 303, 307, 308) or not location:
+                    break
+                current = urljoin(current, location)
+        except Exception as e:
+            print(f"⚠️ Could not resolve redirect for {url}: {str(e)}")
+
+        return self.remember(url, current)
+
+    def close(self):
+        if self.db is not None:
+            with self.lock:
+                self.db.close()